@@ -10,25 +10,37 @@
 # - Removed premature thread start that caused TypeError
 # - Exit from tray now also quits Tk mainloop cleanly
 
-import os, re, json, time, uuid, argparse, urllib.parse, pythoncom, threading
+import os, re, json, time, uuid, argparse, urllib.parse, threading, subprocess
+import abc, queue, gzip, shutil, atexit, base64, signal, traceback
+from collections import deque
+import email, email.message, email.parser, email.policy, email.utils
+from contextlib import contextmanager
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo  # FIX: used by to_local_naive
 import sys
-import winreg
-import win32com.client as win32
-import win32event
-import win32api
-import winerror
-from win10toast import ToastNotifier  # (optional; not used directly)
 import ctypes
-
-# GUI and Tray
-import tkinter as tk
-import tkinter.ttk as ttk
-from datetime import datetime
-from tkinter import messagebox
-from PIL import Image
-from pystray import Icon as icon, MenuItem as item
+try:  # Windows/Outlook 전용 — 없으면 Maildir 백엔드(--maildir)만 사용 가능
+    import pythoncom
+    import winreg
+    import win32com.client as win32
+    import win32event
+    import win32api
+    import winerror
+except ImportError:
+    pythoncom = winreg = win32 = win32event = win32api = winerror = None
+
+# GUI and Tray — 트레이 모드에서만 _load_gui() 로 import (--headless/엔진은 tkinter/PIL/pystray 를 로드하지 않음)
+tk = ttk = messagebox = None
+Image = icon = item = None
+
+def _load_gui():
+    global tk, ttk, messagebox, Image, icon, item
+    import tkinter as tk
+    import tkinter.ttk as ttk
+    from tkinter import messagebox
+    from PIL import Image
+    from pystray import Icon as icon, MenuItem as item
 
 # ---- Global / Base Paths ----
 LAST_CLEANUP = 0
@@ -49,6 +61,8 @@ OL_DEFAULT_ITEM_MAIL = 0
 OL_FOLDER_DELETED_ITEMS = 3
 OL_FOLDER_DRAFTS = 16
 OL_FOLDER_DELETED = 3
+OL_FOLDER_OUTBOX = 4
+OL_FOLDER_INBOX = 6
 
 # ===== 시작 프로그램 등록/해제 =====
 RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -63,7 +77,7 @@ _APP_ICO = _res_path("icon.ico")      # 씨넷 ico
 _APP_PNG = _res_path("icon.png")      # 씨넷 png
 _APP_ICONIMG = None                   # PhotoImage 캐시(가비지컬렉션 방지)
 
-def set_window_icon(win: tk.Misc):
+def set_window_icon(win: "tk.Misc"):
     """해당 창의 타이틀 아이콘 + 작업표시줄 아이콘 지정(.ico 우선, png 보조)"""
     global _APP_ICONIMG
     try:
@@ -119,19 +133,21 @@ def is_startup_registered_reg(app_name=APP_RUN_NAME):
     except Exception:
         return False, ""
 
-def check_single_instance(mutex_name="AutoRemindCS_Mutex"):
-    _ = win32event.CreateMutex(None, False, mutex_name)
+_INSTANCE_MUTEXES = []  # 핸들이 GC 로 닫히면 뮤텍스가 풀리므로 프로세스 수명 동안 보관
+
+def check_single_instance(mutex_name="AutoRemindCS_Mutex", quiet=False):
+    _INSTANCE_MUTEXES.append(win32event.CreateMutex(None, False, mutex_name))
     if win32api.GetLastError() == winerror.ERROR_ALREADY_EXISTS:
-        ctypes.windll.user32.MessageBoxW(0, "이미 Auto_Reminder가 실행 중입니다.", "Auto Reminder", 0x40)
+        if quiet:  # --headless (서비스/스케줄러) 에서는 대화상자 없이 로그만
+            log("[INFO] Auto_Reminder is already running; exiting")
+        else:
+            ctypes.windll.user32.MessageBoxW(0, "이미 Auto_Reminder가 실행 중입니다.", "Auto Reminder", 0x40)
         sys.exit(0)
 
 def show_startup_notification():
-    ctypes.windll.user32.MessageBoxW(
-        0,
-        "백그라운드에서 Auto Reminder가 실행 중입니다.",
-        "Auto Reminder 실행됨",
-        0x40
-    )
+    # 모달 MessageBoxW 가 트레이 기동을 막지 않도록 별도 스레드에서 표시
+    threading.Thread(target=ctypes.windll.user32.MessageBoxW, name="startup-notice", daemon=True,
+                     args=(0, "백그라운드에서 Auto Reminder가 실행 중입니다.", "Auto Reminder 실행됨", 0x40)).start()
 
 # ===== 설정 파일 로드 =====
 def load_body_map():
@@ -189,19 +205,133 @@ def _pretty_ts(ts: str) -> str:
         return s[:16]  # YYYY-MM-DD HH:MM 까지만
 
 
-def log(msg, level="INFO"):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# ---- Logging (queue + background writer)
+# COM 스레드는 큐에 넣기만 하고, 포맷/print/파일 기록은 writer 스레드가 묶어서 처리.
+# 파일은 주 단위(app_%Y-W%U.log) + 크기 기준으로 회전, 지난 파일은 gzip 압축 후 보존기간 경과 시 삭제.
+LOG_MAX_BYTES       = 5 * 1024 * 1024
+LOG_RETENTION_WEEKS = 8
+LOG_BATCH_MAX       = 500
+
+LOG_PREFIX          = "app"   # --engine 프로세스는 "engine" (트레이 프로세스와 같은 파일을 돌려쓰지 않도록)
+
+_LOG_QUEUE  = queue.SimpleQueue()
+_LOG_THREAD = None
+_LOG_START_LOCK = threading.Lock()
+_LOG_STOP = object()
+
+def log(msg, *args, level="INFO"):
+    """args 가 있으면 msg.format(*args) 는 writer 스레드에서 지연 수행.
+    DEBUG 는 VERBOSE 가 꺼져 있으면 포맷 없이 즉시 폐기."""
     if level == "DEBUG" and not VERBOSE:
         return
-    line = f"{ts} [{level}] {msg}"
-    print(line)
-    week_str = datetime.now().strftime("%Y-W%U")
-    log_file = os.path.join(APPDATA_DIR, f"app_{week_str}.log")
+    if _LOG_THREAD is None:
+        _start_log_writer()
+    _LOG_QUEUE.put((time.time(), level, msg, args))
+
+def _start_log_writer():
+    global _LOG_THREAD
+    with _LOG_START_LOCK:
+        if _LOG_THREAD is None:
+            t = threading.Thread(target=_log_writer_loop, name="log-writer", daemon=True)
+            t.start()
+            _LOG_THREAD = t
+
+def log_shutdown(timeout=2.0):
+    """남은 로그를 모두 기록하고 writer 종료 (종료 시 호출)."""
+    t = _LOG_THREAD
+    if t is None or not t.is_alive():
+        return
+    _LOG_QUEUE.put(_LOG_STOP)
+    t.join(timeout)
+
+atexit.register(log_shutdown)
+
+def _format_log_record(rec):
+    ts, level, msg, args = rec
+    if args:
+        try:
+            msg = msg.format(*args)
+        except Exception as e:
+            msg = f"{msg} {args!r} (format error: {e})"
+    return f"{datetime.fromtimestamp(ts):%Y-%m-%d %H:%M:%S} [{level}] {msg}"
+
+def _log_file_for(week_str):
+    return os.path.join(APPDATA_DIR, f"{LOG_PREFIX}_{week_str}.log")
+
+def _log_housekeeping(current_path):
+    """현재 파일 외의 <LOG_PREFIX>_*.log 는 gzip 압축, 보존기간 지난 .gz 는 삭제."""
+    cutoff = time.time() - LOG_RETENTION_WEEKS * 7 * 86400
     try:
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception as e:
-        print(f"[WARN] 로그 파일 기록 실패: {e}")
+        names = os.listdir(APPDATA_DIR)
+    except Exception:
+        return
+    for name in names:
+        if not name.startswith(LOG_PREFIX + "_"):
+            continue
+        path = os.path.join(APPDATA_DIR, name)
+        try:
+            if name.endswith(".log") and os.path.abspath(path) != os.path.abspath(current_path):
+                with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(path)
+            elif name.endswith(".log.gz") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except Exception as e:
+            print(f"[WARN] 로그 정리 실패: {name}: {e}")
+
+def _log_writer_loop():
+    fh = None; cur_week = None; cur_path = None; size = 0
+    stop = False
+    while not stop:
+        batch = [_LOG_QUEUE.get()]
+        while len(batch) < LOG_BATCH_MAX:
+            try:
+                batch.append(_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        if _LOG_STOP in batch:
+            stop = True
+            batch = [r for r in batch if r is not _LOG_STOP]
+        if not batch:
+            continue
+        lines = [_format_log_record(r) for r in batch]
+        text = "\n".join(lines) + "\n"
+        try:
+            print(text, end="")
+        except Exception:
+            pass
+        try:
+            week_str = datetime.fromtimestamp(batch[0][0]).strftime("%Y-W%U")
+            if fh is None or week_str != cur_week or size >= LOG_MAX_BYTES:
+                if fh is not None:
+                    fh.close(); fh = None
+                    if week_str == cur_week:
+                        # 같은 주 안에서 크기 초과 → app_<week>.<n>.log 로 밀어내기
+                        n = 1
+                        while os.path.exists(_log_file_for(f"{cur_week}.{n}")) or \
+                              os.path.exists(_log_file_for(f"{cur_week}.{n}") + ".gz"):
+                            n += 1
+                        os.replace(cur_path, _log_file_for(f"{cur_week}.{n}"))
+                cur_week = week_str
+                cur_path = _log_file_for(week_str)
+                fh = open(cur_path, "a", encoding="utf-8")
+                size = fh.tell()
+                _log_housekeeping(cur_path)
+            fh.write(text)
+            fh.flush()
+            size += len(text.encode("utf-8"))
+        except Exception as e:
+            try:
+                print(f"[WARN] 로그 파일 기록 실패: {e}")
+            except Exception:
+                pass
+            if fh is not None:
+                try: fh.close()
+                except Exception: pass
+            fh = None
+    if fh is not None:
+        try: fh.close()
+        except Exception: pass
 
 def format_body_text(text):
     if not text: return ""
@@ -220,41 +350,314 @@ def to_local_naive(dt):
 def now_naive():
     return datetime.now()
 
+# state.json 은 키를 원래 형식(EntryID|addr, EID:<EntryID>) 그대로 쓴다 — 템플릿 빌드(Auto_Reminder_Ver_1.0)도 같은
+# 파일을 읽고 쓰기 때문. 메모리의 state 에서는 항목 값의 반복 문자열(제목, 시각, detected_by 등)을 한 객체로 공유한다.
+class StateFileError(RuntimeError):
+    """state.json 을 읽을 수 없음. 빈 state 로 이어 가면 다음 저장이 파일 전체를 지우므로 호출부가 작업을 중단한다."""
+
+def _share_strings(st):
+    """항목 dict 값의 같은 문자열을 한 객체로 (수신인마다 반복되는 제목/발송 시각 등)."""
+    memo = {}
+    for v in st.values():
+        if isinstance(v, dict):
+            for f, x in v.items():
+                if isinstance(x, str):
+                    v[f] = memo.setdefault(x, x)
+    return st
+
 def load_state():
-    if os.path.exists(STATE_FILE):
+    if not os.path.exists(STATE_FILE):
+        return {}
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"top level is {type(data).__name__}")
+    except (OSError, ValueError) as e:
+        log(f"[ERR] cannot read {STATE_FILE}: {e}", level="ERROR")
+        raise StateFileError(f"cannot read state file: {e}") from e
+    return _share_strings(data)
+
+# 이 프로세스에서 취소된 state 키. worker 가 사이클 도중 들고 있던 state 를 저장할 때도 다시 반영해
+# GUI/IPC 의 취소가 사이클 저장에 덮어써지지 않게 한다.
+_STATE_LOCK = threading.RLock()
+_CANCELLED_KEYS = set()
+
+def save_state(st):
+    with _STATE_LOCK:
+        if _CANCELLED_KEYS:
+            for k in _CANCELLED_KEYS:
+                st.pop(k, None)
+            st["__cancelled_keys__"] = sorted(set(st.get("__cancelled_keys__", [])) | _CANCELLED_KEYS)
+        tmp = STATE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(st, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, STATE_FILE)
+
+def cancel_state_keys(keys):
+    """state 키(EntryID|addr)들의 발송 취소 — 히스토리 제거 + __cancelled_keys__ 추가를 한 번에 저장."""
+    keys = [k for k in keys if "|" in k]
+    with _STATE_LOCK:
+        _CANCELLED_KEYS.update(keys)
+        save_state(load_state())
+    return len(keys)
+
+def pending_state_entries(st=None):
+    """리마인드 리스트용: 회신 안 온 EntryID|addr 항목만."""
+    st = load_state() if st is None else st
+    return {k: v for k, v in st.items() if "|" in k and isinstance(v, dict) and not v.get("reply_received", False)}
+
+# ===== state 정리(compaction) =====
+# lookback 창보다 오래된 항목(더 이상 스캔 대상이 아닌 메일)은 압축 아카이브로 옮기고, 회신 후 오래된 항목은
+# 회신 여부만 남긴다 (lookback 안의 메일이면 회신 검색/재발송을 막아야 하므로 키 자체는 유지).
+# 시각 정보가 없는 항목(취소 키, 예전 형식)은 처음 본 시각을 __seen_at__ 에 적어 두고 그 기준으로 만료.
+# 키(EntryID) 핸들화는 하지 않는다 — Ver_1.0 이 같은 state.json 을 원래 키 형식으로 읽고 쓰므로 의도적으로 뺐다.
+STATE_ARCHIVE_FILE = os.path.join(APPDATA_DIR, "state_archive.jsonl.gz")
+STATE_ARCHIVE_REPLIED_DAYS = 30
+STATE_COMPACT_INTERVAL_SEC = 24 * 3600
+
+def _latest_ts(val, *fields):
+    out = None
+    for f in fields:
         try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            t = to_local_naive(datetime.fromisoformat(val[f])) if val.get(f) else None
         except Exception:
-            return {}
-    return {}
+            t = None
+        if t and (out is None or t > out):
+            out = t
+    return out
+
+def compact_state(lookback_days, replied_days=STATE_ARCHIVE_REPLIED_DAYS):
+    """state.json 정리 + 아카이브. 사이클 사이(worker) 또는 --compact-state 로 호출. 크기 비교 dict 반환."""
+    now = now_naive()
+    now_iso = now.isoformat(timespec="seconds")
+    cutoff = now - timedelta(days=lookback_days)
+    replied_cutoff = now - timedelta(days=replied_days)
+    with _STATE_LOCK:
+        bytes_before = os.path.getsize(STATE_FILE) if os.path.exists(STATE_FILE) else 0
+        st = load_state()
+        keys_before = len(st)
+        seen = st.pop("__seen_at__", {})
+        new_seen, archived, slimmed = {}, [], 0
+
+        def expired(key, ts):
+            if ts is None:
+                new_seen[key] = seen.get(key, now_iso)
+                ts = datetime.fromisoformat(new_seen[key])
+            return ts < cutoff
+
+        for key, val in list(st.items()):
+            if key.startswith("__") or not isinstance(val, dict):
+                continue
+            if expired(key, _latest_ts(val, "last_sent", "detected_at", "last_remind_at")):
+                archived.append({"key": key, "value": val, "reason": "lookback"})
+                del st[key]
+                new_seen.pop(key, None)
+            elif "|" in key and val.get("reply_received") and len(val) > 2:
+                detected = _latest_ts(val, "detected_at")
+                if detected and detected < replied_cutoff:
+                    archived.append({"key": key, "value": val, "reason": "replied"})
+                    st[key] = {"reply_received": True, "detected_at": val["detected_at"]}
+                    slimmed += 1
+
+        if "__cancelled_keys__" in st:
+            keep = []
+            for key in st["__cancelled_keys__"]:
+                if expired(key, None):
+                    archived.append({"key": key, "reason": "cancelled"})
+                    new_seen.pop(key, None)
+                    _CANCELLED_KEYS.discard(key)
+                else:
+                    keep.append(key)
+            st["__cancelled_keys__"] = keep
+        # 닫힌 스레드: 닫힌 시각이 lookback 밖이면 원본도 스캔 범위 밖
+        for eid, c in list(st.get("__closed__", {}).items()):
+            if _latest_ts(c, "at") is None or _latest_ts(c, "at") < cutoff:
+                archived.append({"key": eid, "value": c, "reason": "closed"})
+                del st["__closed__"][eid]
+        if new_seen:
+            st["__seen_at__"] = new_seen
+
+        if archived:
+            with gzip.open(STATE_ARCHIVE_FILE, "at", encoding="utf-8") as f:   # gzip 멤버 이어붙이기
+                for rec in archived:
+                    f.write(json.dumps({"archived_at": now_iso, **rec}, ensure_ascii=False, default=str) + "\n")
+        save_state(st)
+        bytes_after = os.path.getsize(STATE_FILE)
+    report = {"bytes_before": bytes_before, "bytes_after": bytes_after, "keys_before": keys_before,
+              "keys_after": len(st), "archived": sum(r["reason"] != "replied" for r in archived), "slimmed": slimmed}
+    log(f"[STATE-COMPACT] {bytes_before:,}B -> {bytes_after:,}B | keys {keys_before} -> {len(st)} | "
+        f"archived={report['archived']} slimmed={slimmed} -> {os.path.basename(STATE_ARCHIVE_FILE)}")
+    return report
+
+# ===== 발송 예정(due) 인덱스 =====
+# Sent 스캔이 후보마다 다음 리마인드 시각을 기록해 두고, 트레이의 예정 창은 이것만 읽는다 (Outlook/COM 접근 없음).
+DUE_INDEX_FILE = os.path.join(APPDATA_DIR, "due_index.json")
+FORECAST_NEXT_N = 20
+FORECAST_HOURS = 24
+
+class DueIndex:
+    """conv key -> {due, entry_id, subject, yard, to}. due 순 정렬 목록은 변경 시에만 다시 만든다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None    # 첫 접근 때 파일에서 로드 (재시작 직후에도 예정 표시)
+        self._sorted = None
+        self._seen = None
+        self.updated_at = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries, self.updated_at = data.get("entries", {}), data.get("updated_at")
+            except Exception:
+                self._entries = {}
+        return self._entries
+
+    def begin_scan(self):
+        with self._lock:
+            self._load()
+            self._seen = set()
+
+    def upsert(self, key, due, **info):
+        with self._lock:
+            self._load()[key] = {"due": due.isoformat(timespec="seconds"), **info}
+            self._sorted = None
+            if self._seen is not None:
+                self._seen.add(key)
+
+    def discard(self, key):
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._sorted = None
+
+    def end_scan(self, complete):
+        """스캔이 끝까지 돌았으면(루프 예산으로 중단되지 않았으면) 이번에 안 보인 항목 제거 후 저장."""
+        with self._lock:
+            entries = self._load()
+            if complete and self._seen is not None:
+                for key in [k for k in entries if k not in self._seen]:
+                    del entries[key]
+                self._sorted = None
+            self._seen = None
+            self.updated_at = now_naive().isoformat(timespec="seconds")
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": self.updated_at, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+    def _ordered(self):
+        if self._sorted is None:
+            self._sorted = sorted(self._load().items(), key=lambda kv: kv[1]["due"])
+        return self._sorted
+
+    def forecast(self, n=FORECAST_NEXT_N, hours=FORECAST_HOURS, st=None):
+        """다음 n건 + 앞으로 hours 시간의 시간대별 건수. 수신인 전원 회신/취소된 메일은 state 로 제외."""
+        st = load_state() if st is None else st
+        cancelled = set(st.get("__cancelled_keys__", []))
+        closed = {}     # entry_id -> 아직 리마인드 대상 수신인이 남았는지
+        for k, v in st.items():
+            if "|" in k and isinstance(v, dict):
+                eid = k.split("|", 1)[0]
+                closed[eid] = closed.get(eid, True) and (v.get("reply_received", False) or k in cancelled)
+        with self._lock:
+            rows = [dict(v, key=k) for k, v in self._ordered() if not closed.get(v.get("entry_id"), False)]
+            updated_at = self.updated_at
+        now = now_naive().replace(minute=0, second=0, microsecond=0)
+        hourly = {(now + timedelta(hours=h)).isoformat(timespec="minutes"): 0 for h in range(hours)}
+        for r in rows:
+            slot = max(datetime.fromisoformat(r["due"]), now).replace(minute=0, second=0).isoformat(timespec="minutes")
+            if slot in hourly:
+                hourly[slot] += 1
+        return {"next": rows[:n], "hourly": list(hourly.items()), "total": len(rows), "updated_at": updated_at}
+
+DUE_INDEX = DueIndex(DUE_INDEX_FILE)
+
+# ===== 제목 태그 문법 =====
+# 야드 태그 [HMD12H] (야드 + 주기, 리마인드 대상) 와 상태 태그 [DH] / [DH3D] (본문 선택, 정규화 때 제거).
+# config.json 의 "tag_grammar" 로 야드/상태 코드/단위를 바꿀 수 있고, 하나의 정규식으로 컴파일해 제목당 한 번만 훑는다.
+TAG_GRAMMAR_DEFAULT = {
+    "yards":        ["SHI", "HMD", "HHI", "HSHI", "HO", "HJSC"],
+    "status_codes": ["DN", "DH", "DA", "FU", "FI", "FP"],
+    "units":        {"MIN": 1 / 1440.0, "H": 1 / 24.0, "D": 1.0, "W": 7.0, "M": 30.0},   # 단위당 일수
+}
+
+class TagMatcher:
+    def __init__(self, grammar):
+        def alt(words):  # 긴 것부터 (HSHI 가 SHI/HHI 보다, MIN 이 M 보다 먼저)
+            return "|".join(re.escape(w.upper()) for w in sorted(words, key=len, reverse=True))
+        # 빈 목록/빈 문자열이면 (?P<yard>) 처럼 빈 그룹이 되어 아무 괄호에나 맞고 parse 가 None.upper() 로 깨진다
+        for key, kind in (("yards", (list, tuple)), ("status_codes", (list, tuple)), ("units", dict)):
+            words = grammar[key]
+            if not isinstance(words, kind) or not words or not all(isinstance(w, str) and w.strip() for w in words):
+                raise ValueError(f"{key} must be a non-empty {'mapping' if kind is dict else 'list'} of non-empty strings")
+        self.units = {u.upper(): float(d) for u, d in grammar["units"].items()}
+        num_unit = r"(?P<num>\d+)\s*(?P<unit>" + alt(self.units) + r")"
+        self.regex = re.compile(
+            r"[\[［]\s*(?:(?P<yard>" + alt(grammar["yards"]) + r")|(?P<status>" + alt(grammar["status_codes"]) + r"))"
+            r"\s*(?:" + num_unit + r")?\s*[\]］]", re.I)
+        # 야드만 필요한 호출(parse_yard_tag)용: 주기 있는 야드 태그만 맞추므로 search 한 번이면 첫 태그
+        self.yard_regex = re.compile(
+            r"[\[［]\s*(?P<yard>" + alt(grammar["yards"]) + r")\s*" + num_unit + r"\s*[\]］]", re.I)
+
+    def parse(self, subject):
+        """→ (yard, interval_days, status). 각각 첫 번째 태그 기준, 주기 없는 야드 태그는 무시."""
+        yard = interval_days = status = None
+        if not subject or ("[" not in subject and "［" not in subject):
+            return yard, interval_days, status
+        for m in self.regex.finditer(subject):
+            if m["yard"]:
+                if yard is None and m["num"]:
+                    yard, interval_days = m["yard"].upper(), int(m["num"]) * self.units[m["unit"].upper()]
+            elif status is None:
+                status = m["status"].upper()
+            if yard is not None and status is not None:
+                break
+        return yard, interval_days, status
+
+    def parse_yard(self, subject):
+        """→ (yard, interval_days). parse 의 야드 부분과 같고 상태 태그는 보지 않는다."""
+        if not subject or ("[" not in subject and "［" not in subject):
+            return None, None
+        m = self.yard_regex.search(subject)
+        if not m:
+            return None, None
+        return m["yard"].upper(), int(m["num"]) * self.units[m["unit"].upper()]
+
+    def strip_status(self, s):
+        # 태그 주변 공백은 strip_brackets_tags 의 공백 정리에서 합쳐짐
+        return self.regex.sub(lambda m: " " if m["status"] else m.group(0), s)
+
+_TAGS = TagMatcher(TAG_GRAMMAR_DEFAULT)
+
+def set_tag_grammar(grammar=None):
+    """config 의 tag_grammar(부분 지정 가능)로 매처 재컴파일. 잘못된 값이면 기존 매처 유지."""
+    global _TAGS
+    try:
+        _TAGS = TagMatcher({**TAG_GRAMMAR_DEFAULT, **(grammar or {})})
+    except Exception as e:
+        log(f"[WARN] invalid tag_grammar in config; keeping previous: {e}", level="WARN")
 
-def save_state(st):
-    tmp = STATE_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(st, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, STATE_FILE)
+def parse_subject_tags(subject):
+    """[HMD12H][DH] → ("HMD", 0.5, "DH")"""
+    return _TAGS.parse(subject)
 
 def parse_yard_tag(subject):
     """[SHI3D], [HMD12H], [HHI1W], [HSHI30MIN] → (yard, interval_days)"""
-    if not subject: return None, None
-    s = subject.upper().replace("［", "[").replace("］", "]")
-    m = re.search(r"\[(SHI|HMD|HHI|HSHI|HO|HJSC)(\d+)(MIN|H|D|W|M)\]", s)
-    if not m: return None, None
-    yard, num, unit = m.group(1), int(m.group(2)), m.group(3)
-    if unit == "MIN": interval_days = num / 1440.0
-    elif unit == "H": interval_days = num / 24.0
-    elif unit == "D": interval_days = float(num)
-    elif unit == "W": interval_days = float(num) * 7.0
-    elif unit == "M": interval_days = float(num) * 30.0
-    else: interval_days = None
-    return yard, interval_days
+    return _TAGS.parse_yard(subject)
+
+def remind_body_for(cfg, status):
+    """상태 코드와 같은 이름의 config 문구(예: [DH] → cfg["DH"])가 있으면 그것, 없으면 remind_message."""
+    return (status and cfg.get(status)) or cfg.get("remind_message", "")
 
 PREFIXES = ["re:", "fw:", "fwd:", "답장:", "회신:", "전달:", "참조:", "回覆:", "転送:"]
 
 def strip_brackets_tags(subj: str) -> str:
     s = re.sub(r"^\s*\[remind\]\s*","", subj or "", flags=re.I)
-    s = re.sub(r"\s*\[(?:D[ANH]|F[UIP])\s*\d+\s*(?:MIN|H|D|W|M)\]\s*"," ", s, flags=re.I)
+    s = _TAGS.strip_status(s)
     return re.sub(r"\s+"," ", s).strip()
 
 def canonicalize_subject(subj: str) -> str:
@@ -271,6 +674,7 @@ def canonicalize_subject(subj: str) -> str:
     return s.lower()
 
 def _walk_folders(folder):
+    stat_inc("folders_visited")
     yield folder
     for i in range(1, folder.Folders.Count+1):
         sub = folder.Folders.Item(i)
@@ -321,28 +725,133 @@ def _all_mail_folders(ns, include_deleted=False):
             except Exception:
                 continue
 
+# ---- Address resolution cache (X500/EX DN, 주소가 없을 때만 표시이름 → SMTP)
+# GetExchangeUser().PrimarySmtpAddress 는 GAL/서버 조회가 될 수 있으므로
+# 결과를 디스크에 보존하고 사이클 간 재사용. 해석 실패도 짧게 음성 캐시.
+ADDR_CACHE_FILE        = os.path.join(APPDATA_DIR, "addr_cache.json")
+ADDR_CACHE_TTL_SEC     = 7 * 24 * 3600
+ADDR_CACHE_NEG_TTL_SEC = 6 * 3600
+
+_ADDR_CACHE = None
+_ADDR_CACHE_DIRTY = False
+_ADDR_CACHE_LOCK = threading.Lock()
+
+def _addr_key(s):
+    return (s or "").strip().lower()
+
+def _looks_like_smtp(s):
+    return bool(s) and "@" in s and not s.lstrip().startswith("/")
+
+def _addr_cache_entries():
+    global _ADDR_CACHE
+    if _ADDR_CACHE is None:
+        try:
+            with open(ADDR_CACHE_FILE, "r", encoding="utf-8") as f:
+                _ADDR_CACHE = json.load(f)
+        except Exception:
+            _ADDR_CACHE = {}
+    return _ADDR_CACHE
+
+def addr_cache_get(key):
+    """→ (hit, smtp). 음성 캐시 hit 이면 (True, None)."""
+    now = time.time()
+    with _ADDR_CACHE_LOCK:
+        rec = _addr_cache_entries().get(key)
+    if not rec:
+        return False, None
+    ttl = ADDR_CACHE_TTL_SEC if rec.get("smtp") else ADDR_CACHE_NEG_TTL_SEC
+    if now - rec.get("ts", 0) > ttl:
+        return False, None
+    return True, rec.get("smtp")
+
+def addr_cache_put(keys, smtp):
+    global _ADDR_CACHE_DIRTY
+    rec = {"smtp": smtp, "ts": time.time()}
+    with _ADDR_CACHE_LOCK:
+        entries = _addr_cache_entries()
+        for k in keys:
+            if k: entries[k] = rec
+        _ADDR_CACHE_DIRTY = True
+
+def addr_cache_flush():
+    """변경이 있을 때만 만료 항목을 정리해 저장 (사이클당 1회)."""
+    global _ADDR_CACHE_DIRTY
+    with _ADDR_CACHE_LOCK:
+        if not _ADDR_CACHE_DIRTY:
+            return
+        now = time.time()
+        entries = _addr_cache_entries()
+        for k in [k for k, v in entries.items()
+                  if now - v.get("ts", 0) > (ADDR_CACHE_TTL_SEC if v.get("smtp") else ADDR_CACHE_NEG_TTL_SEC)]:
+            entries.pop(k, None)
+        snapshot = dict(entries)
+        _ADDR_CACHE_DIRTY = False
+    try:
+        tmp = ADDR_CACHE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp, ADDR_CACHE_FILE)
+    except Exception as e:
+        log(f"[WARN] addr cache save failed: {e}")
+
+def _smtp_from_address_entry(ae):
+    if not ae: return None
+    if ae.Type == "EX":
+        ex = ae.GetExchangeUser()
+        if ex and ex.PrimarySmtpAddress:
+            return ex.PrimarySmtpAddress
+        dl = ae.GetExchangeDistributionList()
+        if dl and dl.PrimarySmtpAddress:
+            return dl.PrimarySmtpAddress
+        return None
+    return ae.Address
+
+def _resolve_key(address, name):
+    # 캐시 키는 주소(X500 DN 등)만. 표시 이름은 동명이인이 한 항목을 공유하므로 주소가 없을 때만,
+    # 예전 파일에 주소와 함께 기록된 이름 항목과 섞이지 않도록 name: 접두어로
+    if _addr_key(address):
+        return _addr_key(address)
+    return "name:" + _addr_key(name) if _addr_key(name) else None
+
+def resolve_smtp(entry=None, address=None, name=None):
+    """주소/표시이름을 SMTP 로 해석. 캐시 miss 일 때만 entry(AddressEntry 또는
+    AddressEntry 를 돌려주는 callable)를 통해 COM 조회."""
+    if _looks_like_smtp(address):
+        return address.strip().lower()
+    key = _resolve_key(address, name)
+    if key:
+        hit, smtp = addr_cache_get(key)
+        if hit:
+            return smtp
+    if entry is None:
+        return None
+    smtp = None
+    try:
+        ae = entry() if callable(entry) else entry
+        if ae and not key:
+            key = _resolve_key(ae.Address, ae.Name)
+        smtp = _smtp_from_address_entry(ae)
+    except Exception:
+        smtp = None
+    smtp = smtp.strip().lower() if _looks_like_smtp(smtp) else None
+    addr_cache_put([key], smtp)
+    return smtp
+
 def my_addresses(ns):
     addrs = set()
     try:
-        me = ns.CurrentUser
-        ae = me.AddressEntry
-        if ae and ae.Type=="EX":
-            ex = ae.GetExchangeUser()
-            if ex and ex.PrimarySmtpAddress:
-                addrs.add(ex.PrimarySmtpAddress.lower())
-        elif ae:
-            addr = (ae.Address or "").lower()
-            if addr: addrs.add(addr)
+        ae = ns.CurrentUser.AddressEntry
+        if ae:
+            raw = (ae.Address or "").lower()
+            if raw: addrs.add(raw)   # EX 계정이면 X500 DN (SenderEmailAddress 와 동일 형태)
+            smtp = resolve_smtp(ae, address=raw, name=ae.Name)
+            if smtp: addrs.add(smtp)
     except Exception:
         pass
     return addrs
 
-def is_from_me(m, me_set):
-    try:
-        addr = (getattr(m,"SenderEmailAddress","") or "").lower()
-        return addr in me_set
-    except Exception:
-        return False
+def is_from_me(sender_addr, me_set):
+    return (sender_addr or "").lower() in me_set
 
 def get_internet_message_id(item):
     try: return item.PropertyAccessor.GetProperty(PR_INTERNET_MESSAGE_ID)
@@ -372,82 +881,251 @@ def get_sender_address(mail_item):
     return None
 
 def conv_key(mail):
-    try:
-        msgid = mail.PropertyAccessor.GetProperty(PR_INTERNET_MESSAGE_ID)
-    except Exception:
-        msgid = None
+    """mail: 속성 dict 또는 MailSource.props() 뷰"""
+    msgid = mail.get("MessageID")
     if msgid:
         return f"MSGID:{msgid}"
-    try:
-        if getattr(mail,"EntryID",None):
-            return f"EID:{mail.EntryID}"
-    except Exception:
-        pass
-    cid = getattr(mail,"ConversationID",None)
+    eid = mail.get("EntryID")
+    if eid:
+        return f"EID:{eid}"
+    cid = mail.get("ConversationID")
     if cid: return f"CID:{cid}"
-    topic = getattr(mail,"ConversationTopic","") or ""
-    sent_on = to_local_naive(getattr(mail,"SentOn",None))
+    topic = mail.get("ConversationTopic") or ""
+    sent_on = to_local_naive(mail.get("SentOn"))
     sent_key = sent_on.strftime("%Y-%m-%d %H:%M:%S") if sent_on else "NA"
     return f"TOPIC:{topic}|SENT:{sent_key}"
 
-def check_and_update_replies(app, orig_mail, state, verbose=False):
-    ns = app.GetNamespace("MAPI")
-    me_set = my_addresses(ns)
+# ---- 회신 검색 (폴더 훑기)
+# 수신인마다 모든 메일 폴더를 다시 훑지 않고, 한 번 훑으며 아직 회신이 없는 수신인 전원과 대조한다.
+# 사이클 동안 유지되는 ReplySearchPool 이 있으면 스레드(각자 CoInitialize + 마샬링된 Outlook 참조)들이
+# 폴더 큐에서 하나씩 가져가 겹치지 않게 나눠 훑고, 찾은 회신을 결과 큐로 흘려보낸다.
+# 수신인이 모두 확인되면 남은 검색은 취소된다.
+# Outlook 은 out-of-proc 호출을 UI 스레드(STA) 하나에서 차례로 처리하므로 스레드를 늘려도 빨라지지 않는다
+# (가짜 COM 직렬 모드에서 4 스레드 = 0.92배). 지연이 서로 다른 서버(온라인 모드 공유 사서함/아카이브)에서 생길 때만 켠다.
+REPLY_SEARCH_WORKERS = 1
+
+def _scan_replies(src, folders, want, done, me_set, orig_sent, base, found, cancel=None):
+    """folders 를 ReceivedTime 역순으로 훑어 want[i]=(addr, smtp) 의 회신마다 found(i, rt, folder, m) 호출.
+    done: 이미 확인된 i 집합 (found 가 갱신). 전원이 done 이 되거나 cancel 이 설정되면 중단."""
+    for folder in folders:
+        if (cancel is not None and cancel.is_set()) or len(done) >= len(want):
+            return
+        try:
+            items = src.items(folder, sort="ReceivedTime", descending=True)
+        except Exception:
+            continue
 
-    orig_subject = orig_mail.Subject or ""
-    orig_sent = to_local_naive(getattr(orig_mail, "SentOn", None))
+        for it in items:
+            if (cancel is not None and cancel.is_set()) or len(done) >= len(want):
+                return
+            m = src.props(it)
+            try:
+                if m["Class"] != OL_MAILITEM:
+                    continue
+                sender_addr = (m["SenderEmailAddress"] or "").lower()
+                if is_from_me(sender_addr, me_set):
+                    continue
+                rt = to_local_naive(m["ReceivedTime"])
+                if not rt or rt <= orig_sent:
+                    continue
 
-    recipients = [(r.Address, r.Type) for r in orig_mail.Recipients if r.Type in (1, 3)]
+                can = canonicalize_subject(m["Subject"] or "")
+                ok = (can == base) if len(base) < 8 else ((can == base) or (base in can) or (can in base))
+                if not ok:
+                    continue
 
-    for addr, rtype in recipients:
-        state_key = make_state_key(orig_mail.EntryID, addr)
+                sender_smtp = False     # 필요할 때 한 번만 해석
+                for i, (addr, smtp) in enumerate(want):
+                    if i in done:
+                        continue
+                    matched = addr.lower() in sender_addr
+                    if not matched and smtp:
+                        if sender_smtp is False:
+                            sender_smtp = src.sender_smtp(it, sender_addr)
+                        matched = sender_smtp == smtp
+                    if matched:
+                        found(i, rt, folder, m)
+            except Exception:
+                continue
 
-        cancelled_keys = set(state.get("__cancelled_keys__", []))
-        if state_key in cancelled_keys:
-            log(f"[CANCELLED-SKIP] {state_key} is cancelled; skip sending.")
-            continue
+class _ReplySearchJob:
+    __slots__ = ("want", "me_set", "orig_sent", "base", "verbose", "folders", "done", "cancel", "out")
 
-        if state.get(state_key, {}).get("reply_received", False):
-            continue
+    def __init__(self, want, me_set, orig_sent, base, verbose, refs):
+        self.want, self.me_set, self.orig_sent, self.base, self.verbose = want, me_set, orig_sent, base, verbose
+        self.folders = queue.Queue()
+        for ref in refs:
+            self.folders.put(ref)
+        self.done = set()               # 확인된 수신인 (모든 스레드가 공유, set.add 는 원자적)
+        self.cancel = threading.Event()
+        self.out = queue.Queue()        # ("match", i, rt, 로그용 설명) | ("done", 스레드, None, None)
 
-        for folder in _all_mail_folders(ns, include_deleted=True):
+    def next_folders(self, s, opened):
+        while not self.cancel.is_set():
             try:
-                items = folder.Items
-                items.Sort("ReceivedTime", True)
-            except Exception:
-                continue
-
-            for m in items:
+                ref = self.folders.get_nowait()
+            except queue.Empty:
+                return
+            f = opened.get(ref)
+            if f is None:
                 try:
-                    if m.Class != OL_MAILITEM:
-                        continue
-                    if is_from_me(m, me_set):
-                        continue
-                    rt = to_local_naive(getattr(m, "ReceivedTime", None))
-                    if not rt or rt <= orig_sent:
-                        continue
+                    f = opened[ref] = s.folder_by_id(ref)
+                except Exception:
+                    continue
+            yield f
 
-                    can = canonicalize_subject(getattr(m, "Subject", "") or "")
-                    base = canonicalize_subject(orig_subject)
-                    if not base:
-                        continue
-                    ok = (can == base) if len(base) < 8 else ((can == base) or (base in can) or (can in base))
-                    if not ok:
-                        continue
+class ReplySearchPool:
+    """사이클 동안 유지되는 회신 검색 스레드 풀. search() 는 사이클 스레드에서만 호출한다.
+    폴더 목록은 첫 검색 때 한 번 만들고(folder_id), 각 스레드는 자기 아파트에서 folder_by_id 로 연다."""
+
+    def __init__(self, src, openers):
+        self.src = src
+        self._refs = None
+        self._workers = []
+        for i, opener in enumerate(openers):
+            inbox = queue.Queue()
+            t = threading.Thread(target=self._run, args=(opener, inbox), name=f"reply-search-{i}", daemon=True)
+            t.start()
+            self._workers.append((t, inbox))
+
+    @classmethod
+    def create(cls, src, workers):
+        """workers 가 2 이상이고 백엔드가 스레드를 지원할 때만 풀, 아니면 None (호출 스레드에서 순차 검색)."""
+        if workers < 2:
+            return None
+        openers = [src.for_thread() for _ in range(workers)]
+        return None if None in openers else cls(src, openers)
 
-                    sender_addr = (m.SenderEmailAddress or "").lower()
-                    if addr.lower() in sender_addr:
-                        if verbose:
-                            log(f"[REPLY*:{rtype}] {folder.FolderPath} / {rt:%Y-%m-%d %H:%M:%S} / "
-                                f"{m.SenderName} / {m.Subject} / matched={addr}")
-                        state[state_key] = {
-                            "reply_received": True,
-                            "last_sent": state.get(state_key, {}).get("last_sent"),
-                            "detected_at": rt.isoformat()
-                        }
-                        break
+    def close(self):
+        for _t, inbox in self._workers:
+            inbox.put(None)
+        self._workers = []
+
+    # -- worker
+    def _run(self, opener, inbox):
+        if pythoncom: pythoncom.CoInitialize()
+        try:
+            s = opener()
+            opened = {}
+            while True:
+                job = inbox.get()
+                if job is None:
+                    return
+                try:
+                    _scan_replies(s, job.next_folders(s, opened), job.want, job.done, job.me_set,
+                                  job.orig_sent, job.base, lambda i, rt, f, m: self._found(s, job, i, rt, f, m),
+                                  cancel=job.cancel)
+                finally:
+                    job.out.put(("done", threading.current_thread(), None, None))
+        except CycleAbandoned:
+            return      # 감시 스레드가 포기한 호출 — 이 스레드는 더 쓰지 않는다
+        except Exception as e:
+            log(f"[REPLY-POOL] worker failed: {e}", level="WARN")
+        finally:
+            if pythoncom: pythoncom.CoUninitialize()
+
+    @staticmethod
+    def _found(s, job, i, rt, folder, m):
+        if i in job.done:
+            return
+        job.done.add(i)
+        info = f"{s.folder_path(folder)} / {rt:%Y-%m-%d %H:%M:%S} / {m['SenderName']} / {m['Subject']}" if job.verbose else None
+        job.out.put(("match", i, rt, info))
+
+    # -- cycle thread
+    def search(self, want, me_set, orig_sent, base, verbose, found):
+        """want 전원의 회신을 병렬로 찾아 found(i, rt, 설명) 호출 (호출 스레드에서). 살아 있는 스레드가 없으면 False."""
+        self._workers = [(t, q) for t, q in self._workers if t.is_alive()]
+        if not self._workers:
+            return False
+        if self._refs is None:
+            self._refs = []
+            for f in self.src.mail_folders(include_deleted=True):
+                try:
+                    self._refs.append(self.src.folder_id(f))
                 except Exception:
                     continue
+        job = _ReplySearchJob(want, me_set, orig_sent, base, verbose, self._refs)
+        waiting = {t for t, _q in self._workers}
+        for _t, inbox in self._workers:
+            inbox.put(job)
+        b = _COM_BROKER
+        matched = set()
+        while waiting and len(matched) < len(want) and not exit_event.is_set():
+            try:
+                kind, i, rt, info = job.out.get(timeout=0.2)
+            except queue.Empty:
+                if b is not None and b._urgent and b.tid == threading.get_ident():
+                    b.pump_urgent()
+                for t in list(waiting):
+                    rec = _COM_INFLIGHT.get(t.ident)
+                    if not t.is_alive() or (rec is not None and rec[2] == 2):
+                        waiting.discard(t)
+                continue
+            if kind == "done":
+                waiting.discard(i)
+            elif i not in matched:
+                matched.add(i)
+                found(i, rt, info)
+        job.cancel.set()    # 전원 확인 — 아직 훑는 스레드는 다음 항목에서 멈춘다
+        return True
+
+def check_and_update_replies(src, orig_mail, state, verbose=False, pool=None):
+    """orig_mail: src.props() 뷰. pool: ReplySearchPool 이 있으면 폴더 검색을 나눠 병렬로."""
+    me_set = src.my_addresses()
+
+    orig_subject = orig_mail["Subject"] or ""
+    orig_sent = to_local_naive(orig_mail["SentOn"])
+
+    # (state key 용 원본 주소, 유형, SMTP) — EX 수신인은 X500 DN 이므로 SMTP 로도 대조
+    recipients = [r for r in src.recipients(orig_mail.item) if r[1] in (1, 3)]
+
+    pending = []    # 아직 회신 확인이 필요한 (addr, rtype, smtp, state_key)
+    cancelled_keys = set(state.get("__cancelled_keys__", []))
+    for addr, rtype, smtp in recipients:
+        state_key = make_state_key(orig_mail["EntryID"], addr)
+        if state_key in cancelled_keys:
+            log(f"[CANCELLED-SKIP] {state_key} is cancelled; skip sending.")
+            continue
+        if state.get(state_key, {}).get("reply_received", False) or any(p[3] == state_key for p in pending):
+            continue
+        pending.append((addr, rtype, smtp, state_key))
+
+    def record(i, rt, info):
+        addr, rtype, _smtp, state_key = pending[i]
+        if verbose and info:
+            log(f"[REPLY*:{rtype}] {info} / matched={addr}")
+        state[state_key] = {
+            "reply_received": True,
+            "last_sent": state.get(state_key, {}).get("last_sent"),
+            "detected_at": rt.isoformat(),
+            "detected_by": "FUZZ"
+        }
+        metric_inc("autoremind_reply_detections_total", {"detected_by": "FUZZ"})
+        trace_event("reply", state_key=state_key, reply_at=rt, detected=now_naive(),
+                    last_sent=state[state_key]["last_sent"], detected_by="FUZZ")
+
+    base = canonicalize_subject(orig_subject)
+    if pending and base:
+        want = [(addr, smtp) for addr, _rtype, smtp, _key in pending]
+        if pool is None or not pool.search(want, me_set, orig_sent, base, verbose, record):
+            done = set()
+            def found(i, rt, folder, m):
+                done.add(i)
+                info = (f"{src.folder_path(folder)} / {rt:%Y-%m-%d %H:%M:%S} / {m['SenderName']} / {m['Subject']}"
+                        if verbose else None)
+                record(i, rt, info)
+            _scan_replies(src, src.mail_folders(include_deleted=True), want, done, me_set, orig_sent, base, found)
+
+    # 수신인 전원이 회신했으면 "replied", 나머지가 발송 취소면 "cancelled" — 호출부가 스레드를 닫는다(close_thread)
+    cancelled_keys = set(state.get("__cancelled_keys__", [])) | _CANCELLED_KEYS
+    keys = [make_state_key(orig_mail["EntryID"], addr) for addr, _, _ in recipients]
+    replied = [state.get(k, {}).get("reply_received", False) for k in keys]
+    if keys and all(replied):
+        return "replied"
+    if keys and all(r or k in cancelled_keys for k, r in zip(keys, replied)):
+        return "cancelled"
+    return None
 
 def _guess_mime_from_ext(path: str):
     ext = os.path.splitext(path)[1].lower()
@@ -630,11 +1308,1820 @@ def get_outlook():
     t0 = time.time()
     while time.time()-t0 < 30:
         try:
-            return win32.Dispatch("Outlook.Application")
+            app = win32.Dispatch("Outlook.Application")
         except Exception:
             time.sleep(2)
+            continue
+        metric_inc("autoremind_com_reconnects_total")   # 성공한 연결만 (실패한 시도는 세지 않음)
+        return app
     raise RuntimeError("Outlook COM attach failed")
 
+# ---- Cycle instrumentation (phase timers + COM call counters)
+# 사이클마다 단계별 소요시간과 실제 프로세스 간 COM 호출 수를 모아 JSON 한 줄로 남긴다.
+CYCLE_STATS_FILE = os.path.join(APPDATA_DIR, "cycle_stats.jsonl")
+
+_CYCLE_STATS = None
+_CYCLE_STATS_LOCK = threading.Lock()
+
+def cycle_stats_begin():
+    global _CYCLE_STATS
+    _CYCLE_STATS = {
+        "started_at": now_naive().isoformat(timespec="seconds"),
+        "phases": {},
+        "counts": {"candidates": 0, "sent": 0, "com_reads": 0, "com_writes": 0, "com_calls": 0,
+                   "folders_visited": 0, "items_enumerated": 0},
+        "_t0": time.perf_counter(),
+        "_tid": threading.get_ident(),
+    }
+
+def stat_inc(name, n=1):
+    st = _CYCLE_STATS
+    if st is None: return
+    with _CYCLE_STATS_LOCK:
+        st["counts"][name] = st["counts"].get(name, 0) + n
+
+def cycle_phase_add(name, seconds):
+    st = _CYCLE_STATS
+    if st is None or st["_tid"] != threading.get_ident(): return  # 포기된 worker 의 늦은 단계 시간은 제외
+    with _CYCLE_STATS_LOCK:
+        st["phases"][name] = st["phases"].get(name, 0.0) + seconds
+
+@contextmanager
+def cycle_phase(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        cycle_phase_add(name, time.perf_counter() - t0)
+
+def cycle_stats_end(error=None):
+    """현재 사이클 요약을 cycle_stats.jsonl 에 한 줄(JSON)로 기록하고 반환."""
+    global _CYCLE_STATS
+    st, _CYCLE_STATS = _CYCLE_STATS, None
+    if st is None: return None
+    total = time.perf_counter() - st.pop("_t0")
+    st.pop("_tid", None)
+    phases = st["phases"]
+    if "sent_scan" in phases:
+        nested = sum(phases.get(k, 0.0) for k in ("reply_check", "newer_outgoing", "send", "state_save"))
+        phases["sent_scan_self"] = max(0.0, phases["sent_scan"] - nested)
+    st["phases"] = {k: round(v, 4) for k, v in phases.items()}
+    st["total_sec"] = round(total, 4)
+    if error: st["error"] = str(error)
+    try:
+        with open(CYCLE_STATS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(st, ensure_ascii=False) + "\n")
+    except Exception as e:
+        log(f"[WARN] cycle stats write failed: {e}")
+    return st
+
+# ---- Metrics (optional localhost endpoint, Prometheus text format)
+# worker 는 잠금 하에 dict 만 갱신하고, HTTP 응답은 별도 데몬 스레드가 스냅샷으로 렌더링.
+CYCLE_LATENCY_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600)
+
+METRIC_DEFS = {
+    "autoremind_cycle_duration_seconds":  ("histogram", "Scan cycle wall-clock duration."),
+    "autoremind_cycles_total":            ("counter",   "Scan cycles by result."),
+    "autoremind_reminders_sent_total":    ("counter",   "Reminder mails sent, by yard code."),
+    "autoremind_send_failures_total":     ("counter",   "Reminder sends that raised an error."),
+    "autoremind_reply_detections_total":  ("counter",   "Replies detected, by detection method."),
+    "autoremind_outbox_items":            ("gauge",     "Items waiting in the Outlook Outbox."),
+    "autoremind_com_reconnects_total":    ("counter",   "Outlook COM sessions re-established via Dispatch."),
+    "autoremind_com_stalls_total":        ("counter",   "COM calls that exceeded the watchdog stall threshold."),
+    "autoremind_com_stalls_per_hour":     ("gauge",     "COM stalls observed in the last hour."),
+    "autoremind_com_sessions_abandoned_total": ("counter", "Hung COM sessions abandoned by the watchdog."),
+    "autoremind_com_rate_limit":          ("gauge",     "Low-impact mode: current COM calls/sec allowance."),
+    "autoremind_com_throttle_seconds_total": ("counter", "Low-impact mode: time spent waiting/yielding before COM calls."),
+    "autoremind_com_backoffs_total":      ("counter",   "Low-impact mode: rate halvings due to rising COM latency."),
+    "autoremind_state_keys":              ("gauge",     "Number of keys in state.json."),
+    "autoremind_state_bytes":             ("gauge",     "Size of state.json in bytes."),
+    "autoremind_last_cycle_timestamp_seconds": ("gauge", "Unix time the last cycle finished."),
+    "autoremind_remind_lateness_seconds": ("histogram", "Send() completion minus due_time, by yard code."),
+}
+
+_METRICS_LOCK = threading.Lock()
+_METRIC_VALUES = {}   # (name, labels) -> float
+_METRIC_HISTS = {}    # (name, labels) -> {"buckets": [...], "counts": [...], "sum": f, "count": n}
+
+def _labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+def metric_inc(name, labels=None, n=1):
+    k = (name, _labels_key(labels))
+    with _METRICS_LOCK:
+        _METRIC_VALUES[k] = _METRIC_VALUES.get(k, 0) + n
+
+def metric_set(name, value, labels=None):
+    with _METRICS_LOCK:
+        _METRIC_VALUES[(name, _labels_key(labels))] = value
+
+def metric_observe(name, value, buckets, labels=None):
+    k = (name, _labels_key(labels))
+    with _METRICS_LOCK:
+        h = _METRIC_HISTS.get(k)
+        if h is None:
+            h = _METRIC_HISTS[k] = {"buckets": tuple(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, b in enumerate(h["buckets"]):
+            if value <= b:
+                h["counts"][i] += 1
+        h["sum"] += value
+        h["count"] += 1
+
+def _fmt_labels(pairs):
+    if not pairs: return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+def render_metrics():
+    with _METRICS_LOCK:
+        values = dict(_METRIC_VALUES)
+        hists = {k: {**h, "counts": list(h["counts"])} for k, h in _METRIC_HISTS.items()}
+    out = []
+    for name, (mtype, help_) in METRIC_DEFS.items():
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} {mtype}")
+        if mtype == "histogram":
+            for (n, labels), h in sorted(hists.items()):
+                if n != name: continue
+                for b, c in zip(h["buckets"], h["counts"]):
+                    out.append(f"{name}_bucket{_fmt_labels(labels + (('le', b),))} {c}")
+                out.append(f"{name}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {h['count']}")
+                out.append(f"{name}_sum{_fmt_labels(labels)} {h['sum']:.6f}")
+                out.append(f"{name}_count{_fmt_labels(labels)} {h['count']}")
+        else:
+            for (n, labels), v in sorted(values.items()):
+                if n == name:
+                    out.append(f"{name}{_fmt_labels(labels)} {v}")
+    return "\n".join(out) + "\n"
+
+class _MetricsHandler:
+    # BaseHTTPRequestHandler 와는 기동 시점에 결합 — http.server/http.client(+ssl) 는 서버를 열 때만 import
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404); return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+def start_metrics_server(port):
+    """127.0.0.1 전용 /metrics 서버를 데몬 스레드로 기동 (port=0 이면 비활성)."""
+    if not port:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    try:
+        srv = ThreadingHTTPServer(("127.0.0.1", port),
+                                  type("MetricsHandler", (_MetricsHandler, BaseHTTPRequestHandler), {}))
+        srv.daemon_threads = True
+    except Exception as e:
+        log(f"[WARN] metrics endpoint disabled: {e}", level="WARN")
+        return None
+    threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+    log(f"[INFO] Metrics endpoint: http://127.0.0.1:{port}/metrics")
+    return srv
+
+def _update_health_metrics(src, state):
+    """사이클 끝에 worker(COM 스레드)에서 Outbox/상태 크기 게이지를 갱신."""
+    try:
+        metric_set("autoremind_outbox_items", src.folder_count(src.default_folder(OL_FOLDER_OUTBOX)))
+    except Exception:
+        pass
+    metric_set("autoremind_state_keys", len(state))
+    try:
+        metric_set("autoremind_state_bytes", os.path.getsize(STATE_FILE))
+    except Exception:
+        pass
+
+# ---- Reminder lifecycle trace (lateness SLA)
+# 리마인드 1건마다 due → 감지(detected) → 발송 요청(enqueued) → Send() 완료(sent) → 회신 감지(reply)
+# 시각을 remind_trace.jsonl 에 남기고, sent - due 를 지연(lateness) 히스토그램으로 집계.
+TRACE_FILE = os.path.join(APPDATA_DIR, "remind_trace.jsonl")
+LATENESS_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 14400, 43200, 86400)
+
+_TRACE_LOCK = threading.Lock()
+
+def trace_event(ev, **fields):
+    rec = {"ev": ev}
+    for k, v in fields.items():
+        rec[k] = v.isoformat(timespec="seconds") if isinstance(v, datetime) else v
+    try:
+        with _TRACE_LOCK, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except Exception as e:
+        log(f"[WARN] trace write failed: {e}")
+
+def query_trace(ev=None, key=None, yard=None, since=None):
+    """trace 레코드 조회. key 는 conv key / state key 의 부분 문자열, since 는 datetime."""
+    try:
+        f = open(TRACE_FILE, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if ev and rec.get("ev") != ev: continue
+            if yard and rec.get("yard") != yard: continue
+            if key and key not in (rec.get("key") or "") and key not in (rec.get("state_key") or ""):
+                continue
+            if since:
+                ts = rec.get("sent") or rec.get("detected") or ""
+                if ts < since.isoformat(timespec="seconds"): continue
+            yield rec
+
+def lateness_report(since=None):
+    """yard 별 지연(초) 분포 요약 — --interval-min / --loop-budget-sec 산정용."""
+    by_yard = {}
+    for rec in query_trace(ev="sent", since=since):
+        if rec.get("lateness_sec") is not None:
+            by_yard.setdefault(rec.get("yard") or "-", []).append(rec["lateness_sec"])
+    lines = [f"{'yard':<6} {'n':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (seconds late vs due_time)"]
+    for yard_code, vals in sorted(by_yard.items()):
+        vals.sort()
+        pct = lambda q: vals[min(len(vals) - 1, int(q * len(vals)))]
+        lines.append(f"{yard_code:<6} {len(vals):>6} {pct(0.5):>9.0f} {pct(0.9):>9.0f} {pct(0.99):>9.0f} {vals[-1]:>9.0f}")
+    return "\n".join(lines)
+
+# ---- COM watchdog
+# Outlook 이 바쁘면(모달 대화상자/동기화/PST 압축) COM 호출 하나가 수 분간 블록되는데, loop_budget_sec 는
+# 항목 사이에서만 검사되므로 소용이 없다. ComProxy 가 스레드별 진행 중 호출(op, 시작 시각)을 등록하고
+# 감시 스레드가 경고 임계값 초과 시 스택을 남기고, 포기 임계값 초과 시 세션을 포기한 뒤 새 브로커 스레드로 재연결한다.
+# 블록된 스레드는 강제로 끊을 수 없으므로, 호출이 돌아오는 순간 CycleAbandoned 로 조용히 빠져나간다.
+COM_STALL_WARN_SEC = 30
+COM_STALL_ABANDON_SEC = 180
+COM_WATCHDOG_POLL_SEC = 1.0
+COM_MAX_ABANDONED_THREADS = 3       # 아직 안 돌아온 포기된 브로커 스레드가 이만큼이면 더 포기하지 않고 기다림
+COM_STACK_SAMPLE_FRAMES = 12
+
+class CycleAbandoned(BaseException):
+    """감시 스레드가 포기한 세션의 COM 호출이 돌아왔을 때 발생.
+    사이클 곳곳의 `except Exception` 에 삼켜지지 않도록 BaseException 을 상속한다."""
+
+_COM_INFLIGHT = {}      # thread ident -> [op, t0(monotonic), stage]  stage: 0 정상, 1 경고됨, 2 포기됨
+_COM_STALLS = deque()   # 최근 stall 발생 시각(monotonic)
+_COM_WATCHDOG = None
+_COM_THROTTLE = None    # 저영향 모드일 때 ComThrottle
+
+def _com_enter(op):
+    b = _COM_BROKER
+    if b is not None and b._urgent and b.tid == threading.get_ident():
+        b.pump_urgent()   # 긴 스캔 도중에도 GUI 요청을 COM 호출 사이에 끼워 처리
+    if _COM_THROTTLE is not None:
+        _COM_THROTTLE.acquire()
+    rec = [op, time.monotonic(), 0]
+    _COM_INFLIGHT[threading.get_ident()] = rec
+    return rec
+
+def _com_exit(rec):
+    tid = threading.get_ident()
+    if _COM_INFLIGHT.get(tid) is rec:
+        del _COM_INFLIGHT[tid]
+    if _COM_THROTTLE is not None:
+        _COM_THROTTLE.observe(time.monotonic() - rec[1])
+    if rec[2]:
+        el = time.monotonic() - rec[1]
+        if rec[2] == 2:
+            log(f"[WATCHDOG] abandoned COM call {rec[0]} returned after {el:.0f}s — leaving cycle", level="WARN")
+            raise CycleAbandoned(f"COM call {rec[0]} stalled {el:.0f}s")
+        log(f"[WATCHDOG] COM call {rec[0]} recovered after {el:.1f}s", level="WARN")
+
+def _stack_sample(tid):
+    frame = sys._current_frames().get(tid)
+    if frame is None: return "(no frame)"
+    return "".join(traceback.format_stack(frame)[-COM_STACK_SAMPLE_FRAMES:]).rstrip()
+
+def com_stalls_last_hour():
+    now = time.monotonic()
+    while _COM_STALLS and now - _COM_STALLS[0] > 3600:
+        _COM_STALLS.popleft()
+    return len(_COM_STALLS)
+
+def _com_watchdog_loop(warn_sec, abandon_sec, on_abandon):
+    while not exit_event.wait(COM_WATCHDOG_POLL_SEC):
+        now = time.monotonic()
+        for tid, rec in list(_COM_INFLIGHT.items()):
+            op, t0, stage = rec
+            el = now - t0
+            if stage == 0 and el >= warn_sec:
+                rec[2] = 1
+                _COM_STALLS.append(now)
+                metric_inc("autoremind_com_stalls_total")
+                stat_inc("com_stalls")
+                log(f"[WATCHDOG] COM call {op} in flight for {el:.0f}s (thread {tid})\n{_stack_sample(tid)}",
+                    level="WARN")
+            elif stage == 1 and abandon_sec and el >= abandon_sec:
+                rec[2] = 2
+                metric_inc("autoremind_com_sessions_abandoned_total")
+                log(f"[WATCHDOG] abandoning COM session: {op} blocked {el:.0f}s (thread {tid})", level="ERROR")
+                try:
+                    on_abandon(tid)
+                except Exception as e:
+                    log(f"[WATCHDOG] abandon handler failed: {e}", level="ERROR")
+        metric_set("autoremind_com_stalls_per_hour", com_stalls_last_hour())
+
+def start_com_watchdog(warn_sec=COM_STALL_WARN_SEC, abandon_sec=COM_STALL_ABANDON_SEC, on_abandon=None):
+    """진행 중 COM 호출 감시 스레드 시작 (프로세스당 1개). abandon_sec=0 이면 경고만 한다."""
+    global _COM_WATCHDOG
+    if _COM_WATCHDOG is not None or warn_sec <= 0:
+        return
+    _COM_WATCHDOG = threading.Thread(target=_com_watchdog_loop, name="com-watchdog", daemon=True,
+                                     args=(warn_sec, abandon_sec, on_abandon or (lambda tid: None)))
+    _COM_WATCHDOG.start()
+
+# ---- Low-impact mode (COM 호출 속도 제한)
+# out-of-proc COM 호출은 Outlook UI 스레드(STA)에서 처리되고 입력 메시지보다 먼저 디스패치되므로,
+# 스캔이 쉬지 않고 속성을 읽으면 그동안 Outlook 화면이 멈칫거린다.
+# 토큰 버킷으로 초당 호출 수를 묶고, slice_calls 호출마다 yield_ms 만큼 쉬어 UI 가 입력을 처리할 틈을 주며,
+# 슬라이스 평균 호출 지연이 기준선보다 크게 오르면(= Outlook 이 바쁨) 속도를 절반으로 줄인다 (AIMD).
+LOW_IMPACT_RATE = 4000              # 최대 COM 호출/초
+LOW_IMPACT_BURST = 100
+LOW_IMPACT_SLICE_CALLS = 200
+LOW_IMPACT_YIELD_MS = 10
+LOW_IMPACT_MIN_RATE = 200
+LOW_IMPACT_BACKOFF_RATIO = 2.0      # 슬라이스 평균 지연 > 기준선 × 이 값이면 감속
+LOW_IMPACT_BACKOFF_FLOOR_MS = 2.0   # 단, 이 값 이하의 지연은 무시 (µs 단위 잡음으로 감속하지 않도록)
+
+class ComThrottle:
+    """COM 호출 직전 acquire(), 직후 observe(소요초) — ComProxy(_com_enter/_com_exit)에서만 호출된다.
+    저장소 스캔/회신 검색 스레드가 같은 버킷을 나눠 쓰므로 속도 제한은 프로세스 전체 기준이다."""
+
+    def __init__(self, rate=LOW_IMPACT_RATE, burst=LOW_IMPACT_BURST, slice_calls=LOW_IMPACT_SLICE_CALLS,
+                 yield_ms=LOW_IMPACT_YIELD_MS, min_rate=LOW_IMPACT_MIN_RATE,
+                 backoff_ratio=LOW_IMPACT_BACKOFF_RATIO, backoff_floor_ms=LOW_IMPACT_BACKOFF_FLOOR_MS):
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = float(min(min_rate, rate))
+        self.burst = float(burst)
+        self.slice_calls = max(1, int(slice_calls))
+        self.yield_sec = yield_ms / 1000.0
+        self.backoff_ratio = backoff_ratio
+        self.backoff_floor = backoff_floor_ms / 1000.0
+        self.baseline = None
+        self.backoffs = 0
+        self.slept = 0.0
+        self._tokens = self.burst
+        self._t = time.monotonic()
+        self._n = 0
+        self._lat = 0.0
+        self._lock = threading.Lock()
+
+    def _sleep(self, sec):
+        time.sleep(sec)
+        self.slept += sec
+        stat_inc("throttle_ms", round(sec * 1000))
+        metric_inc("autoremind_com_throttle_seconds_total", n=sec)
+
+    def acquire(self):
+        # 토큰을 먼저 빼고(음수 = 예약) 잠은 락 밖에서 — 여러 스레드가 차례로 줄을 선다
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate) - 1.0
+            self._t = now
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+
+    def observe(self, sec):
+        with self._lock:
+            self._lat += sec
+            self._n += 1
+            if self._n < self.slice_calls:
+                return
+            avg = self._lat / self._n
+            self._n, self._lat = 0, 0.0
+        if self.baseline is not None and avg > max(self.baseline * self.backoff_ratio, self.backoff_floor):
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.backoffs += 1
+            metric_inc("autoremind_com_backoffs_total")
+            if VERBOSE: log(f"[LOW-IMPACT] COM latency {avg * 1000:.1f}ms (baseline {self.baseline * 1000:.1f}ms) → {self.rate:.0f}/s")
+        else:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+        # 지연이 계속 높으면 기준선도 슬라이스당 2% 씩만 따라 올라간다
+        self.baseline = avg if self.baseline is None else min(avg, self.baseline * 1.02)
+        metric_set("autoremind_com_rate_limit", round(self.rate, 1))
+        self._sleep(self.yield_sec)  # batch-then-yield
+
+def set_low_impact(enabled, **kw):
+    """저영향 모드 켜기/끄기 (설정 저장 시 즉시 반영). kw 는 ComThrottle 인자."""
+    global _COM_THROTTLE
+    if not enabled:
+        _COM_THROTTLE = None
+        metric_set("autoremind_com_rate_limit", 0)
+    elif _COM_THROTTLE is None or kw:
+        _COM_THROTTLE = ComThrottle(**kw)
+        metric_set("autoremind_com_rate_limit", _COM_THROTTLE.rate)
+    return _COM_THROTTLE
+
+# ---- COM broker (단일 STA 스레드)
+# Outlook 연결은 브로커 스레드 하나만 소유한다. 스캔 사이클(worker)과 Tk GUI 는 작업을 넣고 Future 로
+# 결과만 받는다. 작업 안에서 com_broker().source() 로 연결을 얻으므로 COM 객체가 다른 아파트로 나가지 않는다.
+# urgent(대화형) 작업은 긴 스캔 작업이 도는 중에도 다음 COM 호출 직전(_com_enter)에 끼어들어 처리된다.
+COM_BROKER_LIVENESS_SEC = 30        # 이만큼 쉬었다가 받은 작업은 먼저 연결이 살아 있는지 확인
+GUI_COM_TIMEOUT_SEC = 10
+
+# 세션이 끊겼다는 뜻의 HRESULT — 다음 작업에서 재연결
+_COM_DISCONNECTED_HRESULTS = {
+    -2147417848,  # RPC_E_DISCONNECTED
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE
+    -2147418105,  # RPC_E_SERVER_DIED
+    -2147418094,  # RPC_E_SERVER_DIED_DNE
+    -2147220995,  # CO_E_OBJNOTCONNECTED
+}
+
+def _is_disconnect_error(e):
+    hr = getattr(e, "hresult", None)
+    if hr is None and getattr(e, "args", None):
+        hr = e.args[0]
+    return hr in _COM_DISCONNECTED_HRESULTS
+
+def _settle(fut, result=None, exc=None):
+    # 포기된 작업의 Future 는 감시 스레드가 먼저 실패 처리하므로 늦게 돌아온 결과는 버린다
+    try:
+        if exc is not None: fut.set_exception(exc)
+        else: fut.set_result(result)
+    except InvalidStateError:
+        pass
+
+class ComBroker:
+    """Outlook 연결을 소유하는 단일 STA 스레드. connect() 는 브로커 스레드에서 호출되어 MailSource 를 돌려준다.
+    submit(fn, *args) 의 fn(*args) 는 브로커 스레드에서 실행된다."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._q = queue.Queue()     # 일반 작업 (스캔 사이클)
+        self._urgent = deque()      # 대화형 작업 (GUI)
+        self._gen = 0
+        self._pumping = False
+        self._current = None        # 진행 중 작업의 Future
+        self._last_used = 0.0
+        self._abandoned = []
+        self.src = None
+        self.tid = None
+        self._start()
+
+    def _start(self):
+        self._gen += 1
+        threading.Thread(target=self._run, args=(self._gen,), name=f"com-broker-{self._gen}", daemon=True).start()
+
+    # -- client side (아무 스레드)
+    def submit(self, fn, *args, urgent=False):
+        fut = Future()
+        job = (fut, fn, args)
+        if urgent:
+            self._urgent.append(job)
+            self._q.put(None)       # 쉬고 있는 브로커 깨우기
+        else:
+            self._q.put(job)
+        return fut
+
+    def call(self, fn, *args, timeout=None, urgent=False):
+        fut = self.submit(fn, *args, urgent=urgent)
+        try:
+            return fut.result(timeout)
+        except FutureTimeout:
+            fut.cancel()
+            raise
+
+    # -- broker thread
+    def _run(self, gen):
+        if pythoncom: pythoncom.CoInitialize()
+        self.tid = threading.get_ident()
+        try:
+            while gen == self._gen and not exit_event.is_set():
+                self.pump_urgent()
+                try:
+                    job = self._q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if job is not None:
+                    self._execute(job)
+        finally:
+            if pythoncom: pythoncom.CoUninitialize()
+
+    def pump_urgent(self):
+        if self._pumping: return
+        self._pumping = True
+        try:
+            while self._urgent:
+                self._execute(self._urgent.popleft())
+        finally:
+            self._pumping = False
+
+    def source(self):
+        """브로커 스레드 전용: 연결된 MailSource (없거나 오래 쉬었다가 끊겼으면 재연결)."""
+        if self.src is not None and time.monotonic() - self._last_used > COM_BROKER_LIVENESS_SEC:
+            try:
+                self.src.ping()
+            except Exception as e:
+                log(f"[BROKER] Outlook session lost ({e}); reconnecting", level="WARN")
+                self.src = None
+        if self.src is None:
+            self.src = self._connect()
+        return self.src
+
+    def _execute(self, job):
+        fut, fn, args = job
+        if not fut.set_running_or_notify_cancel():
+            return
+        prev, self._current = self._current, fut
+        try:
+            _settle(fut, fn(*args))
+        except CycleAbandoned as e:
+            _settle(fut, exc=e)     # 이미 실패 처리됨 — 이 스레드는 루프에서 곧 빠져나간다
+        except BaseException as e:
+            if _is_disconnect_error(e):
+                self.src = None
+            _settle(fut, exc=e)
+        finally:
+            if self._current is fut:
+                self._current = prev
+            self._last_used = time.monotonic()
+
+    # -- watchdog
+    def abandon(self, tid, before_fail=None):
+        """감시 스레드: 브로커 스레드가 COM 호출에서 멈춤 → 진행 중 작업을 실패 처리하고 새 스레드/연결로 교체.
+        before_fail 은 대기 중인 호출자에게 CycleAbandoned 가 전달되기 직전에 실행된다."""
+        if tid != self.tid:
+            return False
+        self._abandoned = [t for t in self._abandoned if t in sys._current_frames()] + [tid]
+        if len(self._abandoned) > COM_MAX_ABANDONED_THREADS:
+            log(f"[WATCHDOG] {len(self._abandoned) - 1} abandoned broker threads still blocked in Outlook — waiting",
+                level="ERROR")
+            self._abandoned.pop()
+            return False
+        fut = self._current
+        self.src = None             # 옛 아파트의 COM 객체는 새 스레드에서 쓸 수 없다
+        self._start()
+        if before_fail: before_fail()
+        if fut is not None:
+            _settle(fut, exc=CycleAbandoned("COM session abandoned by watchdog"))
+        log("[WATCHDOG] started a new COM broker thread with a fresh Outlook session", level="WARN")
+        return True
+
+_COM_BROKER = None
+_COM_BROKER_LOCK = threading.Lock()
+
+def _connect_outlook():
+    return OutlookSource(ComProxy(get_outlook()))
+
+def com_broker():
+    """프로세스 공용 COM 브로커 (첫 호출 시 시작)."""
+    global _COM_BROKER
+    with _COM_BROKER_LOCK:
+        if _COM_BROKER is None:
+            _COM_BROKER = ComBroker(_connect_outlook)
+        return _COM_BROKER
+
+def _marshal_com(obj):
+    """obj 의 아파트에서 호출 → 다른 스레드(CoInitialize 후)에서 한 번 호출해 그 아파트용 참조를 얻는 함수.
+    pywin32 가 없으면(가짜 COM) 객체를 그대로 넘긴다."""
+    raw = _com_unwrap(obj)
+    if pythoncom is None:
+        return lambda: raw
+    stream = pythoncom.CoMarshalInterThreadInterfaceInStream(pythoncom.IID_IDispatch, raw._oleobj_)
+    return lambda: win32.Dispatch(pythoncom.CoGetInterfaceAndReleaseStream(stream, pythoncom.IID_IDispatch))
+
+def _is_com_object(v):
+    return hasattr(v, "_oleobj_")
+
+def _com_unwrap(v):
+    return object.__getattribute__(v, "_obj") if isinstance(v, ComProxy) else v
+
+def _com_wrap(v):
+    return ComProxy(v) if _is_com_object(v) else v
+
+class ComProxy:
+    """win32com 객체를 감싸 속성 읽기/쓰기, 메서드 호출, 열거를 사이클 통계에 집계.
+    반환값이 COM 객체면 다시 감싸므로 하위 객체(Items, Recipients 등)까지 추적된다."""
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj):
+        object.__setattr__(self, "_obj", _com_unwrap(obj))
+
+    def __getattr__(self, name):
+        obj = object.__getattribute__(self, "_obj")
+        rec = _com_enter(name)
+        try:
+            val = getattr(obj, name)
+        finally:
+            _com_exit(rec)
+        if callable(val) and not _is_com_object(val):
+            def _call(*a, **kw):
+                stat_inc("com_calls")
+                rec = _com_enter(name + "()")
+                try:
+                    res = val(*[_com_unwrap(x) for x in a], **{k: _com_unwrap(x) for k, x in kw.items()})
+                finally:
+                    _com_exit(rec)
+                return _com_wrap(res)
+            return _call
+        stat_inc("com_reads")
+        return _com_wrap(val)
+
+    def __setattr__(self, name, value):
+        stat_inc("com_writes")
+        rec = _com_enter(name + "=")
+        try:
+            setattr(object.__getattribute__(self, "_obj"), name, _com_unwrap(value))
+        finally:
+            _com_exit(rec)
+
+    def __iter__(self):
+        it = iter(object.__getattribute__(self, "_obj"))
+        while True:
+            rec = _com_enter("__next__")
+            try:
+                v = next(it)
+            except StopIteration:
+                return
+            finally:
+                _com_exit(rec)
+            stat_inc("items_enumerated")
+            yield _com_wrap(v)
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, "_obj"))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, "_obj") == _com_unwrap(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, "_obj"))
+
+    def __repr__(self):
+        return f"ComProxy({object.__getattribute__(self, '_obj')!r})"
+
+# ---- Mailbox backends (MailSource)
+# 스캔/회신 매칭 로직은 MailSource 만 사용하고, win32com 은 OutlookSource 안에만 둔다.
+# MaildirSource 는 Maildir/EML 디렉터리를 읽어 Outlook 없이(리눅스 헤드리스) 같은 파이프라인을 돌린다.
+# 속성 이름은 Outlook MailItem 이름을 그대로 사용 (Subject, SentOn, ReceivedTime, SenderEmailAddress,
+# SenderName, EntryID, ConversationID, ConversationTopic, Class, Body, HTMLBody, To, CC, BCC)
+# + "MessageID" (PR_INTERNET_MESSAGE_ID).
+
+class ItemProps:
+    """메일 항목 속성의 지연 조회 뷰 — 속성마다 백엔드 조회는 최초 1회만 일어난다."""
+    __slots__ = ("src", "item", "_cache")
+
+    def __init__(self, src, item, known=None):
+        self.src = src
+        self.item = item
+        self._cache = dict(known) if known else {}
+
+    def __getitem__(self, name):
+        c = self._cache
+        if name in c:
+            return c[name]
+        v = c[name] = self.src.read_prop(self.item, name)
+        return v
+
+    def get(self, name, default=None):
+        v = self[name]
+        return default if v is None else v
+
+class MailSource(abc.ABC):
+    """메일함 접근 프로토콜. 폴더 핸들/항목 핸들은 백엔드 고유 객체이며 엔진은 내용을 해석하지 않는다.
+
+    forward() 가 돌려주는 초안은 Outlook MailItem 의 작성용 부분집합
+    (Subject, BodyFormat, HTMLBody, To, CC, BCC, Recipients.Add/ResolveAll, Attachments.Add)을 따른다.
+    abstractmethod 는 모든 백엔드가 구현해야 하고, 나머지는 기본 동작이 있거나(저장소/스레드) 지원하지 않으면
+    NotImplementedError 인 선택 기능(item_by_id, open_item)이다.
+    """
+    name = "base"
+
+    # -- folders
+    @abc.abstractmethod
+    def default_folder(self, kind):
+        """기본 저장소의 OL_FOLDER_* 기본 폴더."""
+        raise NotImplementedError
+    @abc.abstractmethod
+    def outgoing_folders(self, include_deleted=False):
+        """모든 저장소의 보낸 편지함과 그 하위 폴더."""
+        raise NotImplementedError
+    @abc.abstractmethod
+    def mail_folders(self, include_deleted=False):
+        """모든 저장소의 메일 폴더."""
+        raise NotImplementedError
+    @abc.abstractmethod
+    def folder_path(self, folder):
+        raise NotImplementedError
+    @abc.abstractmethod
+    def folder_count(self, folder):
+        raise NotImplementedError
+
+    # -- stores
+    def sent_stores(self):
+        """[(store_id, 표시 이름)] — 보낸 편지함이 있는 저장소, 기본 저장소가 먼저."""
+        return [(None, self.name)]
+    def store_sent_folder(self, store_id):
+        """store_id 저장소의 보낸 편지함 (None = 기본 저장소)."""
+        return self.default_folder(OL_FOLDER_SENT)
+    def for_thread(self):
+        """다른 스레드에서 호출할 '같은 메일함을 여는 함수' (호출할 때마다 하나씩). 스레드 간 사용이 안 되면 None.
+        그 스레드에서 만든 항목은 item_by_id 로 다시 열어야 한다 (반환 소스가 self 이면 항목을 그대로 써도 됨)."""
+        return None
+    def item_by_id(self, entry_id, store_id=None):
+        """EntryID(read_prop(item, "EntryID"))의 항목. store_id 는 sent_stores 의 저장소 (없으면 LookupError)."""
+        raise NotImplementedError(f"{self.name} 메일 원본은 EntryID 로 항목을 열 수 없습니다")
+    def folder_id(self, folder):
+        """다른 스레드의 for_thread() 소스에 넘길 수 있는 폴더 식별자 (기본: 폴더 핸들 그대로)."""
+        return folder
+    def folder_by_id(self, ref):
+        return ref
+
+    # -- items
+    @abc.abstractmethod
+    def items(self, folder, sort=None, descending=True, since=None):
+        """sort 속성 기준 정렬된 항목 이터레이터. since 가 있으면 sort 속성 >= since 만."""
+        raise NotImplementedError
+    @abc.abstractmethod
+    def read_prop(self, item, name):
+        """단일 속성 값 (없거나 실패 시 None)."""
+        raise NotImplementedError
+    def props(self, item):
+        return ItemProps(self, item)
+    def project(self, item, names):
+        return {n: self.read_prop(item, n) for n in names}
+    @abc.abstractmethod
+    def recipients(self, item):
+        """[(원본 주소, 유형 1=To/2=CC/3=BCC, SMTP 또는 None)]"""
+        raise NotImplementedError
+    @abc.abstractmethod
+    def sender_smtp(self, item, sender_addr):
+        raise NotImplementedError
+    @abc.abstractmethod
+    def my_addresses(self):
+        raise NotImplementedError
+    @abc.abstractmethod
+    def self_smtp(self):
+        raise NotImplementedError
+
+    # -- write side
+    @abc.abstractmethod
+    def forward(self, item):
+        raise NotImplementedError
+    @abc.abstractmethod
+    def send(self, draft):
+        raise NotImplementedError
+    @abc.abstractmethod
+    def delete(self, item):
+        raise NotImplementedError
+
+    # -- session / GUI
+    def ping(self):
+        """연결 생존 확인 (끊겼으면 예외)."""
+        return True
+    def open_item(self, entry_id):
+        """EntryID 의 원본 메일을 사용자 화면에 연다."""
+        raise NotImplementedError(f"{self.name} 메일 원본은 원본 메일 열기를 지원하지 않습니다")
+
+class OutlookSource(MailSource):
+    """win32com(Outlook MAPI) 백엔드."""
+    name = "outlook"
+
+    def __init__(self, app):
+        self.app = app
+        self.ns = app.GetNamespace("MAPI")
+        self._me = None
+
+    def default_folder(self, kind):
+        return self.ns.GetDefaultFolder(kind)
+
+    def outgoing_folders(self, include_deleted=False):
+        try:
+            stores = list(self.ns.Stores)
+        except Exception:
+            return
+        deleted_roots = [] if include_deleted else _get_deleted_roots(self.ns)
+        for store in stores:
+            try:
+                sent = store.GetDefaultFolder(OL_FOLDER_SENT)
+            except Exception:
+                continue
+            for f in _walk_folders(sent):
+                try:
+                    if (not include_deleted) and _is_under_deleted(f, deleted_roots):
+                        continue
+                except Exception:
+                    continue
+                yield f
+
+    def mail_folders(self, include_deleted=False):
+        return _all_mail_folders(self.ns, include_deleted=include_deleted)
+
+    def folder_path(self, folder):
+        try: return folder.FolderPath
+        except Exception: return ""
+
+    def folder_count(self, folder):
+        return folder.Items.Count
+
+    def sent_stores(self):
+        try:
+            default_id = self.ns.GetDefaultFolder(OL_FOLDER_SENT).StoreID
+        except Exception:
+            default_id = None
+        out = []
+        for store in self.ns.Stores:
+            try:
+                store.GetDefaultFolder(OL_FOLDER_SENT)
+                out.append((store.StoreID, store.DisplayName))
+            except Exception:
+                continue    # 보낸 편지함이 없는 저장소 (공용 폴더, 일부 PST)
+        out.sort(key=lambda s: s[0] != default_id)
+        return out
+
+    def store_sent_folder(self, store_id):
+        if store_id is None:
+            return self.ns.GetDefaultFolder(OL_FOLDER_SENT)
+        for store in self.ns.Stores:
+            if store.StoreID == store_id:
+                return store.GetDefaultFolder(OL_FOLDER_SENT)
+        raise LookupError("store not found")
+
+    def for_thread(self):
+        get_app = _marshal_com(self.app)
+        return lambda: OutlookSource(ComProxy(get_app()))
+
+    def item_by_id(self, entry_id, store_id=None):
+        return self.ns.GetItemFromID(entry_id, store_id) if store_id else self.ns.GetItemFromID(entry_id)
+
+    def folder_id(self, folder):
+        return folder.EntryID, folder.StoreID
+
+    def folder_by_id(self, ref):
+        return self.ns.GetFolderFromID(*ref)
+
+    def items(self, folder, sort=None, descending=True, since=None):
+        items = folder.Items
+        if sort:
+            if since is not None:   # Restrict 결과에 정렬을 다시 건다 (Restrict 는 원본 정렬을 보장하지 않음)
+                items = items.Restrict(f"[{sort}] >= '" + since.strftime('%m/%d/%Y %I:%M %p') + "'")
+            items.Sort(f"[{sort}]", descending)
+        try:
+            return iter(items)
+        except Exception:
+            return (items.Item(i) for i in range(1, items.Count + 1))
+
+    def read_prop(self, item, name):
+        try:
+            if name == "MessageID":
+                return item.PropertyAccessor.GetProperty(PR_INTERNET_MESSAGE_ID)
+            return getattr(item, name)
+        except Exception:
+            return None
+
+    def recipients(self, item):
+        out = []
+        for r in item.Recipients:
+            try:
+                addr = getattr(r, "Address", None) or getattr(r, "Name", None)
+                out.append((addr, r.Type, resolve_smtp(lambda r=r: r.AddressEntry, address=addr)))
+            except Exception:
+                continue
+        return out
+
+    def sender_smtp(self, item, sender_addr):
+        return resolve_smtp(lambda: item.Sender, address=sender_addr)
+
+    def my_addresses(self):
+        if self._me is None:
+            self._me = my_addresses(self.ns)
+        return self._me
+
+    def self_smtp(self):
+        try:
+            ae = self.app.Session.CurrentUser.AddressEntry
+            return resolve_smtp(ae, address=ae.Address)
+        except Exception:
+            return None
+
+    def forward(self, item):
+        return item.Forward()
+
+    def send(self, draft):
+        draft.Save()
+        draft.Send()
+
+    def delete(self, item):
+        item.Delete()
+
+    def ping(self):
+        return self.app.Version
+
+    def open_item(self, entry_id):
+        self.ns.GetItemFromID(entry_id).Display(False)
+
+# -- Maildir / EML backend
+MAILDIR_FOLDER_NAMES = {
+    OL_FOLDER_SENT:    ("sent", "sent items", "sent mail", "보낸 편지함"),
+    OL_FOLDER_INBOX:   ("inbox", "받은 편지함"),
+    OL_FOLDER_DRAFTS:  ("drafts", "임시 보관함"),
+    OL_FOLDER_DELETED: ("deleted items", "trash", "지운 편지함"),
+    OL_FOLDER_OUTBOX:  ("outbox", "보낼 편지함"),
+}
+_MAILDIR_SUBDIRS = ("cur", "new", "tmp")
+
+class MaildirFolder:
+    __slots__ = ("path", "store", "rel")
+    def __init__(self, path, store, rel):
+        self.path, self.store, self.rel = path, store, rel
+    def __repr__(self):
+        return f"MaildirFolder({self.rel!r})"
+
+class MaildirItem:
+    __slots__ = ("path", "folder", "entry_id", "_hdr", "_props", "_msg")
+    def __init__(self, path, folder, entry_id):
+        self.path, self.folder, self.entry_id = path, folder, entry_id
+        self._hdr = None
+        self._props = None
+        self._msg = None
+
+class _EmlPropertyAccessor:
+    def __init__(self):
+        self.props = {}
+    def SetProperty(self, tag, value):
+        self.props[tag] = value
+    def GetProperty(self, tag):
+        return self.props.get(tag)
+
+class _EmlAttachment:
+    def __init__(self, path=None, data=None, filename=None, mime=None):
+        self.path = path
+        self.data = data
+        self.FileName = filename or (os.path.basename(path) if path else "attachment")
+        self.mime = mime or _guess_mime_from_ext(self.FileName)
+        self.PropertyAccessor = _EmlPropertyAccessor()
+
+class _EmlAttachments:
+    def __init__(self):
+        self._items = []
+    def Add(self, path):
+        att = _EmlAttachment(path=path)
+        self._items.append(att)
+        return att
+    @property
+    def Count(self):
+        return len(self._items)
+    def Item(self, i):
+        return self._items[i - 1]
+    def __iter__(self):
+        return iter(self._items)
+
+class _EmlRecipient:
+    def __init__(self, address, rtype=1):
+        self.Address = self.Name = address
+        self.Type = rtype
+
+class _EmlRecipients:
+    def __init__(self):
+        self._items = []
+    def Add(self, address):
+        r = _EmlRecipient(address)
+        self._items.append(r)
+        return r
+    def ResolveAll(self):
+        return True
+    @property
+    def Count(self):
+        return len(self._items)
+    def Item(self, i):
+        return self._items[i - 1]
+    def __iter__(self):
+        return iter(self._items)
+
+class EmlDraft:
+    """MaildirSource.forward() 초안 — Outlook MailItem 작성용 부분집합."""
+    def __init__(self, subject="", html="", orig=None):
+        self.Subject = subject
+        self.BodyFormat = 2
+        self.HTMLBody = html
+        self.To = ""
+        self.CC = ""
+        self.Recipients = _EmlRecipients()
+        self.Attachments = _EmlAttachments()
+        self.orig = orig
+
+    @property
+    def BCC(self):
+        return "; ".join(r.Address for r in self.Recipients if r.Type == 3)
+
+def _eml_addresses(value):
+    if not value: return []
+    return [(name, addr) for name, addr in email.utils.getaddresses([str(value)]) if addr]
+
+# 절대 경로 -> (mtime_ns, 헤더, 헤더 기반 속성값) — 사이클/회신 확인마다 같은 파일을 다시 파싱하지 않도록.
+# open_mail_source 가 사이클마다 MaildirSource 를 새로 만들므로 인스턴스가 아니라 모듈에 둔다 (mtime 이 바뀌면 다시 파싱).
+_MAILDIR_HDR_CACHE = {}
+
+class MaildirSource(MailSource):
+    """Maildir(cur/new) 또는 .eml 파일 디렉터리 백엔드.
+
+    root 바로 아래에 Sent/Inbox/... 폴더가 있으면 root 하나가 저장소,
+    아니면 root 의 각 하위 디렉터리가 저장소(Outlook 의 Stores)가 된다.
+    보낸 리마인드는 기본 저장소의 Sent 폴더에 .eml 로 기록된다."""
+    name = "maildir"
+
+    def __init__(self, root, me=None):
+        self.root = os.path.abspath(root)
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f"maildir root not found: {self.root}")
+        self._me = {a.lower() for a in (me or [])} or None
+        names = {n.lower() for n in os.listdir(self.root)}
+        known = {n for v in MAILDIR_FOLDER_NAMES.values() for n in v}
+        if names & known:
+            self.stores = [self.root]
+        else:
+            self.stores = sorted(os.path.join(self.root, n) for n in os.listdir(self.root)
+                                 if os.path.isdir(os.path.join(self.root, n)))
+
+    # -- folders
+    def _folder(self, path, store):
+        return MaildirFolder(path, store, os.path.relpath(path, self.root).replace(os.sep, "/"))
+
+    def _store_default(self, store, kind):
+        for n in os.listdir(store):
+            p = os.path.join(store, n)
+            if os.path.isdir(p) and n.lower() in MAILDIR_FOLDER_NAMES.get(kind, ()):
+                return self._folder(p, store)
+        return None
+
+    def _walk(self, folder):
+        stat_inc("folders_visited")
+        yield folder
+        try:
+            names = sorted(os.listdir(folder.path))
+        except Exception:
+            return
+        for n in names:
+            p = os.path.join(folder.path, n)
+            if n in _MAILDIR_SUBDIRS or n.startswith("."):
+                continue
+            if os.path.isdir(p):
+                yield from self._walk(self._folder(p, folder.store))
+
+    def default_folder(self, kind):
+        f = self._store_default(self.stores[0], kind) if self.stores else None
+        if f is None:
+            raise LookupError(f"default folder {kind} not found under {self.root}")
+        return f
+
+    def outgoing_folders(self, include_deleted=False):
+        for store in self.stores:
+            sent = self._store_default(store, OL_FOLDER_SENT)
+            if sent is not None:
+                yield from self._walk(sent)
+
+    def sent_stores(self):
+        return [(store, os.path.basename(store)) for store in self.stores
+                if self._store_default(store, OL_FOLDER_SENT) is not None]
+
+    def store_sent_folder(self, store_id):
+        if store_id is None:
+            return self.default_folder(OL_FOLDER_SENT)
+        f = self._store_default(store_id, OL_FOLDER_SENT)
+        if f is None:
+            raise LookupError(f"sent folder not found under {store_id}")
+        return f
+
+    def for_thread(self):
+        return lambda: self     # 파일만 읽으므로 스레드 간 공유 가능
+
+    def item_by_id(self, entry_id, store_id=None):
+        # EntryID 는 root 기준 상대 경로
+        path = os.path.normpath(os.path.join(self.root, entry_id))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            raise LookupError(f"item not found: {entry_id}")
+        d = os.path.dirname(path)
+        if os.path.basename(d) in _MAILDIR_SUBDIRS:
+            d = os.path.dirname(d)
+        store = next((st for st in self.stores if (d + os.sep).startswith(st + os.sep)), self.root)
+        return MaildirItem(path, self._folder(d, store), entry_id)
+
+    def mail_folders(self, include_deleted=False):
+        for store in self.stores:
+            deleted = self._store_default(store, OL_FOLDER_DELETED)
+            skip = deleted.path + os.sep if (deleted and not include_deleted) else None
+            for f in self._walk(self._folder(store, store)):
+                if skip and (f.path + os.sep).startswith(skip):
+                    continue
+                yield f
+
+    def folder_path(self, folder):
+        return "\\\\" + folder.rel.replace("/", "\\")
+
+    def _files(self, folder):
+        out = []
+        for sub in ("", "cur", "new"):
+            d = os.path.join(folder.path, sub) if sub else folder.path
+            try:
+                names = os.listdir(d)
+            except Exception:
+                continue
+            for n in names:
+                p = os.path.join(d, n)
+                if (sub or n.lower().endswith(".eml")) and os.path.isfile(p):
+                    out.append(p)
+        return out
+
+    def folder_count(self, folder):
+        return len(self._files(folder))
+
+    # -- items
+    def items(self, folder, sort=None, descending=True, since=None):
+        items = []
+        for p in self._files(folder):
+            items.append(MaildirItem(p, folder, os.path.relpath(p, self.root).replace(os.sep, "/")))
+            stat_inc("items_enumerated")
+        if sort:
+            keyed = [(self.read_prop(it, sort), it) for it in items]
+            if since is not None:
+                keyed = [(v, it) for v, it in keyed if v is not None and v >= since]
+            keyed.sort(key=lambda t: t[0] or datetime.min, reverse=descending)
+            items = [it for _, it in keyed]
+        return iter(items)
+
+    def _headers(self, item):
+        if item._hdr is None:
+            mtime = os.stat(item.path).st_mtime_ns
+            cached = _MAILDIR_HDR_CACHE.get(item.path)
+            if cached and cached[0] == mtime:
+                item._hdr, item._props = cached[1], cached[2]
+                return item._hdr
+            with open(item.path, "rb") as f:
+                head = f.read(65536)
+                cut = re.search(rb"\r?\n\r?\n", head)
+                if not cut and len(head) == 65536:
+                    head += f.read()
+            try:
+                item._hdr = email.parser.BytesHeaderParser(policy=email.policy.default).parsebytes(head)
+            except Exception:
+                item._hdr = email.parser.BytesHeaderParser().parsebytes(head)
+            item._props = {}
+            _MAILDIR_HDR_CACHE[item.path] = (mtime, item._hdr, item._props)
+        return item._hdr
+
+    def _message(self, item):
+        if item._msg is None:
+            with open(item.path, "rb") as f:
+                item._msg = email.parser.BytesParser(policy=email.policy.default).parse(f)
+        return item._msg
+
+    @staticmethod
+    def _naive(dt):
+        # 헤더의 시각(aware)은 이 PC 의 로컬 시각으로 맞춘 naive 값으로 (now_naive 와 비교 가능하게)
+        if dt is None: return None
+        return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+    def _date(self, value):
+        try:
+            return self._naive(email.utils.parsedate_to_datetime(str(value))) if value else None
+        except Exception:
+            return None
+
+    def _body(self, item, subtype):
+        try:
+            part = self._message(item).get_body(preferencelist=(subtype,))
+            return part.get_content() if part is not None else None
+        except Exception:
+            return None
+
+    def read_prop(self, item, name):
+        stat_inc("com_reads")
+        try:
+            h = self._headers(item)
+            props = item._props
+            if name in props:
+                return props[name]
+            v = self._header_prop(item, h, name)
+            if name not in ("Body", "HTMLBody"):
+                props[name] = v
+            return v
+        except Exception:
+            return None
+
+    def _header_prop(self, item, h, name):
+        try:
+            if name == "Class":
+                return OL_MAILITEM
+            if name == "Subject":
+                return str(h.get("Subject", "") or "")
+            if name == "SentOn":
+                return self._date(h.get("Date"))
+            if name == "ReceivedTime":
+                rcv = h.get_all("Received") or []
+                if rcv and ";" in str(rcv[0]):
+                    dt = self._date(str(rcv[0]).rsplit(";", 1)[1].strip())
+                    if dt: return dt
+                return self._date(h.get("Date")) or datetime.fromtimestamp(os.path.getmtime(item.path))
+            if name in ("SenderEmailAddress", "SenderName"):
+                addrs = _eml_addresses(h.get("From"))
+                if not addrs: return None
+                return addrs[0][1].lower() if name == "SenderEmailAddress" else (addrs[0][0] or addrs[0][1])
+            if name == "EntryID":
+                return item.entry_id
+            if name == "MessageID":
+                return (str(h.get("Message-ID") or "").strip()) or None
+            if name == "ConversationID":
+                ti = h.get("Thread-Index")
+                if ti:
+                    try: return base64.b64decode(str(ti))[6:22].hex().upper()
+                    except Exception: pass
+                refs = str(h.get("References") or "").split()
+                return refs[0] if refs else self.read_prop(item, "MessageID")
+            if name == "ConversationTopic":
+                topic = h.get("Thread-Topic")
+                if topic: return str(topic)
+                s = str(h.get("Subject", "") or "").strip()
+                changed = True
+                while changed:
+                    changed = False
+                    for p in PREFIXES:
+                        if s.lower().startswith(p):
+                            s = s[len(p):].lstrip(); changed = True; break
+                return s
+            if name in ("To", "CC", "BCC"):
+                return str(h.get({"To": "To", "CC": "Cc", "BCC": "Bcc"}[name]) or "")
+            if name == "Body":
+                return self._body(item, "plain") or ""
+            if name == "HTMLBody":
+                return self._body(item, "html")
+        except Exception:
+            return None
+        return None
+
+    def recipients(self, item):
+        h = self._headers(item)
+        out = []
+        for hdr, rtype in (("To", 1), ("Cc", 2), ("Bcc", 3)):
+            for _, addr in _eml_addresses(h.get(hdr)):
+                out.append((addr.lower(), rtype, addr.lower()))
+        return out
+
+    def sender_smtp(self, item, sender_addr):
+        return sender_addr if _looks_like_smtp(sender_addr) else None
+
+    def my_addresses(self):
+        if self._me is None:
+            # 지정이 없으면 보낸 편지함 발신자(From) 중 가장 많은 주소를 '나'로 간주
+            counts = {}
+            try:
+                for it in self.items(self.default_folder(OL_FOLDER_SENT)):
+                    a = self.read_prop(it, "SenderEmailAddress")
+                    if a: counts[a] = counts.get(a, 0) + 1
+            except Exception:
+                pass
+            self._me = {max(counts, key=counts.get)} if counts else set()
+        return self._me
+
+    def self_smtp(self):
+        me = self.my_addresses()
+        return sorted(me)[0] if me else None
+
+    # -- write side
+    def forward(self, item):
+        h = self._headers(item)
+        html = self._body(item, "html")
+        if html is None:
+            text = self._body(item, "plain") or ""
+            html = "<pre>" + text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;") + "</pre>"
+        subject = str(h.get("Subject", "") or "")
+        hdr_html = ("<div><b>From:</b> {}<br><b>Sent:</b> {}<br><b>To:</b> {}<br><b>Subject:</b> {}</div><br>"
+                    .format(*(str(h.get(k, "") or "").replace("<", "&lt;").replace(">", "&gt;")
+                              for k in ("From", "Date", "To", "Subject"))))
+        draft = EmlDraft(subject=f"FW: {subject}", html=hdr_html + html, orig=item)
+        try:
+            for part in self._message(item).iter_attachments():
+                draft.Attachments._items.append(_EmlAttachment(
+                    data=part.get_content(), filename=part.get_filename(), mime=part.get_content_type()))
+        except Exception:
+            pass
+        return draft
+
+    def send(self, draft):
+        sent = self.default_folder(OL_FOLDER_SENT)
+        msg = email.message.EmailMessage()
+        msg["From"] = self.self_smtp() or "me@localhost"
+        if draft.To: msg["To"] = draft.To
+        if draft.CC: msg["Cc"] = draft.CC
+        if draft.BCC: msg["Bcc"] = draft.BCC
+        msg["Subject"] = draft.Subject
+        msg["Date"] = email.utils.format_datetime(datetime.now().astimezone())
+        msg["Message-ID"] = email.utils.make_msgid(domain="autoremind.local")
+        if isinstance(draft.orig, MaildirItem):
+            omid = self.read_prop(draft.orig, "MessageID")
+            if omid:
+                msg["In-Reply-To"] = omid
+                msg["References"] = omid
+        msg.set_content(re.sub(r"<[^>]+>", "", draft.HTMLBody or ""))
+        msg.add_alternative(draft.HTMLBody or "", subtype="html")
+        html_part = msg.get_payload()[-1]
+        for att in draft.Attachments:
+            data = att.data
+            if data is None and att.path:
+                with open(att.path, "rb") as f:
+                    data = f.read()
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            maintype, _, subtype = (att.mime or "application/octet-stream").partition("/")
+            cid = att.PropertyAccessor.GetProperty(PR_ATTACH_CONTENT_ID)
+            if cid:
+                html_part.add_related(data, maintype=maintype, subtype=subtype or "octet-stream",
+                                      cid=f"<{cid}>", filename=att.FileName)
+            else:
+                msg.add_attachment(data, maintype=maintype, subtype=subtype or "octet-stream",
+                                   filename=att.FileName)
+        name = f"{int(time.time() * 1000)}.{uuid.uuid4().hex[:8]}.autoremind"
+        target_dir = os.path.join(sent.path, "cur") if os.path.isdir(os.path.join(sent.path, "cur")) else sent.path
+        target = os.path.join(target_dir, name + (":2,S" if target_dir.endswith("cur") and os.name != "nt" else ".eml"))
+        tmp = os.path.join(sent.path, "." + name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(msg.as_bytes(policy=email.policy.SMTP))
+        os.replace(tmp, target)
+
+    def delete(self, item):
+        deleted = self._store_default(item.folder.store, OL_FOLDER_DELETED)
+        if deleted is None or (item.folder.path + os.sep).startswith(deleted.path + os.sep):
+            os.remove(item.path)
+        else:
+            os.replace(item.path, os.path.join(deleted.path, os.path.basename(item.path)))
+
+    def open_item(self, entry_id):
+        # 기본 메일 앱으로 연다. cur/new 의 Maildir 파일은 확장자가 없으므로 .eml 사본으로
+        path = self.item_by_id(entry_id).path
+        if not path.lower().endswith(".eml"):
+            import tempfile
+            tmp = os.path.join(tempfile.gettempdir(), f"autoremind_{os.path.basename(path).split(':')[0]}.eml")
+            shutil.copyfile(path, tmp)
+            path = tmp
+        if os.name == "nt":
+            os.startfile(path)
+        else:
+            subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# -- Session record / replay
+# --record: 한 사이클 동안 MailSource 호출(= OutlookSource 에서는 그 뒤의 COM 호출)의 인자/반환값/소요시간을
+#   익명화해서 gzip JSON 한 파일로 저장. 폴더 트리, 정렬 뷰별 항목 순서, 읽힌 속성값, 수신인, 호출별 시간 샘플.
+# --replay: 그 파일로 ReplaySource 를 만들어 같은 메일함 모양에 대해 사이클을 다시 돌린다 (Outlook 불필요).
+# 항목 식별자는 (폴더, 정렬 속성, 방향, 순번). since 필터 뷰는 같은 정렬 뷰의 앞부분이므로 같은 식별자를 쓴다.
+RECORDING_VERSION = 1
+REC_SAMPLES_PER_OP = 2000           # op 별 시간 샘플 상한 (reservoir)
+_REC_DATETIME_PROPS = ("SentOn", "ReceivedTime")
+_REC_SUBJECT_PROPS = ("Subject", "ConversationTopic")
+_REC_ADDR_PROPS = ("SenderEmailAddress",)
+_REC_ADDR_LIST_PROPS = ("To", "CC", "BCC")
+_REC_ID_PROPS = ("EntryID", "MessageID", "ConversationID")
+_REC_LENGTH_PROPS = ("Body", "HTMLBody")
+_REC_KNOWN_FOLDERS = {n for v in MAILDIR_FOLDER_NAMES.values() for n in v} | {"sent items", "deleted items"}
+
+class _Anonymizer:
+    """키 있는 해시(키는 저장하지 않음)로 주소/제목/ID 를 치환. 같은 값 → 같은 토큰이라
+    회신 매칭(주소 일치, 정규화 제목 일치)과 state 키 관계는 유지된다."""
+
+    def __init__(self):
+        import hashlib
+        self._key = os.urandom(16)
+        self._blake = hashlib.blake2s
+
+    def _h(self, s, n=10):
+        return self._blake(s.encode("utf-8"), key=self._key, digest_size=16).hexdigest()[:n]
+
+    def addr(self, a):
+        if not a: return a
+        a = a.strip().lower()
+        if "@" in a and not a.startswith("/"):
+            dom = a.rsplit("@", 1)[1]
+            return f"u{self._h(a, 8)}@d{self._h(dom, 6)}.example"
+        if a.startswith("/o="):
+            return f"/o=anon/ou=exchange/cn=recipients/cn={self._h(a, 12)}"
+        return f"n{self._h(a, 10)}"
+
+    def addr_list(self, s):
+        if not s: return s
+        return "; ".join(self.addr(x) for x in re.split(r"[;,]", s) if x.strip())
+
+    def name(self, s):
+        return f"p{self._h(s.strip().lower(), 8)}" if s else s
+
+    def ident(self, s):
+        if not s: return s
+        if s.startswith("<") and "@" in s:
+            return f"<{self._h(s, 16)}@anon.example>"
+        return self._h(s, 24).upper()
+
+    def text(self, seg):
+        seg = re.sub(r"\s+", " ", seg).strip().lower()
+        if not seg: return ""
+        return f"s{self._h(seg, 6 if len(seg) < 8 else 12)}"
+
+    def subject(self, s):
+        """접두어(RE:/답장:/…), 태그 문법에 맞는 [야드/상태 태그] 와 [Remind] 는 그대로, 나머지는 단어마다 해시 토큰으로.
+        단어 단위라 회신 매칭의 부분 문자열 비교(base in can)는 단어 경계에서만 유지된다 — 원본에서 단어 중간에서
+        맞던 제목(요청 ⊂ 요청드립니다)은 재생에서 맞지 않고, 토큰이 7자 이상이라 짧은 제목의 완전 일치 규칙도 달라질 수 있다.
+        태그가 아닌 괄호 조각([프로젝트 X])은 괄호째 하나의 토큰."""
+        if not s: return s
+        out = []
+        rest = s.strip()
+        changed = True
+        while changed:
+            changed = False
+            for p in PREFIXES:
+                if rest.lower().startswith(p):
+                    out.append(rest[:len(p)])
+                    rest = rest[len(p):].lstrip()
+                    changed = True
+                    break
+        for part in re.split(r"(\[[^\]]*\]|［[^］]*］)", rest):
+            if not part.strip():
+                continue
+            if part[:1] in "[［":
+                part = part.strip()
+                keep = _TAGS.regex.fullmatch(part) or re.fullmatch(r"\[\s*remind\s*\]", part, re.I)
+                out.append(part if keep else self.text(part))
+            else:
+                out.extend(self.text(w) for w in part.split())
+        return " ".join(out)
+
+    def folder_name(self, name):
+        return name if (name or "").strip().lower() in _REC_KNOWN_FOLDERS else f"f{self._h(name or '', 6)}"
+
+    def folder_path(self, path):
+        parts = [p for p in (path or "").split("\\") if p]
+        if not parts: return path
+        return "\\\\" + "\\".join([f"store-{self._h(parts[0], 6)}"] + [self.folder_name(p) for p in parts[1:]])
+
+    def prop(self, name, v):
+        if v is None: return None
+        if name in _REC_DATETIME_PROPS:
+            v = to_local_naive(v) if isinstance(v, datetime) else v
+            return v.isoformat() if isinstance(v, datetime) else None
+        if name in _REC_SUBJECT_PROPS: return self.subject(str(v))
+        if name in _REC_ADDR_PROPS: return self.addr(str(v))
+        if name in _REC_ADDR_LIST_PROPS: return self.addr_list(str(v))
+        if name in _REC_ID_PROPS: return self.ident(str(v))
+        if name == "SenderName": return self.name(str(v))
+        if name in _REC_LENGTH_PROPS: return {"len": len(str(v))}
+        return v if isinstance(v, (int, float, str, bool)) else str(v)
+
+class _RecItem:
+    __slots__ = ("iid", "inner")
+    def __init__(self, iid, inner):
+        self.iid, self.inner = iid, inner
+
+class _RecFolder:
+    __slots__ = ("fid", "inner")
+    def __init__(self, fid, inner):
+        self.fid, self.inner = fid, inner
+
+class RecordingSource(MailSource):
+    """다른 MailSource 를 감싸 호출을 기록. save(path) 로 익명화된 녹화 파일 생성."""
+    name = "recording"
+
+    def __init__(self, inner):
+        import random
+        self.inner = inner
+        self.anon = _Anonymizer()
+        self._rnd = random.Random(0)
+        self.folders = {}          # fid -> {"path":..., "count":...}
+        self._fid_by_path = {}
+        self.default = {}
+        self.outgoing = {}
+        self.mailf = {}
+        self.views = {}            # view key -> 본 항목 수
+        self.items_rec = {}        # iid -> {"p": {...}, "r": [...], "ss": {...}}
+        self.timings = {}          # op -> [ms, ...]
+        self._seen = {}            # op -> 호출 수 (reservoir 용)
+        self.me = None
+        self.me_smtp = None
+
+    def _time(self, op, t0):
+        ms = round((time.perf_counter() - t0) * 1000.0, 3)
+        n = self._seen[op] = self._seen.get(op, 0) + 1
+        samples = self.timings.setdefault(op, [])
+        if len(samples) < REC_SAMPLES_PER_OP:
+            samples.append(ms)
+        else:
+            j = self._rnd.randrange(n)
+            if j < REC_SAMPLES_PER_OP:
+                samples[j] = ms
+
+    def _wrap_folder(self, f):
+        t0 = time.perf_counter()
+        path = self.inner.folder_path(f)
+        self._time("folder_path", t0)
+        fid = self._fid_by_path.get(path)
+        if fid is None:
+            fid = self._fid_by_path[path] = f"F{len(self._fid_by_path)}"
+            self.folders[fid] = {"path": self.anon.folder_path(path)}
+        return _RecFolder(fid, f)
+
+    def _rec(self, iid):
+        r = self.items_rec.get(iid)
+        if r is None:
+            r = self.items_rec[iid] = {"p": {}}
+        return r
+
+    # -- folders
+    def default_folder(self, kind):
+        t0 = time.perf_counter()
+        f = self.inner.default_folder(kind)
+        self._time("default_folder", t0)
+        rf = self._wrap_folder(f)
+        self.default[str(kind)] = rf.fid
+        return rf
+
+    def _folder_list(self, op, it, store):
+        fids = []
+        while True:
+            t0 = time.perf_counter()
+            try:
+                f = next(it)
+            except StopIteration:
+                break
+            self._time(op, t0)
+            rf = self._wrap_folder(f)
+            fids.append(rf.fid)
+            yield rf
+        store[op] = fids
+
+    def outgoing_folders(self, include_deleted=False):
+        return self._folder_list(f"outgoing_folders.{int(bool(include_deleted))}",
+                                 iter(self.inner.outgoing_folders(include_deleted)), self.outgoing)
+
+    def mail_folders(self, include_deleted=False):
+        return self._folder_list(f"mail_folders.{int(bool(include_deleted))}",
+                                 iter(self.inner.mail_folders(include_deleted)), self.mailf)
+
+    def folder_path(self, folder):
+        return self.folders[folder.fid]["path"]
+
+    def folder_count(self, folder):
+        t0 = time.perf_counter()
+        n = self.inner.folder_count(folder.inner)
+        self._time("folder_count", t0)
+        self.folders[folder.fid]["count"] = n
+        return n
+
+    # -- items
+    def items(self, folder, sort=None, descending=True, since=None):
+        vkey = f"{folder.fid}|{sort or ''}|{int(bool(descending))}"
+        if since is not None and not descending:
+            vkey += "|" + since.isoformat()
+        t0 = time.perf_counter()
+        it = iter(self.inner.items(folder.inner, sort=sort, descending=descending, since=since))
+        self._time("items.open", t0)
+        return self._iter_items(vkey, it, sort)
+
+    def _iter_items(self, vkey, it, sort):
+        i = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                inner = next(it)
+            except StopIteration:
+                break
+            self._time("items.next", t0)
+            iid = f"{vkey}#{i}"
+            i += 1
+            if i > self.views.get(vkey, 0):
+                self.views[vkey] = i
+            ri = _RecItem(iid, inner)
+            if sort and sort not in self._rec(iid)["p"]:
+                # 재생 시 since 필터/정렬에 쓰도록 정렬 속성은 항상 남긴다 (시간 샘플에는 넣지 않음)
+                self._rec(iid)["p"][sort] = self.anon.prop(sort, self.inner.read_prop(inner, sort))
+            yield ri
+
+    def read_prop(self, item, name):
+        t0 = time.perf_counter()
+        v = self.inner.read_prop(item.inner, name)
+        self._time(f"read_prop.{name}", t0)
+        p = self._rec(item.iid)["p"]
+        if name not in p:
+            p[name] = self.anon.prop(name, v)
+        return v
+
+    def recipients(self, item):
+        t0 = time.perf_counter()
+        out = self.inner.recipients(item.inner)
+        self._time("recipients", t0)
+        a = self.anon.addr
+        self._rec(item.iid)["r"] = [[a(addr), rtype, a(smtp) if smtp else None] for addr, rtype, smtp in out]
+        return out
+
+    def sender_smtp(self, item, sender_addr):
+        t0 = time.perf_counter()
+        v = self.inner.sender_smtp(item.inner, sender_addr)
+        self._time("sender_smtp", t0)
+        self._rec(item.iid).setdefault("ss", {})[self.anon.addr(sender_addr)] = self.anon.addr(v) if v else None
+        return v
+
+    def my_addresses(self):
+        t0 = time.perf_counter()
+        me = self.inner.my_addresses()
+        self._time("my_addresses", t0)
+        self.me = sorted(self.anon.addr(a) for a in me)
+        return me
+
+    def self_smtp(self):
+        t0 = time.perf_counter()
+        v = self.inner.self_smtp()
+        self._time("self_smtp", t0)
+        self.me_smtp = self.anon.addr(v) if v else None
+        return v
+
+    # -- write side
+    def forward(self, item):
+        t0 = time.perf_counter()
+        d = self.inner.forward(item.inner)
+        self._time("forward", t0)
+        return d
+
+    def send(self, draft):
+        t0 = time.perf_counter()
+        self.inner.send(draft)
+        self._time("send", t0)
+
+    def delete(self, item):
+        t0 = time.perf_counter()
+        self.inner.delete(item.inner)
+        self._time("delete", t0)
+
+    def open_item(self, entry_id):
+        # GUI 동작이라 녹화하지 않음
+        return self.inner.open_item(entry_id)
+
+    def save(self, path):
+        rec = {
+            "version": RECORDING_VERSION,
+            "created_at": now_naive().isoformat(timespec="seconds"),
+            "backend": getattr(self.inner, "name", "?"),
+            "default": self.default,
+            "folders": self.folders,
+            "outgoing": self.outgoing,
+            "mail_folders": self.mailf,
+            "views": self.views,
+            "items": self.items_rec,
+            "me": self.me,
+            "self_smtp": self.me_smtp,
+            "timings": self.timings,
+            "calls": self._seen,
+        }
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(rec, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return {"items": len(self.items_rec), "folders": len(self.folders), "calls": sum(self._seen.values()),
+                "bytes": os.path.getsize(path)}
+
+class ReplaySource(MailSource):
+    """RecordingSource.save() 파일을 재생. speed=1 이면 녹화된 호출 시간 샘플만큼 대기, 0 이면 대기 없음.
+    녹화 때 읽히지 않은 속성은 None (replay_misses 로 집계)."""
+    name = "replay"
+
+    def __init__(self, path, speed=1.0, seed=0):
+        import random
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rec = json.load(f)
+        if rec.get("version") != RECORDING_VERSION:
+            raise ValueError(f"unsupported recording version: {rec.get('version')}")
+        self.rec = rec
+        self.speed = speed
+        self._rnd = random.Random(seed)
+        self._items = rec["items"]
+        self.sent_log = []
+        self.misses = 0
+        self._debt = 0.0
+        self._by_eid = None
+
+    def _wait(self, op):
+        if not self.speed:
+            return
+        samples = self.rec["timings"].get(op)
+        if samples:
+            # µs 단위 호출마다 sleep 하면 sleep 오버헤드가 지배하므로 1ms 이상 쌓였을 때만 대기
+            self._debt += self._rnd.choice(samples) * self.speed / 1000.0
+            if self._debt >= 0.001:
+                t0 = time.perf_counter()
+                time.sleep(self._debt)
+                self._debt -= time.perf_counter() - t0
+
+    def _value(self, iid, name):
+        p = self._items.get(iid, {}).get("p", {})
+        if name not in p:
+            self.misses += 1
+            stat_inc("replay_misses")
+            return None
+        v = p[name]
+        if name in _REC_DATETIME_PROPS and v:
+            return datetime.fromisoformat(v)
+        if name in _REC_LENGTH_PROPS and isinstance(v, dict):
+            n = v.get("len", 0)
+            return "<p>" + "x" * max(0, n - 7) + "</p>" if name == "HTMLBody" else "x" * n
+        return v
+
+    # -- folders
+    def default_folder(self, kind):
+        self._wait("default_folder")
+        fid = self.rec["default"].get(str(kind))
+        if fid is None:
+            raise LookupError(f"default folder {kind} not in recording")
+        return fid
+
+    def _folder_iter(self, op, table):
+        for fid in table.get(op, []):
+            self._wait(op)
+            stat_inc("folders_visited")
+            yield fid
+
+    def outgoing_folders(self, include_deleted=False):
+        return self._folder_iter(f"outgoing_folders.{int(bool(include_deleted))}", self.rec["outgoing"])
+
+    def mail_folders(self, include_deleted=False):
+        return self._folder_iter(f"mail_folders.{int(bool(include_deleted))}", self.rec["mail_folders"])
+
+    def folder_path(self, folder):
+        return self.rec["folders"].get(folder, {}).get("path", folder)
+
+    def folder_count(self, folder):
+        self._wait("folder_count")
+        return self.rec["folders"].get(folder, {}).get("count", 0)
+
+    # -- items
+    def items(self, folder, sort=None, descending=True, since=None):
+        self._wait("items.open")
+        vkey = f"{folder}|{sort or ''}|{int(bool(descending))}"
+        if since is not None and not descending:
+            vkey += "|" + since.isoformat()
+        iids = [f"{vkey}#{i}" for i in range(self.rec["views"].get(vkey, 0))]
+        if sort and since is not None:
+            keep = []
+            for iid in iids:
+                v = self._items.get(iid, {}).get("p", {}).get(sort)
+                if v is None or datetime.fromisoformat(v) >= since:
+                    keep.append(iid)
+            iids = keep
+        return self._iter(iids)
+
+    def _iter(self, iids):
+        for iid in iids:
+            self._wait("items.next")
+            stat_inc("items_enumerated")
+            yield iid
+
+    def read_prop(self, item, name):
+        self._wait(f"read_prop.{name}")
+        stat_inc("com_reads")
+        return self._value(item, name)
+
+    def recipients(self, item):
+        self._wait("recipients")
+        return [tuple(r) for r in self._items.get(item, {}).get("r", [])]
+
+    def sender_smtp(self, item, sender_addr):
+        self._wait("sender_smtp")
+        return self._items.get(item, {}).get("ss", {}).get(sender_addr)
+
+    def my_addresses(self):
+        self._wait("my_addresses")
+        return set(self.rec.get("me") or [])
+
+    def self_smtp(self):
+        self._wait("self_smtp")
+        return self.rec.get("self_smtp")
+
+    # -- write side
+    def forward(self, item):
+        self._wait("forward")
+        p = self._items.get(item, {}).get("p", {})
+        n = (p.get("HTMLBody") or {}).get("len", 2048)
+        return EmlDraft(subject="FW: " + (p.get("Subject") or ""), html="<p>" + "x" * n + "</p>", orig=item)
+
+    def send(self, draft):
+        self._wait("send")
+        self.sent_log.append((draft.Subject, draft.To, draft.BCC))
+
+    def delete(self, item):
+        self._wait("delete")
+
+    def item_by_id(self, entry_id, store_id=None):
+        # 녹화의 (익명화된) EntryID → 그 항목이 처음 나온 뷰의 iid. 원본 메일 열기(open_item)는 내용이 없어 지원하지 않음
+        if self._by_eid is None:
+            self._by_eid = {}
+            for iid, it in self._items.items():
+                eid = it.get("p", {}).get("EntryID")
+                if eid:
+                    self._by_eid.setdefault(eid, iid)
+        iid = self._by_eid.get(entry_id)
+        if iid is None:
+            raise LookupError(f"item not in recording: {entry_id}")
+        return iid
+
 def _safe_recipients_from(original_item):
     def _names_from(recips, t=1):
         out=[]
@@ -644,12 +3131,7 @@ def _safe_recipients_from(original_item):
             if getattr(r,"Type",1)!=t: continue
             addr=None
             try:
-                ae=r.AddressEntry
-                if ae and ae.Type=="EX":
-                    ex=ae.GetExchangeUser()
-                    if ex and ex.PrimarySmtpAddress: addr=ex.PrimarySmtpAddress
-                elif ae:
-                    addr=ae.Address
+                addr=resolve_smtp(lambda r=r: r.AddressEntry, address=r.Address, name=r.Name)
             except Exception:
                 pass
             if not addr: addr=getattr(r,"Name",None)
@@ -664,45 +3146,50 @@ def _safe_recipients_from(original_item):
     if (not cc_list) and raw_cc: cc_list=[raw_cc]
     return "; ".join([x for x in to_list if x]), "; ".join([x for x in cc_list if x])
 
-def send_remind_for_recipients(app, item, subject, body, yard_code, state, dry_run=False, verbose=False):
-    def _self_smtp():
-        try:
-            ae = app.Session.CurrentUser.AddressEntry
-            exu = ae.GetExchangeUser()
-            return (exu.PrimarySmtpAddress if exu else ae.Address) or None
-        except Exception:
-            return None
-
+REMIND_WRAP_OPEN  = "<div style='font-family:Malgun Gothic,Segoe UI,Arial,sans-serif; font-size:10pt;'>"
+REMIND_WRAP_CLOSE = "</div><br>"
+
+def _compose_forward_html(fwd, remind_html):
+    """fwd.HTMLBody 를 한 번만 읽고(COM), Python 에서 전부 가공한 뒤 한 번만 기록.
+    HTMLBody 는 BSTR(UTF-16)로 프로세스 간 마샬링되므로 바이트 수는 글자 수 x2 로 집계."""
+    t0 = time.perf_counter()
+    orig = fwd.HTMLBody or ""
+    t1 = time.perf_counter()
+    html = REMIND_WRAP_OPEN + remind_html + REMIND_WRAP_CLOSE + orig
+    html = _sanitize_bad_cids(_attach_images_and_rewrite_html(fwd, html))
+    t2 = time.perf_counter()
+    fwd.HTMLBody = html
+    t3 = time.perf_counter()
+    return {
+        "read_bytes": len(orig) * 2,
+        "write_bytes": len(html) * 2,
+        "read_ms": (t1 - t0) * 1000.0,
+        "xform_ms": (t2 - t1) * 1000.0,
+        "write_ms": (t3 - t2) * 1000.0,
+    }
+
+def send_remind_for_recipients(src, mail, subject, body, yard_code, state, dry_run=False, verbose=False, trace=None):
+    """mail: src.props() 뷰"""
     try:
-        recipients = []
-        for r in item.Recipients:
-            try:
-                if r.Type in (1, 3):
-                    addr = getattr(r, "Address", None) or getattr(r, "Name", None)
-                    if addr:
-                        recipients.append((addr, r.Type))
-            except Exception:
-                continue
+        recipients = [(addr, rtype, smtp or addr)
+                      for addr, rtype, smtp in src.recipients(mail.item) if rtype in (1, 3) and addr]
 
         if not recipients:
             if verbose: log("[WARN] no To/BCC recipients on original mail")
             return False
 
-        remind_text = load_body_map().get("remind_message", body or "")
+        remind_text = body or load_body_map().get("remind_message", "")
         remind_html = format_body_text(remind_text)
 
-        me_addr = _self_smtp() or getattr(item, "SenderEmailAddress", None) or "me@example.com"
+        me_addr = src.self_smtp() or mail["SenderEmailAddress"] or "me@example.com"
         sent_any = False
 
                 # ✅ [추가] 발송 취소된 key 목록 불러오기
-        try:
-            st_snapshot = load_state()
-        except Exception:
-            st_snapshot = {}
+        st_snapshot = load_state()    # 읽기 실패 시 취소 목록 없이 보내지 않도록 그대로 실패
         cancelled_keys = set(st_snapshot.get("__cancelled_keys__", []))
 
-        for addr, rtype in recipients:
-            state_key = make_state_key(item.EntryID, addr)
+        for addr, rtype, send_addr in recipients:
+            state_key = make_state_key(mail["EntryID"], addr)
              # ✅ 이번 메일(EntryID|email)만 취소되어 있으면 무조건 스킵
             if state_key in cancelled_keys:
                 log(f"[CANCELLED-SKIP] {state_key} is cancelled; skip sending.")
@@ -711,22 +3198,20 @@ def send_remind_for_recipients(app, item, subject, body, yard_code, state, dry_r
             if state.get(state_key, {}).get("reply_received", False):
                 continue
 
-            fwd = item.Forward()
+            fwd = src.forward(mail.item)
             fwd.Subject = f"[Remind] {subject}"
             fwd.BodyFormat = 2  # HTML
-            fwd.HTMLBody = (
-                "<div style='font-family:Malgun Gothic,Segoe UI,Arial,sans-serif; font-size:10pt;'>"
-                f"{remind_html}"
-                "</div><br>" + fwd.HTMLBody
-            )
-            fwd.HTMLBody = _sanitize_bad_cids(_attach_images_and_rewrite_html(fwd, fwd.HTMLBody))
+            cst = _compose_forward_html(fwd, remind_html)
+            log(f"[COMPOSE] marshalled={cst['read_bytes'] + cst['write_bytes']}B "
+                f"(read={cst['read_bytes']}B, write={cst['write_bytes']}B) | "
+                f"read={cst['read_ms']:.1f}ms xform={cst['xform_ms']:.1f}ms write={cst['write_ms']:.1f}ms")
 
             if rtype == 1:      # To
-                fwd.To = addr
+                fwd.To = send_addr
             else:               # BCC
                 if not fwd.To:
                     fwd.To = me_addr
-                recip = fwd.Recipients.Add(addr)
+                recip = fwd.Recipients.Add(send_addr)
                 recip.Type = 3
 
             try:
@@ -739,9 +3224,15 @@ def send_remind_for_recipients(app, item, subject, body, yard_code, state, dry_r
                 continue
 
             try:
-                fwd.Save()
-                fwd.Send()
+                src.send(fwd)
                 sent_any = True
+                metric_inc("autoremind_reminders_sent_total", {"yard": yard_code})
+                if trace:
+                    sent_at = now_naive()
+                    lateness = (sent_at - trace["due"]).total_seconds()
+                    trace_event("sent", state_key=state_key, sent=sent_at, lateness_sec=round(lateness, 1), **trace)
+                    metric_observe("autoremind_remind_lateness_seconds", max(0.0, lateness),
+                                   LATENESS_BUCKETS, {"yard": yard_code})
                 ts = now_naive().isoformat()
                 state[state_key] = {"reply_received": False, "last_sent": ts, "subject": subject}
                 save_state(state)  # <- 반드시 즉시 디스크 반영
@@ -750,6 +3241,7 @@ def send_remind_for_recipients(app, item, subject, body, yard_code, state, dry_r
                 log(f"[SENT] To={fwd.To}, CC={fwd.CC}, BCC={fwd.BCC} | {fwd.Subject} ({yard_code})")
                 log(f"[STATE-UPD] {state_key} reply_received=False last_sent={ts}")
             except Exception as e:
+                metric_inc("autoremind_send_failures_total")
                 log(f"[ERR-SEND] {e}")
 
         return True if (dry_run or sent_any) else False
@@ -759,40 +3251,42 @@ def send_remind_for_recipients(app, item, subject, body, yard_code, state, dry_r
         return False
 
 def is_empty_draft(item):
+    """item: src.props() 뷰"""
     try:
-        if getattr(item, "Class", None) != OL_MAILITEM:
+        if item["Class"] != OL_MAILITEM:
             return False
-        subj = (item.Subject or "").strip().lower()
-        body = (item.Body or "").strip()
-        to   = (item.To or "").strip()
-        cc   = (item.CC or "").strip()
+        body = (item["Body"] or "").strip()
+        to   = (item["To"] or "").strip()
+        cc   = (item["CC"] or "").strip()
         if not body and not to and not cc:
             return True
         return False
     except Exception:
         return False
 
-def cleanup_empty_drafts_and_deleted(ns, verbose=False):
+def cleanup_empty_drafts_and_deleted(src, verbose=False):
     removed = 0
     scanned = 0
     try:
-        drafts = ns.GetDefaultFolder(OL_FOLDER_DRAFTS)
-        for item in list(drafts.Items):
+        drafts = src.default_folder(OL_FOLDER_DRAFTS)
+        for item in list(src.items(drafts)):
             scanned += 1
-            if is_empty_draft(item):
-                if verbose: log(f"[CLEANUP] Removing from Drafts: {item.Subject}")
-                item.Delete()
+            p = src.props(item)
+            if is_empty_draft(p):
+                if verbose: log(f"[CLEANUP] Removing from Drafts: {p['Subject']}")
+                src.delete(item)
                 removed += 1
     except Exception as e:
         if verbose: log(f"[CLEANUP-ERR] Drafts: {e}")
 
     try:
-        deleted = ns.GetDefaultFolder(OL_FOLDER_DELETED)
-        for item in list(deleted.Items):
+        deleted = src.default_folder(OL_FOLDER_DELETED)
+        for item in list(src.items(deleted)):
             scanned += 1
-            if is_empty_draft(item):
-                if verbose: log(f"[CLEANUP] Purging from Deleted Items: {item.Subject}")
-                item.Delete()
+            p = src.props(item)
+            if is_empty_draft(p):
+                if verbose: log(f"[CLEANUP] Purging from Deleted Items: {p['Subject']}")
+                src.delete(item)
                 removed += 1
     except Exception as e:
         if verbose: log(f"[CLEANUP-ERR] Deleted: {e}")
@@ -800,218 +3294,748 @@ def cleanup_empty_drafts_and_deleted(ns, verbose=False):
     if verbose:
         log(f"[CLEANUP] scanned={scanned}, fully removed={removed}")
 
-def cycle_once(ns, app, state, lookback_days, dry_run, force_send, skip_reply_check, verbose,
-               include_self, due_from_last, reply_mode, include_deleted, precheck_epsilon_sec, loop_budget_sec, max_age_hours, skip_if_newer_outgoing):
-    sent = ns.GetDefaultFolder(OL_FOLDER_SENT)
-    items = sent.Items; items.Sort("SentOn", True)
+# ---- 닫힌 스레드 (negative cache)
+# state["__closed__"] = {EntryID: {why: replied|cancelled, at, canon}}. Sent 스캔은 EntryID 만 읽고 건너뛰고,
+# 같은 스레드(정규화 제목)에 닫힌 뒤 새 발신 메일이 생기면 다시 연다. lookback 밖의 메일은 items(since=) 로 제외.
+def close_thread(state, entry_id, why, subject):
+    if entry_id:
+        state.setdefault("__closed__", {})[entry_id] = {
+            "why": why, "at": now_naive().isoformat(timespec="seconds"), "canon": canonicalize_subject(subject)}
+        stat_inc("threads_closed")
+
+def closed_threads_by_canon(closed):
+    out = {}
+    for eid, c in closed.items():
+        if c.get("canon"):
+            out.setdefault(c["canon"], []).append(eid)
+    return out
+
+def reopen_threads(state, by_canon, subject, sent_on, verbose=False):
+    """subject 가 닫힌 스레드와 같고 닫힌 시각 이후에 보낸 메일이면 그 스레드들을 다시 연다 (다시 연 수 반환)."""
+    eids = by_canon.get(canonicalize_subject(subject))
+    if not eids:
+        return 0
+    so = sent_on()
+    closed = state["__closed__"]
+    reopen = [e for e in eids if so and e in closed and so > datetime.fromisoformat(closed[e]["at"])]
+    for eid in reopen:
+        del closed[eid]
+        eids.remove(eid)
+        stat_inc("threads_reopened")
+        if verbose: log(f"[REOPEN] new outgoing in closed thread '{subject}' (sent {so:%Y-%m-%d %H:%M})")
+    return len(reopen)
+
+# ---- 다중 저장소 Sent 스캔
+# 공유 사서함/아카이브/PST 처럼 저장소가 여럿이면 각 저장소의 보낸 편지함을 스캔해 발송 후보를 하나의 due 큐로 합친다.
+# 회신 확인/발송/state 저장은 사이클 스레드가 due 순으로 처리한다.
+# parallel 이면 저장소마다 스레드 하나(CoInitialize + 마샬링된 Application 참조로 자기 아파트의 세션, for_thread)로 훑는다.
+# 단 Outlook 은 out-of-proc 호출을 UI 스레드(STA) 하나에서 차례로 처리하므로, 저장소들이 같은 서버/로컬 캐시에 있으면
+# 차례로 훑는 것보다 빠르지 않다 (bench_cycle 저장소 3개 x 500 store_scan, 가짜 COM 직렬 모드: 0.52 → 0.63초,
+# 비직렬 모드: 0.74 → 0.17초). 저장소가 서로 다른 서버(온라인 모드 공유 사서함, 원격 아카이브)에 있어 지연이
+# 서버 쪽에서 생길 때만 효과가 있으므로 --parallel-stores 로 명시해야 켠다.
+SCAN_STORES_DEFAULT = "default"     # default | all | 표시 이름 목록(쉼표 구분)
+
+def select_stores(src, spec):
+    """스캔할 저장소 [(store_id, 표시 이름)]. 'default' 는 저장소 목록을 조회하지 않는다."""
+    spec = (spec or SCAN_STORES_DEFAULT).strip()
+    if spec.lower() == "default":
+        return [(None, "default")]
+    stores = src.sent_stores()
+    if spec.lower() == "all":
+        return stores
+    want = {n.strip().lower() for n in spec.split(",") if n.strip()}
+    picked = [s for s in stores if s[1].lower() in want]
+    missing = want - {s[1].lower() for s in picked}
+    if missing:
+        log(f"[STORES] not found: {', '.join(sorted(missing))} (have: {', '.join(s[1] for s in stores)})", level="WARN")
+    return picked or stores[:1]
+
+def scan_stores(src, stores, scan, parallel=False):
+    """stores 각각에 scan(store_src, sent_folder, store_id) → stores 순서의 [(결과 또는 예외, 소요초) | None].
+    parallel 이고 저장소가 둘 이상이며 백엔드가 스레드를 지원하면 저장소마다 스레드 하나, 아니면 차례로.
+    감시 스레드가 포기한(COM 호출에서 멈춘) 저장소는 None."""
+    def one(open_src, store_id):
+        t0 = time.perf_counter()
+        try:
+            s = open_src()
+            return scan(s, s.store_sent_folder(store_id), store_id), time.perf_counter() - t0
+        except BaseException as e:      # CycleAbandoned 포함 — 사이클 스레드가 판단
+            return e, time.perf_counter() - t0
+
+    openers = [src.for_thread() for _ in stores] if parallel and len(stores) > 1 else [None]
+    if None in openers:
+        return [one(lambda: src, sid) for sid, _name in stores]
+
+    results = [None] * len(stores)
+    def run(i, open_src, sid):
+        if pythoncom: pythoncom.CoInitialize()
+        try:
+            results[i] = one(open_src, sid)
+        finally:
+            if pythoncom: pythoncom.CoUninitialize()
+
+    threads = [threading.Thread(target=run, args=(i, op, sid), name=f"store-scan-{i}", daemon=True)
+               for i, (op, (sid, _name)) in enumerate(zip(openers, stores))]
+    for t in threads:
+        t.start()
+    b = _COM_BROKER
+    for t in threads:
+        while t.is_alive():
+            t.join(0.2)
+            if b is not None and b._urgent and b.tid == threading.get_ident():
+                b.pump_urgent()
+            if exit_event.is_set():
+                break
+            rec = _COM_INFLIGHT.get(t.ident)
+            if rec is not None and rec[2] == 2:
+                log(f"[STORES] {t.name} abandoned (blocked in {rec[0]})", level="ERROR")
+                break
+    return list(results)
+
+def cycle_once(src, state, lookback_days, dry_run, force_send, skip_reply_check, verbose,
+               include_self, due_from_last, reply_mode, include_deleted, precheck_epsilon_sec, loop_budget_sec, max_age_hours, skip_if_newer_outgoing,
+               stores=SCAN_STORES_DEFAULT, parallel_stores=False, reply_workers=1):
+    scan_t0 = time.perf_counter()
     cutoff = now_naive() - timedelta(days=lookback_days)
+    # lookback(+max_age) 밖의 메일은 백엔드에서 걸러 열거 자체를 안 함
+    since = cutoff
+    if max_age_hours and not force_send:
+        since = max(since, now_naive() - timedelta(hours=max_age_hours))
     found=0; sent_count=0
+    closed = state.setdefault("__closed__", {})
+    reopen_by_canon = closed_threads_by_canon(closed)
+    dirty = 0   # 저장 없이 바뀐 닫힘/재개 기록
+    state_lock = threading.Lock()   # 저장소 스캔 스레드들의 닫힘/재개 기록
 
     loop_started = time.time()
     if verbose: log("[LOOP-START] budget timer reset")
+    DUE_INDEX.begin_scan()
 
-    for mail in items:
-        try:
-            if mail.Class!=OL_MAILITEM: continue
-            subject = (mail.Subject or "")
-            if subject.lstrip().upper().startswith("[REMIND]"):
-                if verbose: log("[SKIP] reminder mail itself")
-                continue
-            code, interval_days = parse_yard_tag(subject)
-            if not code: continue
-
-            sent_on = to_local_naive(getattr(mail,"SentOn",None))
-            if not sent_on or sent_on < cutoff: continue
-            found += 1
+    def over_budget():
+        el = time.time() - loop_started
+        if el > loop_budget_sec:
+            log(f"[LOOP-BUDGET] elapsed={el:.1f}s > {loop_budget_sec}s, defer rest to next scan")
+            return True
+        return False
 
-            if verbose:
+    def scan_store(s, sent, store_id):
+        """보낸 편지함 하나 → (발송 후보, 후보 수, 닫힘/재개 변경 수, 끝까지 봤는지). 회신 확인/발송은 하지 않는다."""
+        stat_inc("folders_visited")
+        shared = s is src   # 아니면 다른 아파트의 항목 — 처리 단계에서 EntryID 로 다시 연다
+        out = []; n = 0; changed = 0
+        for it in s.items(sent, sort="SentOn", descending=True, since=since):
+            mail = s.props(it)
+            try:
+                # 닫힌 스레드(전원 회신/취소)는 EntryID 한 번만 읽고 건너뜀
+                if closed and mail["EntryID"] in closed:
+                    stat_inc("closed_skipped")
+                    continue
+                if mail["Class"]!=OL_MAILITEM: continue
+                subject = (mail["Subject"] or "")
+                if subject.lstrip().upper().startswith("[REMIND]"):
+                    if verbose: log("[SKIP] reminder mail itself")
+                    continue
+                if reopen_by_canon:
+                    with state_lock:
+                        changed += reopen_threads(state, reopen_by_canon, subject,
+                                                  lambda: to_local_naive(mail["SentOn"]), verbose)
+                code, interval_days, status = parse_subject_tags(subject)
+                if not code: continue
+
+                sent_on = to_local_naive(mail["SentOn"])
+                if not sent_on or sent_on < cutoff: continue
+                n += 1
+                stat_inc("candidates")
+
+                if verbose:
+                    now_ts = now_naive()
+                    log("[CHK] subj='{}' code={} tag={}d sent={:%Y-%m-%d %H:%M}",
+                        subject, code, interval_days, sent_on, level="DEBUG")
+                    log("[TIME] now={:%Y-%m-%d %H:%M} | sent_on={:%Y-%m-%d %H:%M} | Δ={:.1f}min",
+                        now_ts, sent_on, (now_ts - sent_on).total_seconds()/60.0, level="DEBUG")
+
+                key = conv_key(mail)
+                rec = state.get(key, {})
+                if rec.get("status") == "replied":  # 예전 형식의 스레드 기록
+                    with state_lock:
+                        close_thread(state, mail["EntryID"], "replied", subject)
+                    changed += 1
+                    continue
+                last_sent_iso = rec.get("last_remind_at")
+
+                base_time = sent_on
+                if due_from_last and last_sent_iso:
+                    try:
+                        last_dt_base = to_local_naive(datetime.fromisoformat(last_sent_iso))
+                        if last_dt_base and last_dt_base > base_time:
+                            base_time = last_dt_base
+                    except Exception:
+                        pass
+                due_time = base_time + timedelta(days=interval_days)
                 now_ts = now_naive()
-                log(f"[CHK] subj='{subject}' code={code} tag={interval_days}d sent={sent_on:%Y-%m-%d %H:%M}")
-                try:
-                    delta_min = (now_ts - sent_on).total_seconds()/60.0
-                    log(f"[TIME] now={now_ts:%Y-%m-%d %H:%M} | sent_on={sent_on:%Y-%m-%d %H:%M} | Δ={delta_min:.1f}min")
-                except Exception as _e:
-                    log(f"[TIME-ERR] {_e}")
+                due_ok  = now_ts >= due_time
 
-            key = conv_key(mail)
-            rec = state.get(key, {})
-            last_sent_iso = rec.get("last_remind_at")
+                if max_age_hours and not force_send:
+                    age_h = (now_ts - sent_on).total_seconds() / 3600.0
+                    if age_h > max_age_hours:
+                        if verbose: log("[SKIP-STALE] tag too old: {:.1f}h > {}h", age_h, max_age_hours, level="DEBUG")
+                        continue
 
-            base_time = sent_on
-            if due_from_last and last_sent_iso:
-                try:
-                    last_dt_base = to_local_naive(datetime.fromisoformat(last_sent_iso))
-                    if last_dt_base and last_dt_base > base_time:
-                        base_time = last_dt_base
-                except Exception:
-                    pass
-            due_time = base_time + timedelta(days=interval_days)
-            now_ts = now_naive()
-            due_ok  = now_ts >= due_time
-
-            if max_age_hours and not force_send:
-                age_h = (now_ts - sent_on).total_seconds() / 3600.0
-                if age_h > max_age_hours:
-                    if verbose: log(f"[SKIP-STALE] tag too old: {age_h:.1f}h > {max_age_hours}h")
-                    continue
+                # 예정 인덱스: 실제로 다음 발송이 가능한 시각 (마지막 리마인드 후 interval 도 지나야 함)
+                next_due = due_time
+                if last_sent_iso:
+                    try:
+                        next_due = max(next_due, to_local_naive(datetime.fromisoformat(last_sent_iso))
+                                       + timedelta(days=interval_days))
+                    except Exception:
+                        pass
+                DUE_INDEX.upsert(key, next_due, entry_id=mail["EntryID"], subject=subject, yard=code, to=mail["To"] or "")
+
+                if verbose:
+                    log("[DUE] base={} | base_time={:%Y-%m-%d %H:%M} | due_time={:%Y-%m-%d %H:%M} | due_ok={}",
+                        'last_remind_at' if (due_from_last and last_sent_iso and base_time!=sent_on) else 'sent_on',
+                        base_time, due_time, due_ok, level="DEBUG")
+
+                if (not force_send) and (not due_ok):
+                    remaining = (due_time - now_ts).total_seconds()
+                    if remaining > precheck_epsilon_sec:
+                        if verbose:
+                            log("[PRECHECK-SKIP] due in {:.1f}s (> {}s)", remaining, precheck_epsilon_sec, level="DEBUG")
+                        if over_budget():
+                            return out, n, changed, False
+                        continue
 
-            if verbose:
-                log(f"[DUE] base={'last_remind_at' if (due_from_last and last_sent_iso and base_time!=sent_on) else 'sent_on'} "
-                    f"| base_time={base_time:%Y-%m-%d %H:%M} | due_time={due_time:%Y-%m-%d %H:%M} | due_ok={due_ok}")
-
-            if (not force_send) and (not due_ok):
-                remaining = (due_time - now_ts).total_seconds()
-                if remaining > precheck_epsilon_sec:
-                    if verbose:
-                        log(f"[PRECHECK-SKIP] due in {remaining:.1f}s (> {precheck_epsilon_sec}s)")
-                    if (time.time() - loop_started) > loop_budget_sec:
-                        log(f"[LOOP-BUDGET] elapsed={time.time() - loop_started:.1f}s > {loop_budget_sec}s, defer rest to next scan")
-                        break
-                    continue
+                if last_sent_iso and not force_send:
+                    try:
+                        last_dt = to_local_naive(datetime.fromisoformat(last_sent_iso))
+                        if last_dt and now_ts - last_dt < timedelta(days=interval_days):
+                            if verbose: log("[SKIP] within interval since last remind")
+                            if over_budget():
+                                return out, n, changed, False
+                            continue
+                    except Exception:
+                        pass
 
-            if last_sent_iso and not force_send:
-                try:
-                    last_dt = to_local_naive(datetime.fromisoformat(last_sent_iso))
-                    if last_dt and now_ts - last_dt < timedelta(days=interval_days):
-                        if verbose: log("[SKIP] within interval since last remind")
-                        if (time.time() - loop_started) > loop_budget_sec:
-                            log(f"[LOOP-BUDGET] elapsed={time.time() - loop_started:.1f}s > {loop_budget_sec}s, defer rest to next scan")
+                out.append({"due": due_time, "due_ok": due_ok, "now": now_ts, "key": key, "subject": subject,
+                            "code": code, "interval_days": interval_days, "status": status, "sent_on": sent_on,
+                            "store_id": store_id, "mail": mail if shared else None,
+                            "known": None if shared else {p: mail[p] for p in ("EntryID", "Class", "Subject", "SentOn", "To")}})
+            except Exception as e:
+                log(f"[ERR] {e}")
+        return out, n, changed, True
+
+    picked = select_stores(src, stores)
+    with cycle_phase("store_scan"):
+        scanned = scan_stores(src, picked, scan_store, parallel=parallel_stores)
+    complete = None not in scanned
+    due_queue = []
+    for (_sid, name), r in zip(picked, scanned):
+        if r is None:
+            continue
+        res = r[0]
+        if isinstance(res, BaseException):
+            if isinstance(res, CycleAbandoned) and len(picked) == 1:
+                raise res
+            log(f"[ERR] store '{name}' scan failed: {res}")
+            complete = False
+            continue
+        cands, n, changed, done = res
+        due_queue += cands
+        found += n; dirty += changed
+        complete = complete and done
+    if len(picked) > 1:
+        log("[STORES] " + " | ".join(f"{name}=" + ("abandoned" if r is None else f"{r[1]:.2f}s" +
+                                                   ("" if isinstance(r[0], BaseException) else f"/{r[0][1]}"))
+                                     for (_sid, name), r in zip(picked, scanned)))
+    # 저장소에 상관없이 due 가 이른 것부터 — 예산이 끝나도 가장 늦은 리마인드가 먼저 나간다
+    due_queue.sort(key=lambda c: c["due"])
+    pool = ReplySearchPool.create(src, reply_workers) if (due_queue and not skip_reply_check) else None
+    try:
+        for c in due_queue:
+            key, subject, code, interval_days = c["key"], c["subject"], c["code"], c["interval_days"]
+            sent_on, due_time, due_ok, now_ts = c["sent_on"], c["due"], c["due_ok"], c["now"]
+            try:
+                mail = c["mail"]
+                if mail is None:
+                    mail = ItemProps(src, src.item_by_id(c["known"]["EntryID"], c["store_id"]), c["known"])
+
+                if skip_if_newer_outgoing:
+                    canon = canonicalize_subject(subject or "")
+                    with cycle_phase("newer_outgoing"):
+                        newer = _has_newer_outgoing_with_same_subject(src, canon, sent_on,
+                                                                      include_deleted=include_deleted,
+                                                                      verbose=verbose)
+                    if newer:
+                        if verbose: log("[SKIP] newer outgoing exists in same thread")
+                        DUE_INDEX.discard(key)
+                        if over_budget():
+                            complete = False
                             break
                         continue
-                except Exception:
-                    pass
 
-            if skip_if_newer_outgoing:
-                canon = canonicalize_subject(subject or "")
-                if _has_newer_outgoing_with_same_subject(ns, canon, sent_on,
-                                                         include_deleted=include_deleted,
-                                                         verbose=verbose):
-                    if verbose: log("[SKIP] newer outgoing exists in same thread")
-                    if (time.time() - loop_started) > loop_budget_sec:
-                        log(f"[LOOP-BUDGET] elapsed={time.time() - loop_started:.1f}s > {loop_budget_sec}s, defer rest to next scan")
+                if not skip_reply_check:
+                    try:
+                        if verbose:
+                            log(f"[DEBUG-REPLYCHK] subj='{subject}' conv_id={mail['ConversationID']} "
+                                f"topic='{mail['ConversationTopic']}' check_after={sent_on:%Y-%m-%d %H:%M}")
+
+                        with cycle_phase("reply_check"):
+                            closed_why = check_and_update_replies(src, mail, state, verbose=verbose, pool=pool)
+                        if closed_why:
+                            close_thread(state, mail["EntryID"], closed_why, subject)
+                        with cycle_phase("state_save"):
+                            save_state(state)
+                        if closed_why:
+                            if verbose: log(f"[SKIP] thread closed ({closed_why})")
+                            DUE_INDEX.discard(key)
+                            continue
+                    except Exception as e:
+                        log(f"[ERR-REPLYCHK] {e}")
+
+                if (not force_send) and (not due_ok):
+                    if verbose: log("[SKIP] not yet due")
+                    if over_budget():
+                        complete = False
                         break
                     continue
 
-            if not skip_reply_check:
-                try:
-                    if verbose:
-                        log(f"[DEBUG-REPLYCHK] subj='{subject}' conv_id={mail.ConversationID} "
-                            f"topic='{mail.ConversationTopic}' check_after={sent_on:%Y-%m-%d %H:%M}")
-
-                    check_and_update_replies(app, mail, state, verbose=verbose)
-                    save_state(state)
-                except Exception as e:
-                    log(f"[ERR-REPLYCHK] {e}")
-
-            if (not force_send) and (not due_ok):
-                if verbose: log("[SKIP] not yet due")
-                if (time.time() - loop_started) > loop_budget_sec:
-                    log(f"[LOOP-BUDGET] elapsed={time.time() - loop_started:.1f}s > {loop_budget_sec}s, defer rest to next scan")
-                    break
-                continue
-
-            if dry_run:
-                log(f"[DRY-RUN] Would send | {subject} ({code})")
-            else:
-                ok = send_remind_for_recipients(
-                    app,
-                    mail,
-                    subject,
-                    load_body_map().get("remind_message", ""),
-                    code,
-                    state,
-                    dry_run=dry_run,
-                    verbose=verbose
-                )
-                if ok:
-                    sent_count += 1
-                    state[key] = state.get(key, {})
-                    state[key]["last_remind_at"] = now_ts.isoformat()
-                    save_state(state)
+                if dry_run:
+                    log(f"[DRY-RUN] Would send | {subject} ({code})")
                 else:
-                    log("[WARN] send failed; state not updated")
+                    trace = {"key": key, "yard": code, "interval_days": interval_days,
+                             "due": due_time, "detected": now_ts, "enqueued": now_naive()}
+                    with cycle_phase("send"):
+                        ok = send_remind_for_recipients(
+                            src,
+                            mail,
+                            subject,
+                            remind_body_for(load_body_map(), c["status"]),
+                            code,
+                            state,
+                            dry_run=dry_run,
+                            verbose=verbose,
+                            trace=trace
+                        )
+                    if ok:
+                        sent_count += 1
+                        stat_inc("sent")
+                        state[key] = state.get(key, {})
+                        state[key]["last_remind_at"] = now_ts.isoformat()
+                        with cycle_phase("state_save"):
+                            save_state(state)
+                        DUE_INDEX.upsert(key, now_ts + timedelta(days=interval_days), entry_id=mail["EntryID"],
+                                         subject=subject, yard=code, to=mail["To"] or "")
+                    else:
+                        log("[WARN] send failed; state not updated")
 
-        except Exception as e:
-            log(f"[ERR] {e}")
+            except Exception as e:
+                log(f"[ERR] {e}")
+
+    finally:
+        if pool is not None:
+            pool.close()
 
+    if dirty:
+        save_state(state)
+    try:
+        DUE_INDEX.end_scan(complete)
+    except Exception as e:
+        log(f"[WARN] due index save failed: {e}", level="WARN")
+    cycle_phase_add("sent_scan", time.perf_counter() - scan_t0)
+    addr_cache_flush()
+    _update_health_metrics(src, state)
     if verbose:
         log(f"[INFO] Candidates processed: {found}, sent: {sent_count}")
 
-def _has_newer_outgoing_with_same_subject(ns, canon_subj: str, sent_on: datetime, include_deleted=False, verbose=False):
+def _has_newer_outgoing_with_same_subject(src, canon_subj: str, sent_on: datetime, include_deleted=False, verbose=False):
     try:
-        stores = list(ns.Stores)
+        folders = src.outgoing_folders(include_deleted=include_deleted)
     except Exception:
         return False
-    deleted_roots = [] if include_deleted else _get_deleted_roots(ns)
 
-    for store in stores:
+    for f in folders:
         try:
-            sent = store.GetDefaultFolder(OL_FOLDER_SENT)
+            items = src.items(f, sort="SentOn", descending=True, since=sent_on)
         except Exception:
             continue
-        for f in _walk_folders(sent):
+
+        for it in items:
+            p = src.props(it)
             try:
-                if (not include_deleted) and _is_under_deleted(f, deleted_roots):
+                if p["Class"] != OL_MAILITEM:
                     continue
-                items = f.Items
-                items.Sort("[SentOn]", True)
-                items = items.Restrict("[SentOn] >= '" + (sent_on.strftime('%m/%d/%Y %I:%M %p')) + "'")
+                subj = p["Subject"] or ""
+                s = canonicalize_subject(subj)
+                if s != canon_subj:
+                    continue
+                so = to_local_naive(p["SentOn"])
+                if so and so > sent_on:
+                    if re.search(r"^\s*\[remind\]\s*", subj, flags=re.I):
+                        continue
+                    if verbose: log(f"[SKIP-NEWER-OUT] newer outgoing found at {so:%Y-%m-%d %H:%M}")
+                    return True
             except Exception:
                 continue
-
-            try:
-                enum = iter(items)
-            except Exception:
-                def enum_iter(it):
-                    for i in range(1, it.Count+1):
-                        yield it.Item(i)
-                enum = enum_iter(items)
-
-            for it in enum:
-                try:
-                    if it.Class != OL_MAILITEM:
-                        continue
-                    s = canonicalize_subject(getattr(it, "Subject", "") or "")
-                    if s != canon_subj:
-                        continue
-                    so = to_local_naive(getattr(it, "SentOn", None))
-                    if so and so > sent_on:
-                        subj = getattr(it, "Subject", "") or ""
-                        if re.search(r"^\s*\[remind\]\s*", subj, flags=re.I):
-                            continue
-                        if verbose: log(f"[SKIP-NEWER-OUT] newer outgoing found at {so:%Y-%m-%d %H:%M}")
-                        return True
-                except Exception:
-                    continue
     return False
 
 # ---- App wiring ----
 exit_event = threading.Event()
 
+def open_mail_source(args):
+    """--replay 녹화 재생, --maildir Maildir/EML 백엔드. Outlook(COM)은 COM 브로커가 연결을 소유한다."""
+    if getattr(args, "replay", None):
+        return ReplaySource(args.replay, speed=args.replay_speed)
+    return MaildirSource(args.maildir, me=args.me)
+
+def run_cycle(args, st):
+    if not (getattr(args, "replay", None) or getattr(args, "maildir", None)):
+        # Outlook: 사이클 전체를 브로커 스레드에서 실행 (COM 객체가 그 아파트를 벗어나지 않음)
+        b = com_broker()
+        return b.call(_run_cycle, b.source, args, st)
+    return _run_cycle(lambda: open_mail_source(args), args, st)
+
+def _run_cycle(open_src, args, st):
+    log("[INFO] Starting new scan cycle.")
+    cycle_stats_begin()
+    try:
+        with cycle_phase("connect"):
+            src = open_src()
+            if getattr(args, "record", None):
+                src = RecordingSource(src)
+        cycle_once(src, st, args.lookback_days, args.dry_run, args.force_send,
+                   args.skip_reply_check, args.verbose, args.include_self, args.due_from_last,
+                   args.reply_mode, args.include_deleted, args.precheck_epsilon_sec,
+                   args.loop_budget_sec, args.max_age_hours, args.skip_if_newer_outgoing,
+                   stores=args.scan_stores, parallel_stores=args.parallel_stores,
+                   reply_workers=args.reply_workers)
+        if isinstance(src, RecordingSource):
+            info = src.save(args.record)
+            log(f"[RECORD] saved {args.record} | items={info['items']} folders={info['folders']} "
+                f"calls={info['calls']} size={info['bytes']}B")
+        elif isinstance(src, ReplaySource) and src.misses:
+            log(f"[REPLAY] {src.misses} property read(s) not in recording (returned None)", level="WARN")
+    except CycleAbandoned:
+        # 사이클 통계/지표는 포기 시점에 감시 스레드(_abandon_com_session)가 이미 마감했다
+        raise
+    except Exception as e:
+        _finish_cycle_stats(e)
+        raise
+    _finish_cycle_stats(None)
+
+_LAST_CYCLE = None
+
+def _finish_cycle_stats(cycle_err, result=None):
+    global _LAST_CYCLE
+    summary = cycle_stats_end(cycle_err)
+    if summary:
+        _LAST_CYCLE = summary
+        log("[CYCLE] {}", json.dumps(summary, ensure_ascii=False))
+        metric_observe("autoremind_cycle_duration_seconds", summary["total_sec"], CYCLE_LATENCY_BUCKETS)
+    metric_inc("autoremind_cycles_total", {"result": result or ("error" if cycle_err else "ok")})
+    metric_set("autoremind_last_cycle_timestamp_seconds", round(time.time()))
+
+def _abandon_com_session(tid):
+    """감시 스레드 콜백: 멈춘 스레드가 COM 브로커면 사이클을 'abandoned' 로 마감하고 브로커를 교체."""
+    b = _COM_BROKER
+    if b is None or b.tid != tid:
+        return
+    def close_stats():
+        st = _CYCLE_STATS
+        if st is not None and st["_tid"] == tid:
+            _finish_cycle_stats(CycleAbandoned("COM session abandoned by watchdog"), result="abandoned")
+    b.abandon(tid, before_fail=close_stats)
+
+def start_worker(args):
+    t = threading.Thread(target=start_mail_check_loop, args=(args,), name="mail-worker", daemon=True)
+    t.start()
+    return t
+
+def wait_worker(t):
+    # join(timeout) 반복 — 메인 스레드에서 Ctrl+C 를 받을 수 있도록
+    while t.is_alive() and not exit_event.is_set():
+        t.join(0.5)
+
 def start_mail_check_loop(args):
-    st = load_state()
+    last_compact = 0.0
     while not exit_event.is_set():
+        if time.time() - last_compact >= STATE_COMPACT_INTERVAL_SEC:
+            # 사이클 사이에만 — 사이클이 들고 있는 state 가 정리 결과를 덮어쓰지 않도록
+            last_compact = time.time()
+            try:
+                compact_state(args.lookback_days, args.archive_replied_days)
+            except Exception as e:
+                log(f"[WARN] state compaction failed: {e}", level="WARN")
         try:
             # ✅ 트레이에서 취소/설정 변경 반영을 위해 매 사이클마다 최신 state 로드
             st = load_state()
-
-            log("[INFO] Starting new scan cycle.")
-            app = get_outlook()
-            ns = app.GetNamespace("MAPI")
-            cycle_once(ns, app, st, args.lookback_days, args.dry_run, args.force_send,
-                       args.skip_reply_check, args.verbose, args.include_self, args.due_from_last,
-                       args.reply_mode, args.include_deleted, args.precheck_epsilon_sec, 
-                       args.loop_budget_sec, args.max_age_hours, args.skip_if_newer_outgoing)
-
+            run_cycle(args, st)
+        except CycleAbandoned as e:
+            log(f"[WATCHDOG] left abandoned cycle: {e}", level="WARN")
         except Exception as e:
             log(f"[ERROR] An error occurred in the mail check loop: {e}")
+        if getattr(args, "once", False):
+            break
         log(f"[INFO] Cycle finished. Waiting for {args.interval_min} minute(s).")
         exit_event.wait(args.interval_min * 60)
 
-# Tk root (main thread) — single instance for all Toplevels
-root = tk.Tk()
-set_window_icon(root)
-root.withdraw()
+def apply_runtime_config(cfg):
+    """설정 창 저장값 중 실행 중 바로 반영할 항목 (엔진 프로세스에서는 IPC 'config' 로 전달됨)."""
+    global VERBOSE
+    VERBOSE = bool(cfg.get("verbose", False))
+    set_low_impact(bool(cfg.get("low_impact", False)))
+    set_tag_grammar(cfg.get("tag_grammar"))
+
+# ---- Engine IPC (--split)
+# 트레이/GUI 프로세스와 스캔 엔진 프로세스(--engine)를 분리. 엔진은 127.0.0.1 임의 포트에 JSON RPC 를 열고
+# engine.json 에 포트/토큰을 남긴다. 트레이는 상태 조회·발송 취소·설정 반영·원본 열기를 이 채널로만 요청하고,
+# 엔진이 죽으면 다시 띄운다. 엔진은 트레이가 죽어도 계속 돌며, 새 트레이는 살아 있는 엔진에 붙는다.
+ENGINE_FILE = os.path.join(APPDATA_DIR, "engine.json")
+ENGINE_RPC_TIMEOUT_SEC = 5
+ENGINE_PING_SEC = 5
+ENGINE_START_GRACE_SEC = 30         # 기동 직후 응답이 없어도 기다리는 시간
+ENGINE_PING_FAILURES = 3            # 연속 무응답이면 재시작
+ENGINE_RESTART_BACKOFF_SEC = (2, 5, 15, 60)
+
+class EngineUnavailable(RuntimeError):
+    """엔진 프로세스에 연결할 수 없음."""
+
+_ENGINE_STARTED = time.time()
+_ENGINE_ARGS = None     # 엔진의 명령행 (원본 메일 열기를 같은 메일 원본으로)
+
+def _rpc_status(req):
+    return {"pid": os.getpid(), "uptime_sec": round(time.time() - _ENGINE_STARTED),
+            "last_cycle": _LAST_CYCLE, "com_stalls_per_hour": com_stalls_last_hour(),
+            "low_impact": _COM_THROTTLE is not None}
+
+def _rpc_open_item(req):
+    if _ENGINE_ARGS is not None and (_ENGINE_ARGS.replay or _ENGINE_ARGS.maildir):
+        # 엔진이 --maildir/--replay 로 돌면 그 메일 원본으로 (지원하지 않으면 NotImplementedError 가 트레이 오류 창으로)
+        open_mail_source(_ENGINE_ARGS).open_item(req["entry_id"])
+        return {}
+    b = com_broker()
+    b.call(lambda: b.source().open_item(req["entry_id"]), urgent=True, timeout=GUI_COM_TIMEOUT_SEC)
+    return {}
+
+def _rpc_shutdown(req):
+    log("[ENGINE] shutdown requested over IPC")
+    exit_event.set()
+    return {}
+
+ENGINE_RPC = {
+    "ping":      lambda req: {"pid": os.getpid()},
+    "status":    _rpc_status,
+    "state":     lambda req: {"entries": pending_state_entries()},
+    "cancel":    lambda req: {"cancelled": cancel_state_keys(req.get("keys", []))},
+    "forecast":  lambda req: DUE_INDEX.forecast(req.get("n", FORECAST_NEXT_N), req.get("hours", FORECAST_HOURS)),
+    "config":    lambda req: apply_runtime_config(req.get("config", {})) or {},
+    "open_item": _rpc_open_item,
+    "shutdown":  _rpc_shutdown,
+}
+
+class _EngineHandler:
+    def do_POST(self):
+        if self.path != "/rpc" or self.headers.get("X-Engine-Token") != self.server.token:
+            self.send_error(403); return
+        try:
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            fn = ENGINE_RPC.get(req.get("op"))
+            if fn is None:
+                raise ValueError(f"unknown op {req.get('op')!r}")
+            res = {"ok": True, **fn(req)}
+        except Exception as e:
+            res = {"ok": False, "error": str(e)}
+        body = json.dumps(res, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+def start_engine_server(args=None):
+    """127.0.0.1 임의 포트로 엔진 RPC 서버 기동 후 engine.json 기록 (종료 시 제거)."""
+    global _ENGINE_ARGS
+    _ENGINE_ARGS = args
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), type("EngineHandler", (_EngineHandler, BaseHTTPRequestHandler), {}))
+    srv.daemon_threads = True
+    srv.token = uuid.uuid4().hex
+    threading.Thread(target=srv.serve_forever, name="engine-rpc", daemon=True).start()
+    info = {"port": srv.server_address[1], "pid": os.getpid(), "token": srv.token,
+            "started_at": now_naive().isoformat(timespec="seconds")}
+    tmp = ENGINE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp, ENGINE_FILE)
+
+    def _cleanup():
+        try:
+            with open(ENGINE_FILE, "r", encoding="utf-8") as f:
+                if json.load(f).get("pid") == os.getpid():
+                    os.remove(ENGINE_FILE)
+        except Exception:
+            pass
+    atexit.register(_cleanup)
+    log(f"[ENGINE] RPC listening on 127.0.0.1:{info['port']} (pid {info['pid']})")
+    return srv
+
+class EngineClient:
+    """engine.json 을 읽어 엔진 RPC 호출. 프록시 설정을 타지 않도록 http.client 로 직접 연결한다."""
+
+    def __init__(self):
+        self.info = None
+
+    def _load(self):
+        try:
+            with open(ENGINE_FILE, "r", encoding="utf-8") as f:
+                self.info = json.load(f)
+        except Exception:
+            self.info = None
+        return self.info
+
+    def request(self, op, timeout=ENGINE_RPC_TIMEOUT_SEC, **kw):
+        info = self.info or self._load()
+        if not info:
+            raise EngineUnavailable("engine is not running")
+        import http.client
+        conn = http.client.HTTPConnection("127.0.0.1", info["port"], timeout=timeout)
+        try:
+            conn.request("POST", "/rpc", body=json.dumps({"op": op, **kw}).encode("utf-8"),
+                         headers={"Content-Type": "application/json", "X-Engine-Token": info["token"]})
+            resp = conn.getresponse()
+            if resp.status != 200:
+                raise EngineUnavailable(f"engine RPC HTTP {resp.status}")
+            res = json.loads(resp.read())
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            self.info = None        # 다음 호출에서 engine.json 다시 읽기 (재시작됐을 수 있음)
+            raise EngineUnavailable(str(e))
+        finally:
+            conn.close()
+        if not res.pop("ok", False):
+            raise RuntimeError(res.get("error", "engine error"))
+        return res
+
+class EngineSupervisor:
+    """--split 트레이 프로세스: 엔진이 살아 있으면 붙고, 없거나 응답이 끊기면 (백오프 후) 새로 띄운다.
+    직접 띄운 엔진(proc)이든 이미 떠 있던 엔진에 붙은 경우(engine_pid)든 연속 무응답 ENGINE_PING_FAILURES 회에서 재시작."""
+
+    def __init__(self, engine_args):
+        self.engine_args = list(engine_args)
+        self.client = EngineClient()
+        self.proc = None
+        self.engine_pid = None   # 마지막 ping 에 응답한 엔진
+        self._spawned_at = 0.0
+        self._stop = threading.Event()
+
+    def _spawn(self):
+        cmd = [sys.executable] + ([] if getattr(sys, "frozen", False) else [os.path.abspath(__file__)])
+        cmd += self.engine_args + ["--engine"]
+        flags = 0x08000000 if os.name == "nt" else 0      # CREATE_NO_WINDOW
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL, creationflags=flags)
+        self._spawned_at = time.monotonic()
+        self.engine_pid = None
+        log(f"[SPLIT] engine process started (pid {self.proc.pid})")
+
+    def _alive(self):
+        try:
+            self.engine_pid = self.client.request("ping", timeout=2)["pid"]
+            return True
+        except Exception:
+            return False
+
+    def _kill(self):
+        # 붙기만 한 엔진은 Popen 핸들이 없으므로 pid 로 종료 (Windows 에서는 TerminateProcess)
+        try:
+            if self.proc is not None:
+                self.proc.kill()
+            else:
+                os.kill(self.engine_pid, signal.SIGTERM)
+        except OSError as e:
+            log(f"[SPLIT] could not stop engine: {e}", level="WARN")
+
+    def run(self):
+        failures = restarts = 0
+        while not (exit_event.is_set() or self._stop.is_set()):
+            if self._alive():
+                failures = 0
+                if restarts and time.monotonic() - self._spawned_at > 10 * 60:
+                    restarts = 0
+            elif self.proc is not None and self.proc.poll() is None and \
+                    time.monotonic() - self._spawned_at < ENGINE_START_GRACE_SEC:
+                pass  # 기동 중
+            else:
+                failures += 1
+                if self.proc is not None:
+                    running, what = self.proc.poll() is None, f"exit code {self.proc.poll()}"
+                else:   # 붙은 엔진은 살아 있는지 알 수 없으므로 응답이 끊겨도 실행 중으로 보고 임계치까지 기다림
+                    running, what = self.engine_pid is not None, f"attached pid {self.engine_pid}"
+                if not running or failures >= ENGINE_PING_FAILURES:
+                    if self.proc is not None or self.engine_pid is not None:
+                        log(f"[SPLIT] engine not responding ({what}); restarting", level="WARN")
+                        if running:
+                            self._kill()
+                        delay = ENGINE_RESTART_BACKOFF_SEC[min(restarts, len(ENGINE_RESTART_BACKOFF_SEC) - 1)]
+                        restarts += 1
+                        if self._stop.wait(delay) or exit_event.is_set():
+                            break
+                    self._spawn()
+                    failures = 0
+            self._stop.wait(ENGINE_PING_SEC)
+
+    def start(self):
+        threading.Thread(target=self.run, name="engine-supervisor", daemon=True).start()
+
+    def shutdown(self):
+        self._stop.set()
+        try:
+            self.client.request("shutdown", timeout=2)
+        except Exception:
+            pass
+
+# 트레이/GUI 쪽 접근 — 분리 모드면 엔진 RPC, 아니면 같은 프로세스에서 직접
+_ENGINE = None  # EngineSupervisor (--split)
+
+def ui_pending_entries():
+    if _ENGINE is not None:
+        return _ENGINE.client.request("state")["entries"]
+    return pending_state_entries()
+
+def ui_cancel_keys(keys):
+    if _ENGINE is not None:
+        return _ENGINE.client.request("cancel", keys=list(keys))["cancelled"]
+    return cancel_state_keys(keys)
+
+def ui_push_config(cfg):
+    if _ENGINE is not None:
+        _ENGINE.client.request("config", config=cfg)
+    else:
+        apply_runtime_config(cfg)
+
+def ui_forecast(n=FORECAST_NEXT_N, hours=FORECAST_HOURS):
+    if _ENGINE is not None:
+        return _ENGINE.client.request("forecast", n=n, hours=hours)
+    return DUE_INDEX.forecast(n, hours)
+
+def ui_open_item(entry_id):
+    """Future 반환 (Tk 스레드를 막지 않음)."""
+    if _ENGINE is None:
+        b = com_broker()
+        return b.submit(lambda: b.source().open_item(entry_id), urgent=True)
+    fut = Future()
+    def _run():
+        try:
+            _settle(fut, _ENGINE.client.request("open_item", timeout=GUI_COM_TIMEOUT_SEC + 2, entry_id=entry_id))
+        except Exception as e:
+            _settle(fut, exc=e)
+    fut.set_running_or_notify_cancel()
+    threading.Thread(target=_run, name="ui-open-item", daemon=True).start()
+    return fut
+
+# Tk root (main thread) — single instance for all Toplevels (main() 에서 생성)
+root = None
 
 def create_and_show_gui():
     top = tk.Toplevel(root)
@@ -1051,6 +4075,7 @@ def create_and_show_gui():
 
     auto_start_var = tk.BooleanVar(value=current_config.get("auto_start", False))
     verbose_var    = tk.BooleanVar(value=current_config.get("verbose", False))
+    low_impact_var = tk.BooleanVar(value=current_config.get("low_impact", False))
 
     cb_autostart = tk.Checkbutton(top, text="Windows 시작 시 자동 실행", variable=auto_start_var)
     cb_autostart.grid(row=2, column=0, columnspan=2, sticky="w", padx=10, pady=(6, 0))
@@ -1058,19 +4083,29 @@ def create_and_show_gui():
     cb_verbose = tk.Checkbutton(top, text="DEBUG 로그 출력 (Verbose 모드)", variable=verbose_var)
     cb_verbose.grid(row=3, column=0, columnspan=2, sticky="w", padx=10, pady=(0, 2))
 
+    cb_low_impact = tk.Checkbutton(top, text="저영향 모드 (검사는 느려지지만 Outlook 화면이 덜 멈춤)",
+                                   variable=low_impact_var)
+    cb_low_impact.grid(row=4, column=0, columnspan=2, sticky="w", padx=10, pady=(0, 2))
+
     def save_config():
         new_cfg = {
+            **load_body_map(),
             "remind_message": text_widget.get("1.0", tk.END).strip(),
             "auto_start": auto_start_var.get(),
-            "verbose": verbose_var.get()
+            "verbose": verbose_var.get(),
+            "low_impact": low_impact_var.get()
         }
         try:
             with open(CONFIG_FILE, "w", encoding="utf-8") as f:
                 json.dump(new_cfg, f, ensure_ascii=False, indent=2)
 
-            # apply immediately
+            # apply immediately (분리 모드면 엔진 프로세스에도)
             global VERBOSE
             VERBOSE = new_cfg["verbose"]
+            try:
+                ui_push_config(new_cfg)
+            except Exception as e:
+                log(f"[WARN] 엔진에 설정 반영 실패 (다음 엔진 시작 시 적용): {e}", level="WARN")
             try:
                 if new_cfg["auto_start"]:
                     register_startup_reg(APP_RUN_NAME)
@@ -1085,7 +4120,7 @@ def create_and_show_gui():
             messagebox.showerror("오류", f"저장 중 오류가 발생했습니다: {e}")
 
     btn_frame = tk.Frame(top)
-    btn_frame.grid(row=4, column=1, sticky="e", padx=10, pady=10)
+    btn_frame.grid(row=5, column=1, sticky="e", padx=10, pady=10)
     tk.Button(btn_frame, text="저장", command=save_config).pack(side=tk.LEFT, padx=5)
     tk.Button(btn_frame, text="닫기", command=top.destroy).pack(side=tk.LEFT)
 
@@ -1096,6 +4131,133 @@ def open_settings_window(icon, item):
     except Exception as e:
         log(f"[ERR] open_settings_window: {e}")
 
+# ===== 리마인드 리스트 뷰모델 =====
+REMIND_LIST_PAGE_ROWS = 300   # Treeview 에 한 번에 그리는 행 수 (스크롤이 끝에 가까워지면 다음 페이지)
+REMIND_SEARCH_DEBOUNCE_MS = 150
+HULL_NO_RE = re.compile(r"(?<![A-Z0-9])(?:SN|H)\d{3,5}(?!\d)")   # 호선 번호: SN2693, H3525
+
+def remind_row_meta(addr, subject):
+    """검색 인덱스 항목: (부분 검색 문자열, 정확 일치 토큰들, 정렬용 제목)"""
+    canon = canonicalize_subject(subject)
+    yard, _ = parse_yard_tag(subject)
+    addr_l = (addr or "").lower()
+    tokens = {addr_l.rsplit("@", 1)[-1]}
+    tokens.update(h.lower() for h in HULL_NO_RE.findall((subject or "").upper()))
+    if yard:
+        tokens.add(yard.lower())
+    return "\x00".join([addr_l, canon, *sorted(tokens)]), tuple(tokens), canon
+
+class RemindRowDiff:
+    __slots__ = ("added", "removed", "changed", "rows", "order", "meta", "tokens", "base")
+
+    def __init__(self, added, removed, changed, rows, order, meta, tokens, base):
+        self.added, self.removed, self.changed = added, removed, changed
+        self.rows, self.order, self.meta, self.tokens, self.base = rows, order, meta, tokens, base
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+class RemindListModel:
+    """
+    리마인드 리스트 창의 뷰모델. state 스냅샷 → 수신인별 '가장 최신' 미회신 행(iid = state key),
+    직전 스냅샷과의 diff(추가/삭제/변경)와 검색 인덱스(수신인·정규화 제목·호선·야드).
+    build/diff 는 로딩 스레드에서, commit/drop/set_query/set_sort 는 Tk 스레드에서만 호출
+    (rows/order/meta/tokens 는 교체만 하고 제자리 수정하지 않음). 화면에 보일 순서는 view.
+    """
+    COLUMNS = ("recipient", "subject", "last_sent")
+
+    def __init__(self):
+        self.rows = {}      # key -> (addr, subject, last_sent 표시값)
+        self.order = []     # 기본 순서 (기존 행은 자리 유지, 새 행은 뒤에 추가)
+        self.meta = {}      # key -> remind_row_meta(...)
+        self.tokens = {}    # 정확 일치 토큰(도메인/호선/야드) -> key set
+        self.query = ""
+        self.sort = None    # (column, descending)
+        self.view = []
+
+    @staticmethod
+    def build(st):
+        latest = {}         # addr -> (sent_dt, key, val)
+        for key, val in st.items():
+            if "|" not in key or val.get("reply_received", False):
+                continue
+            addr = key.split("|", 1)[1]
+            sent_time = val.get("last_sent")
+            try:
+                sent_dt = datetime.fromisoformat(sent_time) if sent_time else None
+            except Exception:
+                sent_dt = None
+            prev = latest.get(addr)
+            if prev is None or (sent_dt or datetime.min) > (prev[0] or datetime.min):
+                latest[addr] = (sent_dt, key, val)
+        return {key: (addr, val.get("subject", "-"), _pretty_ts(val.get("last_sent", "-")))
+                for addr, (_, key, val) in latest.items()}
+
+    def diff(self, new_rows):
+        old = self.rows
+        removed = [k for k in self.order if k not in new_rows]
+        changed = [k for k, v in new_rows.items() if k in old and old[k] != v]
+        added = [k for k in new_rows if k not in old]
+        gone = set(removed)
+        order = [k for k in self.order if k not in gone] + added if gone else self.order + added
+        # 인덱스는 바뀐 행만 다시 계산 (정규화/호선 추출이 build 에서 가장 비싼 부분)
+        meta = {k: self.meta[k] for k in new_rows if k in self.meta and k not in gone}
+        for k in added + changed:
+            meta[k] = remind_row_meta(new_rows[k][0], new_rows[k][1])
+        tokens = {}
+        for k, (_, toks, _) in meta.items():
+            for t in toks:
+                tokens.setdefault(t, set()).add(k)
+        return RemindRowDiff(added, removed, changed, new_rows, order, meta, tokens, old)
+
+    def commit(self, d):
+        self.rows, self.order, self.meta, self.tokens = d.rows, d.order, d.meta, d.tokens
+        self._refresh_view()
+
+    def drop(self, keys):
+        """사용자가 취소한 행을 즉시 제거 (다음 새로고침 diff 에서 다시 삭제하지 않도록)."""
+        keys = set(keys)
+        self.rows = {k: v for k, v in self.rows.items() if k not in keys}
+        self.order = [k for k in self.order if k not in keys]
+        self.meta = {k: v for k, v in self.meta.items() if k not in keys}
+        self.tokens = {t: ks - keys for t, ks in self.tokens.items() if not ks <= keys}
+        self._refresh_view()
+
+    def set_query(self, query):
+        self.query = query.strip().lower()
+        self._refresh_view()
+
+    def set_sort(self, column):
+        desc = self.sort is not None and self.sort[0] == column and not self.sort[1]
+        self.sort = (column, desc)
+        self._refresh_view()
+
+    def _match(self):
+        # 공백으로 나눈 단어 모두 만족(AND). 단어마다 토큰 인덱스(호선/야드/도메인 정확 일치)와 부분 문자열 일치의 합집합 —
+        # "hmd" 가 야드 토큰이어도 주소/제목에 hmd 가 들어간 행까지. 토큰에 걸린 행은 부분 문자열 검사를 건너뛴다
+        keys = None
+        meta = self.meta
+        for term in self.query.split():
+            tok = self.tokens.get(term, ())
+            hit = {k for k in (meta if keys is None else keys) if k in tok or term in meta[k][0]}
+            keys = hit if keys is None else keys & hit
+            if not keys:
+                break
+        return keys
+
+    def _refresh_view(self):
+        keys = self._match() if self.query else None
+        view = self.order if keys is None else [k for k in self.order if k in keys]
+        if self.sort:
+            col, desc = self.sort
+            if col == "subject":
+                meta = self.meta
+                view = sorted(view, key=lambda k: meta[k][2], reverse=desc)
+            else:
+                i, rows = self.COLUMNS.index(col), self.rows
+                view = sorted(view, key=lambda k: rows[k][i].lower(), reverse=desc)
+        self.view = view
+
 def open_remind_list_window(icon, item):
     def _show():
         top = tk.Toplevel(root)
@@ -1103,99 +4265,260 @@ def open_remind_list_window(icon, item):
         top.title("현재 Remind 리스트")
         top.geometry("700x420")
 
+        search_frame = tk.Frame(top)
+        search_frame.pack(side=tk.TOP, fill="x", padx=10, pady=(8, 0))
+        tk.Label(search_frame, text="검색 (수신인/제목/호선/야드):").pack(side=tk.LEFT)
+        query_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=query_var).pack(side=tk.LEFT, fill="x", expand=True, padx=6)
+
+        btn_frame = tk.Frame(top)
+        btn_frame.pack(side=tk.BOTTOM, pady=10)
+        status = tk.Label(top, anchor="w")
+        status.pack(side=tk.BOTTOM, fill="x", padx=10)
+
         tree = ttk.Treeview(
             top,
-            columns=("recipient", "subject", "last_sent"),
+            columns=RemindListModel.COLUMNS,
             show="headings",
             selectmode="extended"
         )
-        tree.heading("recipient", text="Recipient")
-        tree.heading("subject",   text="Subject")     # ✅ 제목 컬럼 추가
-        tree.heading("last_sent", text="Last Sent")
+        headings = {"recipient": "Recipient", "subject": "Subject", "last_sent": "Last Sent"}
+        for col, text in headings.items():
+            tree.heading(col, text=text, command=lambda c=col: sort_by(c))
         # (선택) 폭 약간 조정
         tree.column("recipient", width=230, anchor="w")
         tree.column("subject",   width=320, anchor="w")
         tree.column("last_sent", width=140, anchor="center")
 
+        scroll = ttk.Scrollbar(top, orient="vertical", command=tree.yview)
+        scroll.pack(side=tk.RIGHT, fill="y")
         tree.pack(fill="both", expand=True)
 
-        def populate():
-            tree.delete(*tree.get_children())
-
-            st = load_state()
+        model = RemindListModel()
+        shown = [0]                         # Treeview 에는 model.view 의 앞쪽 shown 개만 들어 있음
+        limit = [REMIND_LIST_PAGE_ROWS]     # 지금까지 요청된 페이지만큼만 Treeview 에 올림
+        busy = [False]                      # 로딩 스레드 1개만
+        debounce = [None]
+
+        def show_status():
+            view, more = model.view, len(model.view) - shown[0]
+            text = f"{len(view)}건" if not model.query else f"검색 결과 {len(view)}건 / 전체 {len(model.order)}건"
+            status.config(text=text + (f" (아래로 스크롤하면 {more}건 더 표시)" if more else ""))
+
+        def fill():
+            # 한 번에 한 페이지씩 insert — 나머지는 다음 after 틱으로 넘겨 창이 멈추지 않게
+            view = model.view
+            end = min(limit[0], len(view), shown[0] + REMIND_LIST_PAGE_ROWS)
+            for key in view[shown[0]:end]:
+                tree.insert("", "end", iid=key, values=model.rows[key])
+            shown[0] = max(shown[0], end)
+            if shown[0] < min(limit[0], len(view)):
+                top.after(1, fill)
+            show_status()
+
+        def sync(reset=False):
+            # Treeview 의 행들이 새 view 의 앞부분과 다르면(정렬/검색/정렬 키 변경) 보이는 페이지만 다시 그림
+            cur = tree.get_children()
+            if reset or list(cur) != model.view[:len(cur)]:
+                if cur:
+                    tree.delete(*cur)
+                shown[0] = 0
+                if reset:
+                    limit[0] = REMIND_LIST_PAGE_ROWS
+                    tree.yview_moveto(0)
+            fill()
+
+        def on_scroll(first, last):
+            scroll.set(first, last)
+            if float(last) > 0.9 and limit[0] <= shown[0] < len(model.view):
+                limit[0] += REMIND_LIST_PAGE_ROWS
+                fill()
+
+        tree.configure(yscrollcommand=on_scroll)
+
+        def sort_by(col):
+            model.set_sort(col)
+            col_, desc = model.sort
+            for c, text in headings.items():
+                tree.heading(c, text=text + ((" ▼" if desc else " ▲") if c == col_ else ""))
+            sync(reset=True)
+
+        def on_query(*_):
+            if debounce[0] is not None:
+                top.after_cancel(debounce[0])
+
+            def run():
+                debounce[0] = None
+                model.set_query(query_var.get())
+                sync(reset=True)
+            debounce[0] = top.after(REMIND_SEARCH_DEBOUNCE_MS, run)
+
+        query_var.trace_add("write", on_query)
+
+        def apply(d, err):
+            busy[0] = False
+            if err is not None:
+                messagebox.showerror("오류", f"리마인드 상태를 가져올 수 없습니다: {err}", parent=top)
+                return
+            if d.base is not model.rows:    # 로딩 중 선택 삭제됨 → 기준 스냅샷이 바뀌었으니 다시 계산
+                populate()
+                return
+            gone = [k for k in d.removed if tree.exists(k)]
+            if gone:
+                tree.delete(*gone)
+                shown[0] -= len(gone)
+            for key in d.changed:
+                if tree.exists(key):
+                    tree.item(key, values=d.rows[key])
+            model.commit(d)
+            sync()
 
-            # 수신인별 '가장 최신' 미회신(=계속 리마인드) 항목만 집계
-            latest_by_addr = {}
-            for key, val in st.items():
-                if "|" not in key:
-                    continue
-                entry_id, addr = key.split("|", 1)
-
-                # 회신 온 건 제외
-                if val.get("reply_received", False):
-                    continue
+        def populate():
+            # state 로딩 + 수신인별 집계 + diff + 인덱스는 로딩 스레드에서, Tk 스레드는 바뀐 행만 반영
+            if busy[0]:
+                return
+            busy[0] = True
 
-                sent_time = val.get("last_sent")
+            def load():
                 try:
-                    sent_dt = datetime.fromisoformat(sent_time) if sent_time else None
+                    d, err = model.diff(RemindListModel.build(ui_pending_entries())), None
+                except Exception as e:
+                    d, err = None, e
+                try:
+                    top.after(0, lambda: apply(d, err))
                 except Exception:
-                    sent_dt = None
-
-                prev = latest_by_addr.get(addr)
-                if not prev:
-                    latest_by_addr[addr] = (sent_dt, val, key)
-                else:
-                    prev_dt, _, _ = prev
-                    # 더 최신 발송 기준으로 교체
-                    if (sent_dt or datetime.min) > (prev_dt or datetime.min):
-                        latest_by_addr[addr] = (sent_dt, val, key)
-
-            # 화면에 뿌리기
-            for addr, (sent_dt, val, key) in latest_by_addr.items():
-                # tree.insert(
-                #     "",
-                #     "end",
-                #     iid=key,
-                #     values=(addr, val.get("last_sent", "-"))
-                # )
-                # 화면에 뿌리기
-                subj = val.get("subject", "-")                 # ✅ 제목 사용
-                last = _pretty_ts(val.get("last_sent", "-"))   # ✅ 시간 포맷 적용
-                tree.insert("", "end", iid=key, values=(addr, subj, last))
+                    pass    # 로딩 중 창이 닫힘
 
+            threading.Thread(target=load, name="remind-list-load", daemon=True).start()
 
+        def cancel_keys(keys):
+            # 키(EntryID|email) 히스토리 제거 + 차단 목록 추가를 한 번에 저장 (분리 모드면 엔진이 수행)
+            try:
+                ui_cancel_keys(keys)
+            except Exception as e:
+                messagebox.showerror("오류", f"발송 취소 실패: {e}", parent=top)
+                return
+            shown_keys = [k for k in keys if tree.exists(k)]
+            if shown_keys:
+                tree.delete(*shown_keys)
+                shown[0] -= len(shown_keys)
+            model.drop(keys)
+            sync()
 
         def delete_selected():
             sel = tree.selection()      # sel = state_key 들
-            st = load_state()
+            if sel:
+                cancel_keys(sel)
+
+        def delete_filtered():
+            # 화면에 아직 안 그려진 행까지 검색 결과 전체를 한 번에 취소
+            keys = list(model.view)
+            if not model.query or not keys:
+                return
+            if messagebox.askyesno("검색 결과 전체 취소",
+                                   f"'{model.query}' 검색 결과 {len(keys)}건의 리마인드 발송을 모두 취소할까요?",
+                                   parent=top):
+                cancel_keys(keys)
+
+        def open_original(event=None):
+            # COM 은 브로커 스레드에서만 — Tk 는 Future 완료만 기다린다 (스캔 중이어도 다음 COM 호출 사이에 처리)
+            sel = tree.selection()
+            if not sel:
+                return
+            entry_id = sel[0].split("|", 1)[0]
+            fut = ui_open_item(entry_id)
+
+            def report(f):
+                err = f.exception() if not f.cancelled() else None
+                if err is not None:
+                    top.after(0, lambda: messagebox.showerror("오류", f"원본 메일을 열 수 없습니다: {err}", parent=top))
+
+            def check_timeout():
+                if not fut.done() and fut.cancel():
+                    messagebox.showwarning("응답 없음", "Outlook 이 응답하지 않습니다. 잠시 후 다시 시도하세요.", parent=top)
+
+            fut.add_done_callback(report)
+            top.after(GUI_COM_TIMEOUT_SEC * 1000, check_timeout)
+
+        tree.bind("<Double-1>", open_original)
 
-            # 전역 차단 목록(키 단위) 준비
-            cancelled_keys = set(st.get("__cancelled_keys__", []))
+        tk.Button(btn_frame, text="새로고침", command=populate).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="원본 메일 열기", command=open_original).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="선택 삭제(발송 취소)", command=delete_selected).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="검색 결과 전체 취소", command=delete_filtered).pack(side=tk.LEFT, padx=6)
 
-            for key in sel:
-                # 1) 현재 키(state_key = EntryID|email) 히스토리 제거(선택)
-                st.pop(key, None)
-                # 2) 이 키만 차단 목록에 추가
-                cancelled_keys.add(key)
-                # 3) UI에서 제거
-                tree.delete(key)
+        populate()
 
-            # 차단 목록 저장
-            st["__cancelled_keys__"] = sorted(cancelled_keys)
-            save_state(st)
+    root.after(0, _show)
 
+def open_forecast_window(icon, item):
+    # 예정 인덱스(due_index.json / 엔진 메모리)만 읽음 — 창을 열어도 Outlook 호출 없음
+    def _show():
+        top = tk.Toplevel(root)
+        set_window_icon(top)
+        top.title("리마인드 발송 예정")
+        top.geometry("760x560")
+
+        status = tk.Label(top, anchor="w")
+        status.pack(side=tk.TOP, fill="x", padx=10, pady=(8, 0))
+
+        tk.Label(top, text=f"다음 {FORECAST_NEXT_N}건", anchor="w").pack(fill="x", padx=10, pady=(8, 0))
+        upcoming = ttk.Treeview(top, columns=("due", "to", "subject", "yard"), show="headings", height=10)
+        for col, text, width, anchor in (("due", "예정 시각", 120, "center"), ("to", "수신인", 200, "w"),
+                                         ("subject", "제목", 340, "w"), ("yard", "야드", 60, "center")):
+            upcoming.heading(col, text=text)
+            upcoming.column(col, width=width, anchor=anchor)
+        upcoming.pack(fill="both", expand=True, padx=10)
+
+        tk.Label(top, text=f"앞으로 {FORECAST_HOURS}시간 시간대별 건수", anchor="w").pack(fill="x", padx=10, pady=(8, 0))
+        hourly = ttk.Treeview(top, columns=("hour", "count", "bar"), show="headings", height=8)
+        for col, text, width, anchor in (("hour", "시간", 120, "center"), ("count", "건수", 60, "e"),
+                                         ("bar", "", 520, "w")):
+            hourly.heading(col, text=text)
+            hourly.column(col, width=width, anchor=anchor)
+        hourly.pack(fill="both", expand=True, padx=10)
+
+        def apply(fc, err):
+            if err is not None:
+                messagebox.showerror("오류", f"발송 예정을 가져올 수 없습니다: {err}", parent=top)
+                return
+            upcoming.delete(*upcoming.get_children())
+            hourly.delete(*hourly.get_children())
+            now = now_naive().isoformat(timespec="seconds")
+            for r in fc["next"]:
+                due = _pretty_ts(r["due"]) + (" (지남)" if r["due"] <= now else "")
+                upcoming.insert("", "end", values=(due, r.get("to", ""), r.get("subject", ""), r.get("yard", "")))
+            peak = max([c for _, c in fc["hourly"]] + [1])
+            for hour, count in fc["hourly"]:
+                hourly.insert("", "end", values=(_pretty_ts(hour), count, "█" * round(40 * count / peak)))
+            status.config(text=f"예정 {fc['total']}건 | 마지막 스캔: {_pretty_ts(fc.get('updated_at') or '-')}")
+
+        def load():
+            try:
+                fc, err = ui_forecast(), None
+            except Exception as e:
+                fc, err = None, e
+            try:
+                top.after(0, lambda: apply(fc, err))
+            except Exception:
+                pass    # 로딩 중 창이 닫힘
+
+        def refresh():
+            threading.Thread(target=load, name="forecast-load", daemon=True).start()
 
         btn_frame = tk.Frame(top)
         btn_frame.pack(pady=10)
-        tk.Button(btn_frame, text="새로고침", command=populate).pack(side=tk.LEFT, padx=6)
-        tk.Button(btn_frame, text="선택 삭제(발송 취소)", command=delete_selected).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="새로고침", command=refresh).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="닫기", command=top.destroy).pack(side=tk.LEFT, padx=6)
 
-        populate()
+        refresh()
 
     root.after(0, _show)
 
 def exit_action(icon, item):
     log("[INFO] Exit requested. Shutting down.")
+    if _ENGINE is not None:
+        _ENGINE.shutdown()
     exit_event.set()
     try:
         icon.stop()
@@ -1210,7 +4533,6 @@ def make_state_key(entry_id, recipient_addr):
     return f"{entry_id}|{(recipient_addr or '').lower()}"
 
 def main():
-    check_single_instance()
     cfg = load_body_map()
 
     parser = argparse.ArgumentParser(description="Automated Outlook Mail Reminder System (Fixed)")
@@ -1227,11 +4549,110 @@ def main():
     parser.add_argument("--include-self", action="store_true")
     parser.add_argument("--due-from-last", action="store_true")
     parser.add_argument("--include-deleted", action="store_true")
+    parser.add_argument("--scan-stores", default=SCAN_STORES_DEFAULT, metavar="default|all|NAME,...",
+                        help="보낸 편지함을 스캔할 저장소 (결과는 하나의 due 큐로 처리)")
+    parser.add_argument("--parallel-stores", action="store_true",
+                        help="--scan-stores 의 저장소를 저장소마다 스레드 하나로 동시에 스캔. "
+                             "Outlook 은 호출을 한 스레드에서 처리하므로 저장소가 서로 다른 서버에 있을 때만 효과가 있다")
+    parser.add_argument("--reply-workers", type=int, default=REPLY_SEARCH_WORKERS,
+                        help="회신 검색 스레드 수 (폴더를 나눠 병렬 검색, 1=순차). "
+                             "Outlook 이 호출을 한 스레드에서 처리하므로 폴더가 여러 서버에 있을 때만 효과가 있다")
     parser.add_argument("--reply-mode", choices=["hdr-only", "hdr-first", "conv-first"], default="conv-first")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="127.0.0.1:<port>/metrics 에 Prometheus 지표 노출 (0=비활성)")
+    parser.add_argument("--lateness-report", action="store_true",
+                        help="remind_trace.jsonl 의 yard 별 발송 지연 분포를 출력하고 종료")
+    parser.add_argument("--trace-query", metavar="KEY",
+                        help="conv key / state key 부분 문자열로 리마인드 trace 를 출력하고 종료")
+    parser.add_argument("--trace-since-days", type=float, default=0.0)
+    parser.add_argument("--compact-state", action="store_true",
+                        help="state.json 정리(오래된 항목 아카이브) 후 크기 비교를 출력하고 종료 (앱 종료 상태에서)")
+    parser.add_argument("--archive-replied-days", type=float, default=STATE_ARCHIVE_REPLIED_DAYS,
+                        help="회신 감지 후 이 일수가 지난 항목은 회신 여부만 남기고 상세는 아카이브로")
+    parser.add_argument("--maildir", metavar="PATH",
+                        help="Outlook 대신 Maildir/EML 디렉터리를 메일함으로 사용 (트레이/GUI 없이 실행)")
+    parser.add_argument("--me", action="append", metavar="ADDR",
+                        help="--maildir 사용 시 내 주소 (여러 번 지정 가능, 기본: 보낸 편지함 최다 발신자)")
+    parser.add_argument("--once", action="store_true", help="한 사이클만 실행하고 종료")
+    parser.add_argument("--record", metavar="FILE",
+                        help="한 사이클의 메일함 호출/값/시간을 익명화해 FILE(gzip JSON)로 녹화하고 종료 (--dry-run 권장)")
+    parser.add_argument("--replay", metavar="FILE", help="--record 녹화 파일로 사이클 재생 (Outlook 불필요, 1회 실행)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="재생 시 녹화된 호출 시간 배율 (0=대기 없음)")
+    parser.add_argument("--com-stall-warn-sec", type=float, default=COM_STALL_WARN_SEC,
+                        help="COM 호출 하나가 이 시간 넘게 블록되면 스택을 로그에 남김 (0=감시 끔)")
+    parser.add_argument("--com-stall-abandon-sec", type=float, default=COM_STALL_ABANDON_SEC,
+                        help="이 시간 넘게 블록되면 세션을 포기하고 새 COM 브로커 스레드로 재연결 (0=경고만)")
+    parser.add_argument("--low-impact", action="store_true",
+                        help="COM 호출 속도 제한 + 주기적 양보 + 지연 상승 시 자동 감속 (설정 창에서도 켤 수 있음)")
+    parser.add_argument("--com-rate", type=float, default=LOW_IMPACT_RATE, help="저영향 모드 최대 COM 호출/초")
+    parser.add_argument("--com-yield-ms", type=float, default=LOW_IMPACT_YIELD_MS,
+                        help=f"저영향 모드에서 {LOW_IMPACT_SLICE_CALLS}회 호출마다 쉬는 시간")
+    parser.add_argument("--split", action="store_true",
+                        help="스캔 엔진을 별도 프로세스로 실행하고 트레이/GUI 는 로컬 IPC 로만 통신 (config: split_process)")
+    parser.add_argument("--headless", action="store_true",
+                        help="서비스/데몬 모드: 트레이·GUI 모듈을 로드하지 않고 바로 스캔 루프 실행")
+    parser.add_argument("--engine", action="store_true", help=argparse.SUPPRESS)  # --split 이 띄우는 엔진 프로세스
     args = parser.parse_args()
+    if args.record or args.replay:
+        args.once = True
+
+    if args.lateness_report or args.trace_query:
+        since = now_naive() - timedelta(days=args.trace_since_days) if args.trace_since_days else None
+        if args.lateness_report:
+            print(lateness_report(since=since))
+        if args.trace_query:
+            for rec in query_trace(key=args.trace_query, since=since):
+                print(json.dumps(rec, ensure_ascii=False))
+        return
+    if args.compact_state:
+        print(json.dumps(compact_state(args.lookback_days, args.archive_replied_days)))
+        return
 
-    global VERBOSE
+    global VERBOSE, root, STATE_FILE, TRACE_FILE, LOG_PREFIX, _ENGINE, DUE_INDEX
     VERBOSE = args.verbose or cfg.get("verbose", False)
+    set_tag_grammar(cfg.get("tag_grammar"))
+    if args.engine:
+        LOG_PREFIX = "engine"
+        if win32event is not None:
+            check_single_instance("AutoRemindCS_Engine", quiet=True)   # 동시에 둘이 떠도 하나만 남도록
+        try:
+            pid = EngineClient().request("ping", timeout=2)["pid"]
+            log(f"[ENGINE] another engine is already running (pid {pid}); exiting")
+            return
+        except Exception:
+            pass
+    if args.low_impact or cfg.get("low_impact", False):
+        set_low_impact(True, rate=args.com_rate, yield_ms=args.com_yield_ms)
+        log(f"[INFO] Low-impact mode: {args.com_rate:.0f} COM calls/s, yield {args.com_yield_ms:.0f}ms "
+            f"every {LOW_IMPACT_SLICE_CALLS} calls")
+
+    if args.replay:
+        # 재생은 익명화된 키를 쓰므로 실제 state/trace 와 분리
+        STATE_FILE = os.path.join(APPDATA_DIR, "replay_state.json")
+        TRACE_FILE = os.path.join(APPDATA_DIR, "replay_trace.jsonl")
+        DUE_INDEX = DueIndex(os.path.join(APPDATA_DIR, "replay_due_index.json"))
+        for p in (STATE_FILE, TRACE_FILE, DUE_INDEX.path):
+            if os.path.exists(p): os.remove(p)
+
+    if args.maildir or args.replay or args.record or args.engine or args.headless:
+        # 헤드리스: 트레이/GUI/시작프로그램 등록 없이 포그라운드 루프
+        if args.headless and not (args.maildir or args.replay or args.record or args.engine):
+            check_single_instance(quiet=True)   # 실제 Outlook 을 쓰는 데몬은 트레이 인스턴스와 공존하지 않음
+        log(f"[INFO] Mail source: {args.replay or args.maildir or 'outlook'}"
+            + (f" (recording -> {args.record})" if args.record else ""))
+        if args.engine:
+            start_engine_server(args)
+        start_metrics_server(args.metrics_port)
+        start_com_watchdog(args.com_stall_warn_sec, args.com_stall_abandon_sec, _abandon_com_session)
+        try:
+            wait_worker(start_worker(args))
+        except KeyboardInterrupt:
+            exit_event.set()
+        return
+
+    check_single_instance()
+    _load_gui()
 
     # startup toggle from config at boot
     try:
@@ -1244,10 +4665,21 @@ def main():
 
     log(f"[INFO] Verbose mode = {VERBOSE}")
 
-    # background worker
-    mail_thread = threading.Thread(target=start_mail_check_loop, args=(args,), daemon=True)
-    mail_thread.start()
-    log("[INFO] Mail check background thread started.")
+    root = tk.Tk()
+    set_window_icon(root)
+    root.withdraw()
+
+    if args.split or cfg.get("split_process", False):
+        # 엔진(스캔/COM/metrics)은 별도 프로세스 — 이 프로세스는 트레이/GUI 만
+        _ENGINE = EngineSupervisor([a for a in sys.argv[1:] if a != "--split"])
+        _ENGINE.start()
+        log("[INFO] Split mode: scanning engine runs in a separate process.")
+    else:
+        start_metrics_server(args.metrics_port)
+        # background worker (+ COM 호출 감시)
+        start_com_watchdog(args.com_stall_warn_sec, args.com_stall_abandon_sec, _abandon_com_session)
+        start_worker(args)
+        log("[INFO] Mail check background thread started.")
 
     # Tray icon (detached so Tk mainloop can run on main thread)
     def resource_path(filename):
@@ -1264,6 +4696,7 @@ def main():
     menu = (
         item('설정 열기', open_settings_window),
         item('리마인드 리스트', open_remind_list_window),
+        item('발송 예정', open_forecast_window),
         item('종료', exit_action))
     tray = icon('AutoMailSystem', img, "자동 메일 리마인더", menu)
 
@@ -4,9 +4,10 @@
 # - 3 templates in config (T1/T2/T3), user-editable in Settings
 # - Per-mail template selection via dropdown (Treeview cell editor)
 # - Uses selected template on send, falls back to remind_message or T1
+# - Templates compiled once per config change; placeholders {hull} {yard} {overdue_days} {remind_count} {recipient_name}
 # - Keeps prior features (cancel key, reply detection, icons, tray, etc.)
 
-import os, re, sys, json, time, uuid, argparse, urllib.parse, threading, ctypes
+import os, re, sys, json, time, uuid, argparse, urllib.parse, threading, ctypes, html
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -145,13 +146,18 @@ def save_config(cfg):
 
 # ---------------- State ----------------
 def load_state():
+    # 읽기 실패 시 {} 로 이어 가면 다음 저장이 state 전체를 지우므로 예외를 그대로 올린다
     try:
         with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+            data = json.load(f)
     except FileNotFoundError:
         return {}
-    except Exception:
-        return {}
+    except Exception as e:
+        log(f"[ERR] cannot read {STATE_FILE}: {e}", level="ERROR")
+        raise
+    if not isinstance(data, dict):
+        raise ValueError(f"state file top level is {type(data).__name__}")
+    return data
 
 def save_state(st):
     tmp = STATE_FILE + ".tmp"
@@ -204,6 +210,46 @@ def format_body_text(text):
     processed = processed.replace('\n', '<br>')
     return f"<p>{processed}</p>"
 
+# ---------------- Template engine ----------------
+TEMPLATE_FIELDS = ("hull", "yard", "overdue_days", "remind_count", "recipient_name")
+_PLACEHOLDER_RE = re.compile(r"\{(" + "|".join(TEMPLATE_FIELDS) + r")\}")
+HULL_NO_RE = re.compile(r"(?<![A-Z0-9])(?:SN|H)\d{3,5}(?!\d)")   # 호선 번호: SN2693, H3525
+
+def compile_template(text):
+    """템플릿 → render(**values) (HTML). format_body_text 는 컴파일 때 한 번만, 렌더는 escape 한 값만 끼워 join.
+    TEMPLATE_FIELDS 에 없는 {이름} 은 글자 그대로 둔다."""
+    names = []
+    def _mark(m):
+        names.append(m.group(1))
+        return f"\x00{len(names) - 1}\x00"
+    parts = format_body_text(_PLACEHOLDER_RE.sub(_mark, text or "")).split("\x00")
+    lits, fields = parts[0::2], [names[int(i)] for i in parts[1::2]]
+    if not fields:
+        return lambda **_: lits[0]
+
+    def render(**values):
+        out = [lits[0]]
+        for name, lit in zip(fields, lits[1:]):
+            out.append(html.escape(str(values.get(name, ""))))
+            out.append(lit)
+        return "".join(out)
+    return render
+
+_TEMPLATE_CACHE = {"mtime": None, "default": None, "by_code": {}}
+
+def compiled_templates():
+    """(기본 render, {code: (label, render)}) — config.json 이 바뀔 때만 다시 컴파일."""
+    def _mtime():
+        try: return os.stat(CONFIG_FILE).st_mtime_ns
+        except OSError: return None
+    c = _TEMPLATE_CACHE
+    if c["default"] is None or c["mtime"] != _mtime():
+        cfg = load_config()
+        by_code = {s["code"]: (s["label"], compile_template(s["text"])) for s in cfg["templates"]}
+        default_text = cfg.get("remind_message") or cfg["templates"][0]["text"]
+        c.update(mtime=_mtime(), default=compile_template(default_text), by_code=by_code)
+    return c["default"], c["by_code"]
+
 def canonicalize_subject(subj: str) -> str:
     if not subj: return ""
     s = subj.strip()
@@ -509,7 +555,8 @@ def _sanitize_bad_cids(html: str, verbose=False) -> str:
     return html
 
 # ---------------- Send remind ----------------
-def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, state, dry_run=False, verbose=False):
+def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, state, dry_run=False, verbose=False,
+                               due_time=None):
     def _self_smtp():
         try:
             ae = app.Session.CurrentUser.AddressEntry
@@ -523,17 +570,22 @@ def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, sta
         for r in item.Recipients:
             try:
                 if r.Type in (1, 3):
-                    addr = getattr(r, "Address", None) or getattr(r, "Name", None)
-                    if addr: recipients.append((addr, r.Type))
+                    name = getattr(r, "Name", None)
+                    addr = getattr(r, "Address", None) or name
+                    if addr: recipients.append((addr, r.Type, name))
             except Exception:
                 continue
         if not recipients:
             if verbose: log("[WARN] no To/BCC recipients on original mail")
             return False
 
-        cfg = load_config()
-        tpl_map = {s["code"]: s for s in cfg["templates"]}
-        default_text = cfg.get("remind_message") or tpl_map["T1"]["text"]
+        default_render, tpl_map = compiled_templates()
+        m = HULL_NO_RE.search((subject or "").upper())
+        values = {
+            "hull": m.group(0) if m else "",
+            "yard": yard_code or "",
+            "overdue_days": max(0, (now_naive() - due_time).days) if due_time else 0,
+        }
 
         me_addr = _self_smtp() or getattr(item, "SenderEmailAddress", None) or "me@example.com"
         sent_any = False
@@ -541,7 +593,7 @@ def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, sta
         st_snapshot = load_state()
         cancelled_keys = set(st_snapshot.get("__cancelled_keys__", []))
 
-        for addr, rtype in recipients:
+        for addr, rtype, name in recipients:
             state_key = make_state_key(item.EntryID, addr)
             if state_key in cancelled_keys:
                 log(f"[CANCELLED-SKIP] {state_key} is cancelled; skip sending.")
@@ -551,12 +603,9 @@ def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, sta
 
             # choose template per key
             code = state.get(state_key, {}).get("template_code")
-            if code and code in tpl_map:
-                remind_text = tpl_map[code]["text"]
-            else:
-                remind_text = default_text
-
-            remind_html = format_body_text(remind_text)
+            label, render = tpl_map.get(code) or (None, default_render)
+            remind_count = state.get(state_key, {}).get("remind_count", 0) + 1
+            remind_html = render(remind_count=remind_count, recipient_name=name or addr, **values)
 
             fwd = item.Forward()
             fwd.Subject = f"[Remind] {subject}"
@@ -589,16 +638,13 @@ def send_remind_for_recipients(app, item, subject, fallback_body, yard_code, sta
                 ts = now_naive().isoformat()
 
                 # keep selected template meta for display
-                label = None
-                if code and code in tpl_map:
-                    label = tpl_map[code]["label"]
-
                 state[state_key] = {
                     "reply_received": False,
                     "last_sent": ts,
                     "subject": subject,
                     "template_code": code,
                     "template_label": label,
+                    "remind_count": remind_count,
                 }
                 save_state(state)
 
@@ -759,7 +805,7 @@ def cycle_once(ns, app, state, lookback_days, dry_run, force_send, skip_reply_ch
                 ok = send_remind_for_recipients(
                     app, mail, subject,
                     load_config().get("remind_message",""),
-                    code, state, dry_run=dry_run, verbose=verbose
+                    code, state, dry_run=dry_run, verbose=verbose, due_time=due_time
                 )
                 if ok:
                     sent_count += 1
@@ -801,6 +847,8 @@ def create_and_show_gui():
     lf = tk.LabelFrame(top, text="Templates (3개)", font=("Malgun Gothic", 10, "bold"))
     lf.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=10, pady=8)
     lf.grid_columnconfigure(1, weight=1)
+    tk.Label(lf, text="자리표시자: " + " ".join("{%s}" % f for f in TEMPLATE_FIELDS), fg="#555",
+             font=("Malgun Gothic", 9)).grid(row=0, column=0, columnspan=4, sticky="w", padx=8, pady=(4,0))
 
     slots = cfg["templates"]
     tpl_vars = []
@@ -989,13 +1037,23 @@ def open_remind_list_window(icon=None, item=None):
 
         tk.Button(panel, text="선택 행에 적용", command=apply_to_selected).grid(row=3, column=0, sticky="ew", pady=(0,8))
 
+        def load_state_or_report():
+            # state.json 을 읽지 못하면 Tk 콜백 예외로 묻히지 않도록 오류 창을 띄우고 None
+            try:
+                return load_state()
+            except Exception as e:
+                messagebox.showerror("오류", f"리마인드 상태를 가져올 수 없습니다: {e}", parent=top)
+                return None
+
         def delete_selected():
             sel = tree.selection()
             if not sel:
                 return
             if not messagebox.askyesno("확인", "선택 항목을 삭제(발송 취소) 하시겠습니까?"):
                 return
-            st = load_state()
+            st = load_state_or_report()
+            if st is None:
+                return
             cancelled = set(st.get("__cancelled_keys__", []))
             for key in sel:
                 st.pop(key, None)
@@ -1014,7 +1072,9 @@ def open_remind_list_window(icon=None, item=None):
             if not pending_changes:
                 messagebox.showinfo("저장", "저장할 변경이 없습니다.")
                 return
-            st = load_state()
+            st = load_state_or_report()
+            if st is None:
+                return
             # rowid == state key 형태: "<entry_id>|<addr>"
             for rowid, label in pending_changes.items():
                 code = None
@@ -1052,8 +1112,10 @@ def open_remind_list_window(icon=None, item=None):
         pending_changes = {}  # rowid -> label
 
         def populate():
+            st = load_state_or_report()
+            if st is None:
+                return
             tree.delete(*tree.get_children())
-            st = load_state()
             for key, val in st.items():
                 if "|" not in key: 
                     continue
@@ -1128,7 +1190,6 @@ def show_startup_notification():
     ctypes.windll.user32.MessageBoxW(0, "백그라운드에서 Auto Reminder가 실행 중입니다.", "Auto Reminder 실행됨", 0x40)
 
 def start_mail_check_loop(args):
-    st = load_state()
     while not exit_event.is_set():
         try:
             st = load_state()
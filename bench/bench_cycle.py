@@ -0,0 +1,359 @@
+# bench_cycle.py
+# cycle_once 종단간(E2E) 벤치마크 — 메일함 크기별 전체 사이클/회신확인 지연과 메모리를 JSON 으로 기록.
+# 크기별로 자식 프로세스에서 돌려 (1) 메모리 피크(maxrss)가 크기별로 분리되고 (2) 시간 초과 시 끊을 수 있다.
+#
+#   python bench/bench_cycle.py                          # 1k,10k,100k,1m (SynthSource, 메모리 메일함)
+#   python bench/bench_cycle.py --sizes 1k,10k --backend maildir
+#   python bench/bench_cycle.py --sizes 1k --backend fakecom --com-latency-ms 0.2 --com-op-latency Sort=40
+#   python bench/bench_cycle.py --sizes 1k --backend fakecom --com-latency-ms 0.2 --ui-probe [--low-impact]
+#   python bench/bench_cycle.py --sizes 1k --backend fakecom --com-latency-ms 0.2 --stores 3 [--parallel-stores]  # 저장소 3개 (크기는 저장소당)
+#   python bench/bench_cycle.py --sizes 1k --backend fakecom --com-latency-ms 0.2 --reply-workers 4
+#     (가짜 COM 지연은 기본적으로 Outlook 처럼 한 번에 하나씩 처리된다; --com-parallel 은 겹치는 지연 = 상한 근사치)
+#   python bench/bench_cycle.py --compare bench/results/cycle_old.json
+#
+# 상태/로그/trace 는 크기별 임시 APPDATA 에 쓰이므로 실제 state.json 에는 영향이 없다.
+
+import os, sys, json, time, argparse, platform, subprocess, tempfile, shutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path.insert(0, BENCH_DIR)
+
+import synth_mailbox
+
+SIZE_ALIASES = {"k": 1_000, "m": 1_000_000}
+
+def parse_size(s):
+    s = s.strip().lower()
+    if s and s[-1] in SIZE_ALIASES:
+        return int(float(s[:-1]) * SIZE_ALIASES[s[-1]])
+    return int(s)
+
+def _maxrss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+# ---- in-memory MailSource over SynthMailbox (child process only)
+def make_synth_source(ar, mb):
+    """ar: Auto_Reminder_List 모듈. 속성 조회마다 com_reads 를 세어 ComProxy 수치와 비교 가능하게 한다."""
+
+    class SynthSource(ar.MailSource):
+        name = "synth"
+
+        def __init__(self, mb):
+            self.mb = mb
+            self.sent_log = []
+
+        def default_folder(self, kind):
+            return self.mb.default[kind]
+
+        def outgoing_folders(self, include_deleted=False):
+            for f in self.mb.default[self.mb.SENT].walk():
+                ar.stat_inc("folders_visited")
+                yield f
+
+        def mail_folders(self, include_deleted=False):
+            deleted = self.mb.default[self.mb.DELETED]
+            for f in self.mb.root.walk():
+                if not include_deleted and (f is deleted or f.parent is deleted):
+                    continue
+                ar.stat_inc("folders_visited")
+                yield f
+
+        def folder_path(self, folder):
+            return folder.path
+
+        def folder_count(self, folder):
+            return len(folder.items)
+
+        _SORT_ATTR = {"SentOn": "sent_on", "ReceivedTime": "received"}
+
+        def items(self, folder, sort=None, descending=True, since=None):
+            items = folder.items
+            if sort:
+                attr = self._SORT_ATTR[sort]
+                if since is not None:
+                    items = [m for m in items if getattr(m, attr) >= since]
+                items = sorted(items, key=lambda m: getattr(m, attr), reverse=descending)
+            ar.stat_inc("items_enumerated", len(items))
+            return iter(items)
+
+        def read_prop(self, m, name):
+            ar.stat_inc("com_reads")
+            if name == "Class": return ar.OL_MAILITEM
+            if name == "Subject": return m.subject
+            if name == "SentOn": return m.sent_on
+            if name == "ReceivedTime": return m.received
+            if name == "SenderEmailAddress": return m.sender
+            if name == "SenderName": return m.sender_name
+            if name == "EntryID": return m.entry_id
+            if name == "MessageID": return m.msgid
+            if name == "ConversationID": return m.conv_id
+            if name == "ConversationTopic": return m.topic
+            if name == "To": return "; ".join(m.to)
+            if name == "CC": return "; ".join(m.cc)
+            if name == "BCC": return "; ".join(m.bcc)
+            if name == "Body": return m.body()
+            if name == "HTMLBody": return m.html()
+            return None
+
+        def recipients(self, m):
+            return ([(a, 1, a) for a in m.to] + [(a, 2, a) for a in m.cc] + [(a, 3, a) for a in m.bcc])
+
+        def sender_smtp(self, m, sender_addr):
+            return sender_addr
+
+        def my_addresses(self):
+            return {self.mb.me}
+
+        def self_smtp(self):
+            return self.mb.me
+
+        def forward(self, m):
+            return ar.EmlDraft(subject="FW: " + m.subject, html=m.html(), orig=m)
+
+        def send(self, draft):
+            self.sent_log.append((draft.Subject, draft.To, draft.BCC))
+
+        def delete(self, m):
+            for f in self.mb.root.walk():
+                if m in f.items:
+                    f.items.remove(m)
+                    return
+
+    return SynthSource(mb)
+
+def run_child(size, cfg, backend, args):
+    """자식 프로세스: 메일함 생성 → cycle_once 1회 → 결과 dict"""
+    import Auto_Reminder_List as ar
+    sent = int(size * cfg.pop("sent_share"))
+    cfg.update({"sent": sent, "inbox": size - sent})
+
+    t0 = time.perf_counter()
+    mbs = [synth_mailbox.generate(dict(cfg, seed=cfg.get("seed", 1) + i,
+                                       store=f"{synth_mailbox.DEFAULTS['store']} {i + 1}" if i else
+                                       synth_mailbox.DEFAULTS["store"]))
+           for i in range(args.stores)]
+    mb = mbs[0]
+    gen_sec = time.perf_counter() - t0
+    rss_after_gen = _maxrss_mb()
+
+    latency = None
+    if backend == "fakecom":
+        import fake_outlook
+        per_op = dict(kv.split("=", 1) for kv in (args.com_op_latency or []))
+        latency = fake_outlook.LatencyModel(base_ms=args.com_latency_ms, jitter_ms=args.com_jitter_ms,
+                                            per_op={k: float(v) for k, v in per_op.items()},
+                                            fail_rate=args.com_fail_rate, seed=cfg.get("seed", 0),
+                                            sta=not args.com_parallel)
+        app = fake_outlook.FakeOutlook(mbs, latency=latency, exchange_rate=args.exchange_rate,
+                                       seed=cfg.get("seed", 0))
+        src = ar.OutlookSource(ar.ComProxy(app))
+    elif backend == "maildir":
+        mdir = os.path.join(os.environ["APPDATA"], "maildir")
+        t0 = time.perf_counter()
+        for m in mbs:
+            synth_mailbox.write_maildir(m, os.path.join(mdir, m.root.name) if len(mbs) > 1 else mdir)
+        gen_sec += time.perf_counter() - t0
+        del mb, mbs
+        src = ar.MaildirSource(mdir, me=[cfg.get("me", synth_mailbox.DEFAULTS["me"])])
+    else:
+        src = make_synth_source(ar, mb)
+
+    throttle = ar.set_low_impact(True, rate=args.com_rate, yield_ms=args.com_yield_ms) if args.low_impact else None
+    probe = fake_outlook.UiProbe(latency).start() if latency and args.ui_probe else None
+
+    ar.cycle_stats_begin()
+    err = None
+    t0 = time.perf_counter()
+    try:
+        ar.cycle_once(src, {}, args.lookback_days, False, False, args.skip_reply_check, False,
+                      False, False, "conv-first", False, 10, args.loop_budget_sec, 0.0,
+                      args.skip_if_newer_outgoing, stores=args.scan_stores,
+                      parallel_stores=args.parallel_stores, reply_workers=args.reply_workers)
+    except Exception as e:
+        err = e
+    cycle_sec = time.perf_counter() - t0
+    if probe:
+        probe.stop()
+    stats = ar.cycle_stats_end(err) or {}
+    ar.log_shutdown()
+    return {
+        "size": size,
+        "stores": args.stores,
+        "sent": sent,
+        "inbox": size - sent,
+        "backend": backend,
+        "gen_sec": round(gen_sec, 3),
+        "cycle_sec": round(cycle_sec, 3),
+        "reply_check_sec": stats.get("phases", {}).get("reply_check", 0.0),
+        "phases": stats.get("phases", {}),
+        "counts": stats.get("counts", {}),
+        "rss_after_gen_mb": rss_after_gen,
+        "maxrss_mb": _maxrss_mb(),
+        "fake_com": latency.summary() if latency else None,
+        "ui_probe": probe.summary() if probe else None,
+        "throttle": {"slept_sec": round(throttle.slept, 3), "backoffs": throttle.backoffs,
+                     "final_rate": throttle.rate} if throttle else None,
+        "error": repr(err) if err else None,
+    }
+
+def run_size(size, cfg, args):
+    """부모 프로세스: 임시 APPDATA 로 자식 실행, 시간 초과 시 status=timeout"""
+    tmp = tempfile.mkdtemp(prefix="autoremind-bench-")
+    out = os.path.join(tmp, "result.json")
+    env = dict(os.environ, APPDATA=tmp, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", str(size), "--child-out", out,
+           "--child-cfg", json.dumps(cfg), "--backend", args.backend,
+           "--lookback-days", str(args.lookback_days), "--loop-budget-sec", str(args.loop_budget_sec),
+           "--com-latency-ms", str(args.com_latency_ms), "--com-jitter-ms", str(args.com_jitter_ms),
+           "--com-fail-rate", str(args.com_fail_rate), "--exchange-rate", str(args.exchange_rate),
+           "--stores", str(args.stores), "--scan-stores", args.scan_stores,
+           "--reply-workers", str(args.reply_workers)]
+    if args.parallel_stores: cmd.append("--parallel-stores")
+    if args.com_parallel: cmd.append("--com-parallel")
+    for kv in args.com_op_latency or []:
+        cmd += ["--com-op-latency", kv]
+    if args.skip_reply_check: cmd.append("--skip-reply-check")
+    if args.skip_if_newer_outgoing: cmd.append("--skip-if-newer-outgoing")
+    if args.ui_probe: cmd.append("--ui-probe")
+    if args.low_impact:
+        cmd += ["--low-impact", "--com-rate", str(args.com_rate), "--com-yield-ms", str(args.com_yield_ms)]
+    t0 = time.perf_counter()
+    try:
+        subprocess.run(cmd, env=env, timeout=args.timeout_sec, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        with open(out, "r", encoding="utf-8") as f:
+            res = json.load(f)
+        res["status"] = "error" if res.get("error") else "ok"
+    except subprocess.TimeoutExpired:
+        res = {"size": size, "status": "timeout", "timeout_sec": args.timeout_sec}
+    except subprocess.CalledProcessError as e:
+        res = {"size": size, "status": "crash", "stderr": (e.stderr or b"").decode("utf-8", "replace")[-2000:]}
+    res["wall_sec"] = round(time.perf_counter() - t0, 3)
+    shutil.rmtree(tmp, ignore_errors=True)
+    return res
+
+def compare(old, new):
+    """두 결과 파일의 크기별 cycle/reply_check/메모리 비율 표"""
+    prev = {r["size"]: r for r in old.get("results", [])}
+    lines = [f"{'size':>9} {'cycle old':>10} {'cycle new':>10} {'ratio':>6} {'reply old':>10} {'reply new':>10} {'rss old':>8} {'rss new':>8}"]
+    for r in new.get("results", []):
+        o = prev.get(r["size"])
+        if not o:
+            continue
+        def g(d, k):
+            v = d.get(k)
+            return v if isinstance(v, (int, float)) else None
+        co, cn = g(o, "cycle_sec"), g(r, "cycle_sec")
+        ratio = f"{cn / co:.2f}" if co and cn else "-"
+        fmt = lambda v: "-" if v is None else f"{v:.3f}" if isinstance(v, float) else str(v)
+        lines.append(f"{r['size']:>9} {fmt(co):>10} {fmt(cn):>10} {ratio:>6} "
+                     f"{fmt(g(o, 'reply_check_sec')):>10} {fmt(g(r, 'reply_check_sec')):>10} "
+                     f"{fmt(g(o, 'maxrss_mb')):>8} {fmt(g(r, 'maxrss_mb')):>8}")
+    return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-end cycle_once benchmark on synthetic mailboxes")
+    ap.add_argument("--sizes", default="1k,10k,100k,1m", help="총 메일 수 목록 (예: 1k,10k,100k,1m)")
+    ap.add_argument("--backend", choices=["synth", "maildir", "fakecom"], default="synth",
+                    help="synth=메모리 메일함, maildir=EML 로 기록 후 MaildirSource, "
+                         "fakecom=가짜 Outlook COM(지연 주입) 위의 OutlookSource")
+    ap.add_argument("--sent-share", type=float, default=0.4, help="전체 중 보낸 편지함 비율")
+    ap.add_argument("--config", help="synth_mailbox.DEFAULTS 를 덮어쓸 JSON 파일")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--lookback-days", type=int, default=60)
+    ap.add_argument("--loop-budget-sec", type=int, default=45)
+    ap.add_argument("--skip-reply-check", action="store_true")
+    ap.add_argument("--stores", type=int, default=1, help="저장소 수 (fakecom/maildir, 크기는 저장소당)")
+    ap.add_argument("--scan-stores", default="all", help="cycle_once 의 stores 인자 (default|all|이름,...)")
+    ap.add_argument("--parallel-stores", action="store_true", help="cycle_once 의 parallel_stores (저장소마다 스레드)")
+    ap.add_argument("--reply-workers", type=int, default=1, help="회신 검색 스레드 수 (1=순차)")
+    ap.add_argument("--skip-if-newer-outgoing", action="store_true")
+    ap.add_argument("--timeout-sec", type=float, default=1800, help="크기별 제한 시간")
+    ap.add_argument("--com-latency-ms", type=float, default=0.0, help="fakecom: 호출당 기본 지연")
+    ap.add_argument("--com-jitter-ms", type=float, default=0.0, help="fakecom: 호출당 추가 무작위 지연 상한")
+    ap.add_argument("--com-op-latency", action="append", metavar="OP=MS",
+                    help="fakecom: 특정 호출 지연 (예: Sort=40, MailItem.HTMLBody=5)")
+    ap.add_argument("--com-fail-rate", type=float, default=0.0, help="fakecom: 호출 실패 확률")
+    ap.add_argument("--com-parallel", action="store_true",
+                    help="fakecom: 여러 스레드의 호출 지연이 겹치게 (기본은 Outlook STA 처럼 직렬)")
+    ap.add_argument("--exchange-rate", type=float, default=0.0, help="fakecom: EX(X500) 주소로 보일 외부 주소 비율")
+    ap.add_argument("--ui-probe", action="store_true",
+                    help="fakecom: Outlook UI 입력 지연 근사치(UiProbe) 측정")
+    ap.add_argument("--low-impact", action="store_true", help="저영향 모드(COM 호출 속도 제한)로 실행")
+    ap.add_argument("--com-rate", type=float, default=4000, help="--low-impact 최대 COM 호출/초")
+    ap.add_argument("--com-yield-ms", type=float, default=10, help="--low-impact 슬라이스마다 쉬는 시간")
+    ap.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/cycle_<시각>.json)")
+    ap.add_argument("--compare", metavar="OLD_JSON", help="이전 결과와 비교표 출력")
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--child-out", help=argparse.SUPPRESS)
+    ap.add_argument("--child-cfg", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        res = run_child(args.child, json.loads(args.child_cfg), args.backend, args)
+        with open(args.child_out, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False)
+        return 0
+
+    cfg = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg.update(json.load(f))
+    cfg.update({"seed": args.seed, "sent_share": args.sent_share})
+
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(",") if s.strip()]:
+        res = run_size(size, dict(cfg), args)
+        results.append(res)
+        print(f"[BENCH] size={size} status={res['status']} cycle={res.get('cycle_sec', '-')}s "
+              f"reply_check={res.get('reply_check_sec', '-')}s maxrss={res.get('maxrss_mb', '-')}MB "
+              f"wall={res['wall_sec']}s", flush=True)
+        if res.get("ui_probe"):
+            print(f"[BENCH]   ui_probe={res['ui_probe']} throttle={res.get('throttle')}", flush=True)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "config": dict(synth_mailbox.DEFAULTS, **cfg),
+        "params": {"lookback_days": args.lookback_days, "loop_budget_sec": args.loop_budget_sec,
+                   "com_latency_ms": args.com_latency_ms, "com_jitter_ms": args.com_jitter_ms,
+                   "com_op_latency": args.com_op_latency, "com_fail_rate": args.com_fail_rate,
+                   "com_parallel": args.com_parallel,
+                   "exchange_rate": args.exchange_rate,
+                   "low_impact": args.low_impact, "com_rate": args.com_rate, "com_yield_ms": args.com_yield_ms,
+                   "skip_reply_check": args.skip_reply_check,
+                   "stores": args.stores, "scan_stores": args.scan_stores,
+                   "parallel_stores": args.parallel_stores, "reply_workers": args.reply_workers,
+                   "skip_if_newer_outgoing": args.skip_if_newer_outgoing},
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"cycle_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[BENCH] results -> {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare(json.load(f), report))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# bench_hot.py
+# 안쪽 루프 순수 함수 마이크로벤치마크 + 회귀 게이트.
+# 한/일 제목 코퍼스, Outlook(Word) 생성 HTML(VML imagedata, CSS background, 서명 이미지) 코퍼스로
+# 함수별 호출당 시간을 재고 baseline_hot.json 과 비교해 임계치 이상 느려지면 종료코드 1.
+#
+#   python bench/bench_hot.py                      # baseline 과 비교 (보정 루프 대비 비율 rel, 기본 임계치 +30%)
+#   python bench/bench_hot.py --absolute           # 호출당 ns 그대로 비교 (baseline 을 만든 그 장비에서만 의미 있음)
+#   python bench/bench_hot.py --update-baseline    # 현재 수치를 baseline 으로 저장
+#
+# 저장소에 커밋된 baseline_hot.json 은 한 장비(파일의 platform/python)에서 잰 값이라 그 장비에만 맞는다.
+# 그래서 기본 비교는 같은 프로세스에서 잰 보정 루프 대비 비율(rel)이고, 늘어난 시간이 --noise-floor-ns 미만인
+# 변화(1µs 미만 함수의 타이머/스케줄링 흔들림)는 비율이 임계치를 넘어도 회귀로 보지 않는다.
+# 다른 장비에서 정확한 게이트가 필요하면 그 장비에서 --update-baseline 으로 baseline 을 다시 만든다.
+
+import os, gc, sys, json, time, random, argparse, platform, tempfile, shutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline_hot.json")
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("APPDATA", tempfile.gettempdir())   # 리눅스에서 import 시 cwd 에 폴더가 생기지 않도록
+
+import synth_mailbox
+import Auto_Reminder_List as ar
+
+# ---- corpora
+STATUS_TAGS = ["[DN3D]", "[DH1W]", "[DA12H]", "[FU2D]", "[FI30MIN]", "[FP1M]"]
+BODY_TEXTS = [
+    "안녕하세요,\n**도면 승인** 요청 드린 건 아직 회신이 확인되지 않아 다시 한번 리마인드 드립니다.\n감사합니다.",
+    "お世話になっております。\n**図面承認**の件、ご確認のほどよろしくお願いいたします。\n",
+    "Dear all,\nKindly **review and reply** on the attached drawing.\nBest regards,",
+]
+
+def subject_corpus(n=2000, seed=7):
+    rnd = random.Random(seed)
+    mb = synth_mailbox.generate({"sent": n // 2, "inbox": n // 2, "tag_rate": 0.6, "prefix_rate": 0.5, "seed": seed})
+    subs = [m.subject for f in mb.root.walk() for m in f.items]
+    out = []
+    for s in subs:
+        r = rnd.random()
+        if r < 0.15:
+            s = f"{s} {rnd.choice(STATUS_TAGS)}"
+        elif r < 0.2:
+            s = "[Remind] " + s
+        elif r < 0.25:
+            s = s.replace("[", "［").replace("]", "］")   # 전각 괄호
+        out.append(s)
+    return out
+
+OUTLOOK_HTML = """<html xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office"
+xmlns:w="urn:schemas-microsoft-com:office:word" xmlns:m="http://schemas.microsoft.com/office/2004/12/omml">
+<head><meta http-equiv=Content-Type content="text/html; charset=ks_c_5601-1987">
+<style><!--
+@font-face {{font-family:"맑은 고딕"; panose-1:2 11 5 3 2 0 0 2 0 4;}}
+p.MsoNormal, li.MsoNormal, div.MsoNormal {{margin:0cm; font-size:10.0pt; font-family:"맑은 고딕";}}
+.MsoChpDefault {{mso-style-type:export-only;}}
+div.WordSection1 {{page:WordSection1;}}
+--></style><!--[if gte mso 9]><xml><o:shapedefaults v:ext="edit" spidmax="1026" /></xml><![endif]-->
+</head>
+<body lang=KO link="#0563C1" vlink="#954F72" style='word-wrap:break-word'>
+<div class=WordSection1>
+<table style='background:url("{bg}") no-repeat; width:600px'><tr><td style="background-image:url({bg2})">
+<p class=MsoNormal>{text}</p></td></tr></table>
+<!--[if gte vml 1]><v:shape id="Picture_x0020_1" style='width:90pt;height:30pt' type="#_x0000_t75">
+<v:imagedata src="{vml}" o:title="logo"/></v:shape><![endif]--><![if !vml]>
+<img width=120 height=40 src="{img}" alt="logo" v:shapes="Picture_x0020_1"><![endif]>
+<img src="cid:image001.png@01DB1234.56789AB0"><img src="cid:filelist.xml@01DB1234">
+<img src="https://cdn.example.com/banner.png">
+<p class=MsoNormal><span style='font-size:9.0pt;color:#7F7F7F'>{sig}</span></p>
+{quote}
+</div></body></html>"""
+
+QUOTE = ("<div style='border:none;border-top:solid #E1E1E1 1.0pt;padding:3.0pt 0cm 0cm 0cm'>"
+         "<p class=MsoNormal><b>From:</b> user001@hmd.example.co.kr<br><b>Sent:</b> Monday, October 6, 2025 9:12 AM"
+         "<br><b>Subject:</b> RE: [HMD12H] SN2693 도면 승인 요청 (Rev.3)</p></div><p class=MsoNormal>{t}</p>")
+
+def html_corpus(img_dir, n=40, seed=11):
+    """서명 이미지는 img_dir 의 실제 파일을 가리켜 _attach_images_and_rewrite_html 가 첨부 경로를 탄다."""
+    rnd = random.Random(seed)
+    files = []
+    for i in range(4):
+        p = os.path.join(img_dir, f"image{i:03d}.png")
+        with open(p, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n" + bytes(64))
+        files.append(p)
+    url = lambda p: "file:///" + p.replace(os.sep, "/").lstrip("/")
+    out = []
+    for i in range(n):
+        depth = rnd.randint(0, 6)
+        quote = "".join(QUOTE.format(t=rnd.choice(BODY_TEXTS).replace("\n", "<br>")) for _ in range(depth))
+        out.append(OUTLOOK_HTML.format(
+            bg=url(rnd.choice(files)), bg2=rnd.choice(files), vml=url(rnd.choice(files)), img=rnd.choice(files),
+            text=rnd.choice(BODY_TEXTS).replace("\n", "<br>"), sig="CS Team | 씨넷 | Tel. 051-000-0000",
+            quote=quote))
+    return out
+
+def conv_key_corpus(n=2000, seed=13):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        r = rnd.random()
+        d = {"EntryID": f"00000000{i:040X}", "ConversationID": f"{i:032X}",
+             "ConversationTopic": f"SN2693 도면 승인 요청 {i}", "SentOn": ar.datetime(2025, 10, 1, 9, i % 60)}
+        if r < 0.7:
+            d["MessageID"] = f"<SE2P216MB{i:08d}@SE2P216MB.KORP216.PROD.OUTLOOK.COM>"
+        elif r < 0.9:
+            pass
+        else:
+            d["EntryID"] = None
+        out.append(d)
+    return out
+
+# ---- timing
+def _time_per_call(fn, args_list, repeat=7, min_time=0.2):
+    """args_list 를 한 바퀴 도는 데 걸린 시간의 최솟값 / 호출 수 (ns). 한 바퀴가 짧으면 여러 바퀴 반복."""
+    gc.collect()
+    gc.disable()
+    try:
+        return _time_loops(fn, args_list, repeat, min_time)
+    finally:
+        gc.enable()
+
+def _time_loops(fn, args_list, repeat, min_time):
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            for a in args_list:
+                fn(*a)
+        dt = time.perf_counter() - t0
+        if dt >= min_time or loops >= 1 << 16:
+            break
+        loops *= 2
+    best = dt
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            for a in args_list:
+                fn(*a)
+        best = min(best, time.perf_counter() - t0)
+    return best / (loops * len(args_list)) * 1e9
+
+def _calibration_ns():
+    """장비 속도 기준: 문자열/정규식/딕셔너리 위주의 고정 작업 1회 (ns)"""
+    import re
+    words = ["SN2693", "도면", "承認", "[HMD12H]", "re:", "Rev.3"] * 20
+    pat = re.compile(r"\[(\w+?)(\d+)(H|D)\]")
+    def work():
+        d = {}
+        for w in words:
+            k = w.lower().strip()
+            d[k] = d.get(k, 0) + 1
+            pat.search(w)
+        return " ".join(sorted(d))
+    return _time_per_call(work, [()], repeat=7)
+
+def run_benchmarks(repeat=7, only=None, calib=None):
+    """only: 측정할 함수 이름 집합 (None=전체), calib: 이미 잰 보정값 재사용"""
+    tmp = tempfile.mkdtemp(prefix="autoremind-hot-")
+    try:
+        subjects = subject_corpus()
+        htmls = html_corpus(tmp)
+        convs = conv_key_corpus()
+        canon = [ar.canonicalize_subject(s) for s in subjects]
+
+        def attach_rewrite(html):
+            return ar._attach_images_and_rewrite_html(ar.EmlDraft(), html)
+
+        cases = {
+            "canonicalize_subject": (ar.canonicalize_subject, [(s,) for s in subjects]),
+            "strip_brackets_tags": (ar.strip_brackets_tags, [(s,) for s in canon]),
+            "parse_yard_tag": (ar.parse_yard_tag, [(s,) for s in subjects]),
+            "format_body_text": (ar.format_body_text, [(t,) for t in BODY_TEXTS * 20]),
+            "_sanitize_bad_cids": (ar._sanitize_bad_cids, [(h,) for h in htmls]),
+            "_attach_images_and_rewrite_html": (attach_rewrite, [(h,) for h in htmls]),
+            "conv_key": (ar.conv_key, [(d,) for d in convs]),
+        }
+        # 공유 장비에서는 장비 속도 자체가 초 단위로 출렁이므로 보정 루프를 함수마다 앞에서 다시 재고 최솟값을 쓴다
+        # (함수 시간도 반복 중 최솟값이므로 둘 다 '가장 빠른 상태' 기준)
+        calibs = [calib] if calib else [_calibration_ns()]
+        times = {}
+        for name, (fn, args_list) in cases.items():
+            if only is not None and name not in only:
+                continue
+            if not calib:
+                calibs.append(_calibration_ns())
+            times[name] = (_time_per_call(fn, args_list, repeat=repeat), len(args_list))
+        calib = min(calibs)
+        results = {name: {"ns_per_call": round(ns, 1), "rel": round(ns / calib, 4), "n": n}
+                   for name, (ns, n) in times.items()}
+        return {"calibration_ns": round(calib, 1), "functions": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def check_regressions(base, cur, threshold, absolute=False, noise_floor_ns=0.0):
+    """(리포트 줄 목록, 회귀 함수 목록). 보정 대비 비율 rel (absolute 면 호출당 ns) 이 base 대비 threshold 를 넘고
+    늘어난 시간(baseline 장비 기준 ns)이 noise_floor_ns 이상이면 회귀."""
+    metric = "ns_per_call" if absolute else "rel"
+    base_calib = base.get("calibration_ns") or cur["calibration_ns"]
+    lines = [f"{'function':<34} {'base ns':>10} {'now ns':>10} {'Δ ' + metric:>14}"]
+    bad = []
+    for name, r in cur["functions"].items():
+        b = base.get("functions", {}).get(name)
+        if not b:
+            lines.append(f"{name:<34} {'-':>10} {r['ns_per_call']:>10.0f} {'new':>14}")
+            continue
+        delta = r[metric] / b[metric] - 1.0
+        grown_ns = delta * b["ns_per_call"] if absolute else (r["rel"] - b["rel"]) * base_calib
+        flag = ""
+        if delta > threshold:
+            flag = "  << REGRESSION" if grown_ns >= noise_floor_ns else f"  (+{grown_ns:.0f}ns < noise floor)"
+        lines.append(f"{name:<34} {b['ns_per_call']:>10.0f} {r['ns_per_call']:>10.0f} {delta:>+14.1%}{flag}")
+        if "REGRESSION" in flag:
+            bad.append(name)
+    return lines, bad
+
+def main():
+    ap = argparse.ArgumentParser(description="Microbenchmarks for hot pure functions with a baseline gate")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--threshold", type=float, default=0.30, help="허용 상대 회귀 (0.30 = 30%%)")
+    ap.add_argument("--absolute", action="store_true", help="보정 대비 비율 대신 호출당 ns 로 비교 (baseline 장비에서만)")
+    ap.add_argument("--normalize", action="store_true", help=argparse.SUPPRESS)   # 예전 옵션: 이제 기본 동작
+    ap.add_argument("--noise-floor-ns", type=float, default=250.0,
+                    help="늘어난 호출당 시간이 이보다 작으면 회귀로 보지 않음 (1µs 미만 함수의 노이즈)")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--retries", type=int, default=2, help="회귀로 보이는 함수만 다시 재서 최솟값 사용 (노이즈 억제)")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true", help="결과 JSON 출력")
+    args = ap.parse_args()
+
+    cur = run_benchmarks(repeat=args.repeat)
+    cur.update({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                "platform": platform.platform()})
+    if args.json:
+        print(json.dumps(cur, ensure_ascii=False, indent=2))
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(cur, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"[BENCH] baseline updated -> {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[BENCH] no baseline at {args.baseline}; run with --update-baseline first")
+        return 2
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    gate = dict(absolute=args.absolute, noise_floor_ns=args.noise_floor_ns)
+    lines, bad = check_regressions(base, cur, args.threshold, **gate)
+    metric = "ns_per_call" if args.absolute else "rel"
+    for _ in range(args.retries):
+        if not bad:
+            break
+        # 보정 루프도 다시 잰다 — 처음 보정값이 유난히 빨랐던 경우 rel 이 부풀려진 채로 남지 않도록
+        again = run_benchmarks(repeat=args.repeat, only=set(bad))
+        for name, r in again["functions"].items():
+            if r[metric] < cur["functions"][name][metric]:
+                cur["functions"][name] = r
+        lines, bad = check_regressions(base, cur, args.threshold, **gate)
+    print("\n".join(lines))
+    if bad:
+        print(f"[BENCH] FAIL: {len(bad)} function(s) regressed more than {args.threshold:.0%}: {', '.join(bad)}")
+        return 1
+    print("[BENCH] OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
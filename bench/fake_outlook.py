@@ -0,0 +1,678 @@
+# fake_outlook.py
+# Outlook COM 객체 모델의 인프로세스 가짜 구현 (부하 시험/예산 튜닝용, 리눅스에서도 동작).
+# Auto_Reminder_List 가 쓰는 표면만 흉내낸다:
+#   Application.GetNamespace/Session, Namespace.Stores/GetDefaultFolder/CurrentUser,
+#   Store.GetDefaultFolder/GetRootFolder, Folder.Folders/Items/FolderPath/DefaultItemType,
+#   Namespace.GetItemFromID/GetFolderFromID, Items.Sort/Restrict/Count/Item/반복, MailItem 속성/Recipients/
+#   PropertyAccessor/Attachments/Forward/Save/Send/Delete/Display, AddressEntry.GetExchangeUser.
+# 모든 속성 읽기/쓰기/메서드 호출은 LatencyModel 을 거쳐 지연(sleep)·실패·정지(stall)를 주입할 수 있다.
+# 가짜 객체는 _oleobj_ 속성을 가지므로 ComProxy 가 실제 COM 객체처럼 감싸고 호출 수를 센다.
+#
+#   from fake_outlook import FakeOutlook, LatencyModel
+#   app = FakeOutlook([synth_mailbox.generate(...)], latency=LatencyModel(base_ms=0.3, per_op={"Items.Sort": 40}))
+#   src = ar.OutlookSource(ar.ComProxy(app))
+#
+# UiProbe 는 같은 지연 모델을 보고 "Outlook UI 입력 지연" 근사치를 잰다 (저영향 모드 전/후 비교용).
+
+import re, time, zlib, random, threading
+from collections import Counter
+from datetime import datetime
+
+from synth_mailbox import SynthMail, SynthMailbox
+
+OL_MAILITEM = 43
+PR_INTERNET_MESSAGE_ID = "http://schemas.microsoft.com/mapi/proptag/0x1035001E"
+PR_TRANSPORT_HEADERS = "http://schemas.microsoft.com/mapi/proptag/0x007D001E"
+E_FAIL = -2147467259
+RPC_E_CALL_REJECTED = -2147418111
+
+class FakeComError(Exception):
+    """pywintypes.com_error 와 같은 모양의 args: (hresult, strerror, excepinfo, argerror)"""
+    def __init__(self, hresult=E_FAIL, strerror="Unspecified error", op=None):
+        super().__init__(hresult, strerror, (0, "Microsoft Outlook", f"fake failure in {op}", None, 0, hresult), None)
+        self.hresult = hresult
+        self.op = op
+
+class LatencyModel:
+    """호출별 지연/실패/정지 주입.
+
+    op 이름은 "<클래스>.<멤버>" (예: "MailItem.Subject", "Items.Sort", "Namespace.Stores").
+    per_op 는 op 전체 이름 또는 멤버 이름만으로 지정 가능 ({"Sort": 30} 은 모든 *.Sort).
+    fail_ops/stall_ops 도 같은 규칙. stall 은 stall_sec 동안 멈춘다 (응답 없는 COM 호출 재현).
+
+    sta=True(기본)면 지연/정지를 한 번에 하나씩만 처리한다 — Outlook 은 out-of-proc 호출을 UI 스레드(STA) 하나에서
+    차례로 처리하므로, 여러 스레드(아파트)에서 동시에 호출해도 지연이 겹치지 않는다.
+    sta=False 는 지연이 서로 다른 서버에서 생기는 경우(저장소마다 다른 Exchange 서버 등)의 상한 근사치."""
+
+    def __init__(self, base_ms=0.0, jitter_ms=0.0, per_op=None, fail_rate=0.0, fail_ops=None,
+                 fail_hresult=E_FAIL, stall_rate=0.0, stall_ops=None, stall_sec=0.0, seed=0, sta=True):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.per_op = dict(per_op or {})
+        self.fail_rate = fail_rate
+        self.fail_ops = dict(fail_ops or {})      # op -> 확률
+        self.fail_hresult = fail_hresult
+        self.stall_rate = stall_rate
+        self.stall_ops = dict(stall_ops or {})    # op -> 확률
+        self.stall_sec = stall_sec
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sta = threading.Lock() if sta else None
+        self.calls = Counter()
+        self.failures = Counter()
+        self.stalls = Counter()
+        self.injected_sec = 0.0
+        self.busy = 0                       # 진행 중인 호출 수 (UiProbe 용 STA 점유 표시)
+        self.last_end = time.monotonic()
+
+    def _lookup(self, table, op, default):
+        if op in table: return table[op]
+        member = op.rsplit(".", 1)[-1]
+        return table.get(member, default)
+
+    def __call__(self, op):
+        with self._lock:
+            self.calls[op] += 1
+            self.busy += 1
+            r_fail, r_stall, r_jit = self._rnd.random(), self._rnd.random(), self._rnd.random()
+        try:
+            if self._sta is None:
+                self._inject(op, r_fail, r_stall, r_jit)
+            else:
+                with self._sta:
+                    self._inject(op, r_fail, r_stall, r_jit)
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self.last_end = time.monotonic()
+
+    def _inject(self, op, r_fail, r_stall, r_jit):
+        ms = self._lookup(self.per_op, op, self.base_ms)
+        if self.jitter_ms:
+            ms += r_jit * self.jitter_ms
+        stall_p = self._lookup(self.stall_ops, op, self.stall_rate)
+        sec = ms / 1000.0
+        if stall_p and r_stall < stall_p:
+            with self._lock:
+                self.stalls[op] += 1
+            sec += self.stall_sec
+        if sec > 0:
+            with self._lock:
+                self.injected_sec += sec
+            time.sleep(sec)
+        fail_p = self._lookup(self.fail_ops, op, self.fail_rate)
+        if fail_p and r_fail < fail_p:
+            with self._lock:
+                self.failures[op] += 1
+            raise FakeComError(self.fail_hresult, "The operation failed.", op)
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def summary(self, top=10):
+        return {
+            "calls": self.total_calls(),
+            "failures": sum(self.failures.values()),
+            "stalls": sum(self.stalls.values()),
+            "injected_sec": round(self.injected_sec, 3),
+            "top_ops": dict(self.calls.most_common(top)),
+        }
+
+class UiProbe:
+    """Outlook UI 응답성 근사 측정.
+
+    out-of-proc COM 호출은 Outlook UI 스레드(STA)에서 처리되고 입력 메시지보다 먼저 디스패치된다.
+    그래서 UI 이벤트는 COM 호출이 idle_ms 이상 끊긴 뒤에야 처리된다고 보고, interval_ms 마다
+    UI 이벤트를 하나 넣어 처리될 때까지 기다린 시간(입력 지연)을 잰다.
+
+        probe = UiProbe(latency).start(); ... cycle ...; probe.stop(); probe.summary()
+    """
+
+    def __init__(self, latency, interval_ms=50.0, idle_ms=1.0, poll_ms=0.5):
+        self.latency = latency
+        self.interval = interval_ms / 1000.0
+        self.idle = idle_ms / 1000.0
+        self.poll = poll_ms / 1000.0
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _idle(self):
+        lm = self.latency
+        return lm.busy == 0 and time.monotonic() - lm.last_end >= self.idle
+
+    def _run(self):
+        while not self._stop.is_set():
+            posted = time.monotonic()
+            while not self._idle() and not self._stop.is_set():
+                time.sleep(self.poll)
+            self.samples.append(time.monotonic() - posted)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ui-probe", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self
+
+    def summary(self):
+        v = sorted(self.samples)
+        if not v:
+            return {"events": 0}
+        pct = lambda q: round(v[min(len(v) - 1, int(q * len(v)))] * 1000, 1)
+        return {"events": len(v), "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+                "max_ms": round(v[-1] * 1000, 1), "over_100ms": sum(1 for x in v if x > 0.1)}
+
+class _FakeCom:
+    """공통: _oleobj_ (ComProxy 인식용) + 지연 모델이 걸린 속성 읽기/쓰기.
+    _PROPS 에 있는 이름만 COM 속성으로 취급하고, 그 외 이름은 일반 파이썬 속성이다."""
+    _oleobj_ = None
+    _KIND = "Object"
+    _PROPS = ()
+    _WRITABLE = ()
+
+    def __init__(self, ol):
+        object.__setattr__(self, "_ol", ol)
+
+    def _tick(self, member):
+        self._ol.latency(f"{self._KIND}.{member}")
+
+    def _get(self, name):
+        raise AttributeError(name)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._PROPS:
+            raise AttributeError(name)
+        self._tick(name)
+        return self._get(name)
+
+    def __setattr__(self, name, value):
+        if name not in self._PROPS:
+            object.__setattr__(self, name, value)
+            return
+        if name not in self._WRITABLE:
+            raise FakeComError(E_FAIL, f"property {name} is read-only", f"{self._KIND}.{name}")
+        self._tick(name)
+        self._set(name, value)
+
+    def _set(self, name, value):
+        raise FakeComError(E_FAIL, f"property {name} is read-only", f"{self._KIND}.{name}")
+
+    def _call(self, member):
+        self._tick(member)
+
+class _FakeCollection(_FakeCom):
+    _PROPS = ("Count",)
+
+    def __init__(self, ol, items):
+        super().__init__(ol)
+        self._items = items
+
+    def _get(self, name):
+        return len(self._items)
+
+    def Item(self, i):
+        self._call("Item")
+        if isinstance(i, int):
+            if not 1 <= i <= len(self._items):
+                raise FakeComError(E_FAIL, "Array index out of bounds.", f"{self._KIND}.Item")
+            return self._items[i - 1]
+        for it in self._items:
+            if getattr(it, "_name", None) == i:
+                return it
+        raise FakeComError(E_FAIL, f"item {i!r} not found", f"{self._KIND}.Item")
+
+    def __iter__(self):
+        for it in list(self._items):
+            self._tick("Next")
+            yield it
+
+    def __len__(self):
+        return len(self._items)
+
+# ---- address book
+class FakeExchangeUser(_FakeCom):
+    _KIND = "ExchangeUser"
+    _PROPS = ("PrimarySmtpAddress", "Name")
+
+    def __init__(self, ol, smtp, name):
+        super().__init__(ol)
+        self._smtp, self._name = smtp, name
+
+    def _get(self, name):
+        return self._smtp if name == "PrimarySmtpAddress" else self._name
+
+class FakeAddressEntry(_FakeCom):
+    _KIND = "AddressEntry"
+    _PROPS = ("Address", "Name", "Type")
+
+    def __init__(self, ol, smtp, name=None):
+        super().__init__(ol)
+        self._smtp = smtp
+        self._name = name or smtp.split("@")[0]
+        self._ex = ol.is_exchange(smtp)
+
+    def _get(self, name):
+        if name == "Address": return self._ol.display_address(self._smtp)
+        if name == "Name": return self._name
+        return "EX" if self._ex else "SMTP"
+
+    def GetExchangeUser(self):
+        self._call("GetExchangeUser")
+        return FakeExchangeUser(self._ol, self._smtp, self._name) if self._ex else None
+
+    def GetExchangeDistributionList(self):
+        self._call("GetExchangeDistributionList")
+        return None
+
+class FakeRecipient(_FakeCom):
+    _KIND = "Recipient"
+    _PROPS = ("Address", "Name", "Type", "AddressEntry", "Resolved")
+    _WRITABLE = ("Type",)
+
+    def __init__(self, ol, smtp, rtype=1):
+        super().__init__(ol)
+        self._smtp, self._type = smtp, rtype
+
+    def _get(self, name):
+        if name == "Address": return self._ol.display_address(self._smtp)
+        if name == "Name": return self._smtp.split("@")[0]
+        if name == "Type": return self._type
+        if name == "Resolved": return True
+        return FakeAddressEntry(self._ol, self._smtp)
+
+    def _set(self, name, value):
+        self._type = value
+
+class FakeRecipients(_FakeCollection):
+    _KIND = "Recipients"
+
+    def Add(self, address):
+        self._call("Add")
+        r = FakeRecipient(self._ol, self._ol.smtp_of(address), 1)
+        self._items.append(r)
+        return r
+
+    def ResolveAll(self):
+        self._call("ResolveAll")
+        return True
+
+class FakePropertyAccessor(_FakeCom):
+    _KIND = "PropertyAccessor"
+
+    def __init__(self, ol, props):
+        super().__init__(ol)
+        self._props = props
+
+    def GetProperty(self, tag):
+        self._call("GetProperty")
+        if tag not in self._props:
+            raise FakeComError(E_FAIL, f"property {tag} not found", "PropertyAccessor.GetProperty")
+        return self._props[tag]
+
+    def SetProperty(self, tag, value):
+        self._call("SetProperty")
+        self._props[tag] = value
+
+class FakeAttachment(_FakeCom):
+    _KIND = "Attachment"
+    _PROPS = ("FileName", "PropertyAccessor")
+
+    def __init__(self, ol, path):
+        super().__init__(ol)
+        self._path = path
+        self._pa = FakePropertyAccessor(ol, {})
+
+    def _get(self, name):
+        return self._pa if name == "PropertyAccessor" else self._path.replace("\\", "/").rsplit("/", 1)[-1]
+
+class FakeAttachments(_FakeCollection):
+    _KIND = "Attachments"
+
+    def Add(self, path, *args):
+        self._call("Add")
+        att = FakeAttachment(self._ol, path)
+        self._items.append(att)
+        return att
+
+# ---- items
+class FakeMailItem(_FakeCom):
+    _KIND = "MailItem"
+    _PROPS = ("Class", "Subject", "SentOn", "ReceivedTime", "SenderEmailAddress", "SenderName", "Sender",
+              "EntryID", "ConversationID", "ConversationTopic", "To", "CC", "BCC", "Body", "HTMLBody",
+              "BodyFormat", "Recipients", "PropertyAccessor", "Attachments", "Size", "Parent", "Sent")
+    _WRITABLE = ("Subject", "HTMLBody", "Body", "BodyFormat", "To", "CC")
+
+    def __init__(self, ol, folder, mail=None):
+        super().__init__(ol)
+        self._folder = folder
+        self._mail = mail
+        self._values = {}
+        self._recips = None
+        self._atts = None
+
+    # draft(Forward 결과)의 To/CC/BCC 는 Recipients 기준
+    def _recipients_list(self):
+        if self._recips is None:
+            m = self._mail
+            self._recips = ([] if m is None else
+                            [FakeRecipient(self._ol, a, 1) for a in m.to] +
+                            [FakeRecipient(self._ol, a, 2) for a in m.cc] +
+                            [FakeRecipient(self._ol, a, 3) for a in m.bcc])
+        return self._recips
+
+    def _addr_field(self, rtype):
+        return "; ".join(r._smtp.split("@")[0] for r in self._recipients_list() if r._type == rtype)
+
+    def _get(self, name):
+        v = self._values
+        if name in v: return v[name]
+        m = self._mail
+        if name == "Class": return OL_MAILITEM
+        if name == "Recipients": return FakeRecipients(self._ol, self._recipients_list())
+        if name == "Attachments":
+            if self._atts is None: self._atts = []
+            return FakeAttachments(self._ol, self._atts)
+        if name == "PropertyAccessor":
+            props = {PR_TRANSPORT_HEADERS: ""}
+            if m is not None:
+                props[PR_INTERNET_MESSAGE_ID] = m.msgid
+            return FakePropertyAccessor(self._ol, props)
+        if name == "Parent": return self._folder
+        if name == "BodyFormat": return 2
+        if name in ("To", "CC", "BCC"): return self._addr_field({"To": 1, "CC": 2, "BCC": 3}[name])
+        if m is None:
+            return {"Subject": "", "Body": "", "HTMLBody": "", "Sent": False}.get(name)
+        if name == "Subject": return m.subject
+        if name == "SentOn": return m.sent_on
+        if name == "ReceivedTime": return m.received
+        if name == "SenderEmailAddress": return self._ol.display_address(m.sender)
+        if name == "SenderName": return m.sender_name
+        if name == "Sender": return FakeAddressEntry(self._ol, m.sender, m.sender_name)
+        if name == "EntryID": return m.entry_id
+        if name == "ConversationID": return m.conv_id
+        if name == "ConversationTopic": return m.topic
+        if name == "Body": return m.body()
+        if name == "HTMLBody": return m.html()
+        if name == "Size": return 2048 + len(m.subject) * 2
+        if name == "Sent": return self._folder is not None
+        return None
+
+    def _set(self, name, value):
+        if name in ("To", "CC"):
+            rtype = 1 if name == "To" else 2
+            keep = [r for r in self._recipients_list() if r._type != rtype]
+            addrs = [a.strip() for a in re.split(r"[;,]", value or "") if a.strip()]
+            self._recips = keep + [FakeRecipient(self._ol, self._ol.smtp_of(a), rtype) for a in addrs]
+            return
+        self._values[name] = value
+
+    def Forward(self):
+        self._call("Forward")
+        fwd = FakeMailItem(self._ol, None, None)
+        m = self._mail
+        if m is not None:
+            hdr = (f"<div><b>From:</b> {m.sender_name}<br><b>Sent:</b> {m.sent_on:%Y-%m-%d %H:%M}<br>"
+                   f"<b>Subject:</b> {m.subject}</div><br>")
+            fwd._values.update({"Subject": f"FW: {m.subject}", "HTMLBody": hdr + m.html(), "Body": m.body()})
+        fwd._orig = m
+        return fwd
+
+    def Save(self):
+        self._call("Save")
+
+    def Display(self, modal=False):
+        self._call("Display")
+        self._ol.displayed.append(self._mail)
+
+    def Send(self):
+        self._call("Send")
+        if self._mail is not None:
+            raise FakeComError(E_FAIL, "This item has already been sent.", "MailItem.Send")
+        self._ol.deliver(self)
+
+    def Delete(self):
+        self._call("Delete")
+        if self._folder is not None and self._mail in self._folder._f.items:
+            self._folder._f.items.remove(self._mail)
+
+_RESTRICT_RE = re.compile(r"\[(\w+)\]\s*(>=|<=|<>|=|>|<)\s*'([^']*)'")
+_RESTRICT_FMTS = ("%m/%d/%Y %I:%M %p", "%m/%d/%Y %H:%M", "%m/%d/%Y")
+
+def _restrict_value(raw):
+    for fmt in _RESTRICT_FMTS:
+        try:
+            return datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+    return raw
+
+class FakeItems(_FakeCollection):
+    """Folder.Items — 접근할 때마다 새 컬렉션(정렬 상태는 컬렉션별), Restrict 는 새 컬렉션 반환."""
+    _KIND = "Items"
+    _ATTR = {"SentOn": "sent_on", "ReceivedTime": "received", "Subject": "subject", "EntryID": "entry_id",
+             "SenderEmailAddress": "sender", "ConversationTopic": "topic"}
+
+    def __init__(self, ol, folder, mails):
+        super().__init__(ol, mails)
+        self._folder = folder
+
+    def _wrap(self, m):
+        return FakeMailItem(self._ol, self._folder, m)
+
+    def Sort(self, prop, descending=False):
+        self._call("Sort")
+        attr = self._ATTR.get(prop.strip("[]"))
+        if attr is None:
+            raise FakeComError(E_FAIL, f"Cannot sort by {prop}", "Items.Sort")
+        self._items = sorted(self._items, key=lambda m: getattr(m, attr), reverse=bool(descending))
+
+    def Restrict(self, flt):
+        self._call("Restrict")
+        conds = _RESTRICT_RE.findall(flt or "")
+        if not conds:
+            raise FakeComError(E_FAIL, f"Cannot parse condition {flt!r}", "Items.Restrict")
+        ops = {">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b, ">": lambda a, b: a > b,
+               "<": lambda a, b: a < b, "=": lambda a, b: a == b, "<>": lambda a, b: a != b}
+        out = self._items
+        for prop, op, raw in conds:
+            attr = self._ATTR.get(prop)
+            if attr is None:
+                raise FakeComError(E_FAIL, f"Unknown property {prop}", "Items.Restrict")
+            val = _restrict_value(raw)
+            out = [m for m in out if ops[op](getattr(m, attr), val)]
+        return FakeItems(self._ol, self._folder, out)
+
+    def Item(self, i):
+        self._call("Item")
+        if not 1 <= i <= len(self._items):
+            raise FakeComError(E_FAIL, "Array index out of bounds.", "Items.Item")
+        return self._wrap(self._items[i - 1])
+
+    def __iter__(self):
+        for m in list(self._items):
+            self._tick("Next")
+            yield self._wrap(m)
+
+class FakeFolder(_FakeCom):
+    _KIND = "Folder"
+    _PROPS = ("Name", "FolderPath", "Folders", "Items", "DefaultItemType", "Parent", "Store", "EntryID", "StoreID")
+
+    def __init__(self, ol, store, synth_folder, parent=None):
+        super().__init__(ol)
+        self._store = store
+        self._f = synth_folder
+        self._parent = parent
+        self._name = synth_folder.name
+        self._children = None
+
+    def _get(self, name):
+        f = self._f
+        if name == "Name": return f.name
+        if name == "FolderPath": return f.path
+        if name == "Folders":
+            if self._children is None:
+                self._children = [FakeFolder(self._ol, self._store, c, self) for c in f.children]
+            return FakeFolders(self._ol, self._children)
+        if name == "Items": return FakeItems(self._ol, self, f.items)
+        if name == "DefaultItemType": return 0
+        if name == "Parent": return self._parent
+        if name == "Store": return self._store
+        if name == "EntryID": return f"FOLDER:{f.path}"
+        if name == "StoreID": return self._store._name
+
+class FakeFolders(_FakeCollection):
+    _KIND = "Folders"
+
+class FakeStore(_FakeCom):
+    _KIND = "Store"
+    _PROPS = ("DisplayName", "StoreID")
+
+    def __init__(self, ol, mailbox):
+        super().__init__(ol)
+        self._mb = mailbox
+        self._name = mailbox.root.name
+        self._root = FakeFolder(ol, self, mailbox.root)
+        self._by_synth = {}
+
+    def _get(self, name):
+        return self._mb.root.name
+
+    def _folder_for(self, synth_folder):
+        """같은 SynthFolder 는 같은 FakeFolder 로 (Folders 트리 객체와 동일하게)"""
+        if not self._by_synth:
+            stack = [self._root]
+            while stack:
+                ff = stack.pop()
+                self._by_synth[id(ff._f)] = ff
+                ff._children = ff._children or [FakeFolder(self._ol, self, c, ff) for c in ff._f.children]
+                stack.extend(ff._children)
+        return self._by_synth[id(synth_folder)]
+
+    def GetDefaultFolder(self, kind):
+        self._call("GetDefaultFolder")
+        f = self._mb.default.get(kind)
+        if f is None:
+            raise FakeComError(E_FAIL, f"default folder {kind} not available", "Store.GetDefaultFolder")
+        return self._folder_for(f)
+
+    def GetRootFolder(self):
+        self._call("GetRootFolder")
+        return self._root
+
+class FakeStores(_FakeCollection):
+    _KIND = "Stores"
+
+class FakeNamespace(_FakeCom):
+    _KIND = "Namespace"
+    _PROPS = ("Stores", "CurrentUser", "Application")
+
+    def _get(self, name):
+        ol = self._ol
+        if name == "Stores": return FakeStores(ol, ol.stores)
+        if name == "CurrentUser": return FakeRecipient(ol, ol.me)
+        return ol
+
+    def GetDefaultFolder(self, kind):
+        self._call("GetDefaultFolder")
+        return self._ol.stores[0].GetDefaultFolder(kind)
+
+    def GetItemFromID(self, entry_id, store_id=None):
+        self._call("GetItemFromID")
+        for mb in self._ol.mailboxes:
+            for f in mb.folders():
+                for m in f.items:
+                    if m.entry_id == entry_id:
+                        return FakeMailItem(self._ol, None, m)
+        raise FakeComError(E_FAIL, "The message you specified cannot be found.", "Namespace.GetItemFromID")
+
+    def GetFolderFromID(self, entry_id, store_id=None):
+        self._call("GetFolderFromID")
+        for st in self._ol.stores:
+            if store_id is not None and st._name != store_id:
+                continue
+            for f in st._mb.folders():
+                if f"FOLDER:{f.path}" == entry_id:
+                    return st._folder_for(f)
+        raise FakeComError(E_FAIL, "The folder you specified cannot be found.", "Namespace.GetFolderFromID")
+
+class FakeOutlook(_FakeCom):
+    """Outlook.Application 대역. mailboxes: SynthMailbox 목록 (첫 번째가 기본 저장소).
+
+    exchange_rate: 해당 비율의 외부 주소를 EX(X500 DN) 주소로 노출해 SMTP 해석 경로를 태운다."""
+    _KIND = "Application"
+    _PROPS = ("Session", "Version", "Name")
+
+    def __init__(self, mailboxes=None, latency=None, exchange_rate=0.0, seed=0):
+        self.latency = latency or LatencyModel()
+        super().__init__(self)
+        if isinstance(mailboxes, SynthMailbox):
+            mailboxes = [mailboxes]
+        self.mailboxes = list(mailboxes or [SynthMailbox("me@cs.example.com")])
+        self.me = self.mailboxes[0].me
+        self.exchange_rate = exchange_rate
+        self._seed = seed
+        self._x500 = {}
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self.sent = []
+        self.displayed = []
+        self.stores = [FakeStore(self, mb) for mb in self.mailboxes]
+        self._ns = FakeNamespace(self)
+
+    # -- address helpers (not COM members)
+    def is_exchange(self, smtp):
+        if not self.exchange_rate or smtp == self.me:
+            return False
+        return (zlib.crc32(f"{self._seed}:{smtp}".encode()) % 10000) / 10000.0 < self.exchange_rate
+
+    def display_address(self, smtp):
+        if not self.is_exchange(smtp):
+            return smtp
+        dn = self._x500.get(smtp)
+        if dn is None:
+            local = smtp.split("@")[0]
+            dn = self._x500[smtp] = ("/O=EXCHANGELABS/OU=EXCHANGE ADMINISTRATIVE GROUP (FYDIBOHF23SPDLT)"
+                                     f"/CN=RECIPIENTS/CN={zlib.crc32(smtp.encode()):08x}-{local}")
+        return dn
+
+    def smtp_of(self, address):
+        a = (address or "").strip()
+        for smtp, dn in self._x500.items():
+            if dn.lower() == a.lower():
+                return smtp
+        return a.lower()
+
+    def deliver(self, draft):
+        """draft.Send(): 기본 저장소 Sent Items 에 SynthMail 로 기록"""
+        with self._seq_lock:
+            self._seq += 1
+            n = self._seq
+        now = datetime.now().replace(microsecond=0)
+        recips = draft._recipients_list()
+        orig = getattr(draft, "_orig", None)
+        subject = draft._values.get("Subject", "")
+        m = SynthMail(f"FAKESENT{n:08X}", subject, now, now, self.me, "CS Team",
+                      f"<fake.sent.{n}@cs.example.com>", orig.msgid if orig else f"<fake.sent.{n}@cs.example.com>",
+                      orig.topic if orig else subject,
+                      [r._smtp for r in recips if r._type == 1], [r._smtp for r in recips if r._type == 2],
+                      [r._smtp for r in recips if r._type == 3])
+        self.mailboxes[0].default[SynthMailbox.SENT].items.append(m)
+        self.sent.append(m)
+
+    # -- COM members
+    def _get(self, name):
+        if name == "Session": return self._ns
+        if name == "Version": return "16.0.0.0"
+        return "Outlook"
+
+    def GetNamespace(self, name):
+        self._call("GetNamespace")
+        if name.upper() != "MAPI":
+            raise FakeComError(E_FAIL, f"unknown namespace {name}", "Application.GetNamespace")
+        return self._ns
@@ -0,0 +1,280 @@
+# synth_mailbox.py
+# 벤치마크용 합성 메일함 생성기 (결정적: 같은 seed → 같은 메일함).
+# - 보낸/받은 편지함 크기, 태그 비율/종류, 회신 비율, 제목 접두어 노이즈, 하위 폴더 깊이 지정
+# - 메모리 모델(SynthMailbox) 로 만들어 bench_cycle.py 의 SynthSource 로 돌리거나
+#   write_maildir() 로 Maildir/EML 트리로 써서 Auto_Reminder_List.py --maildir 로 돌릴 수 있다.
+#
+#   python bench/synth_mailbox.py --sent 2000 --inbox 8000 --out /tmp/mbox
+
+import os, re, sys, json, random, argparse
+from datetime import datetime, timedelta
+from email.header import Header
+from email.utils import format_datetime
+
+DEFAULTS = {
+    "sent": 400,
+    "inbox": 600,
+    "tag_rate": 0.3,            # 보낸 메일 중 [YARD+interval] 태그가 붙은 비율
+    "tags": ["[SHI3D]", "[HMD12H]", "[HHI1W]", "[HSHI2D]", "[HO1D]", "[HJSC30MIN]"],
+    "reply_rate": 0.5,          # 태그 메일 중 수신인이 회신한 비율
+    "prefix_rate": 0.3,         # 제목 앞에 RE:/답장:/転送: 등 접두어가 붙는 비율
+    "prefixes": ["RE: ", "Re: ", "FW: ", "답장: ", "회신: ", "전달: ", "転送: ", "回覆: "],
+    "folder_depth": 2,          # 보낸/받은 편지함 아래 하위 폴더 깊이
+    "folders_per_level": 2,
+    "subfolder_share": 0.2,     # 하위 폴더로 분산되는 메일 비율
+    "deleted_share": 0.02,      # 지운 편지함으로 가는 받은 메일 비율
+    "span_days": 90,            # SentOn 분포 (now - span_days .. now)
+    "max_recipients": 3,
+    "bcc_rate": 0.1,
+    "me": "me@cs.example.com",
+    "store": "Mailbox - CS",      # 저장소 표시 이름 (다중 저장소 시험 시 저장소마다 다르게)
+    "seed": 1,
+}
+
+HULLS = ["SN2693", "H3525", "S1234", "H8012", "SN3101", "H2950", "S7760", "HN5012"]
+TOPICS = [
+    "도면 승인 요청 (Rev.{n})", "선급 코멘트 회신 요청", "기자재 사양 확인 부탁드립니다", "시운전 일정 협의",
+    "図面承認依頼 第{n}版", "仕様確認のお願い", "検査記録の送付", "工程打合せの件",
+    "Drawing approval request Rev.{n}", "Class comments - reply required", "Maker list confirmation",
+    "Sea trial schedule", "Piping isometric check", "Outfitting drawing review",
+]
+DOMAINS = ["shi.example.co.kr", "hmd.example.co.kr", "hhi.example.co.kr", "hshi.example.co.kr",
+           "ho.example.co.kr", "jmu.example.co.jp", "maker.example.com"]
+SUBFOLDER_NAMES = ["Project", "Hull", "Archive", "Class", "Maker"]
+
+HTML_TEMPLATE = (
+    "<html><head><style>p.MsoNormal{{margin:0cm;font-family:'맑은 고딕'}}</style></head>"
+    "<body lang=KO style='word-wrap:break-word'><div class=WordSection1><p class=MsoNormal>{body}</p>"
+    "<p class=MsoNormal><img width=120 height=40 src='cid:image001.png@01DB0000.00000000'></p>"
+    "</div></body></html>"
+)
+
+class SynthMail:
+    __slots__ = ("entry_id", "subject", "sent_on", "received", "sender", "sender_name",
+                 "msgid", "conv_id", "topic", "to", "cc", "bcc")
+
+    def __init__(self, entry_id, subject, sent_on, received, sender, sender_name, msgid, conv_id, topic,
+                 to=(), cc=(), bcc=()):
+        self.entry_id = entry_id
+        self.subject = subject
+        self.sent_on = sent_on
+        self.received = received
+        self.sender = sender
+        self.sender_name = sender_name
+        self.msgid = msgid
+        self.conv_id = conv_id
+        self.topic = topic
+        self.to, self.cc, self.bcc = tuple(to), tuple(cc), tuple(bcc)
+
+    def body(self):
+        return f"{self.topic}\r\n\r\nBest regards,\r\n{self.sender_name}"
+
+    def html(self):
+        return HTML_TEMPLATE.format(body=self.topic)
+
+class SynthFolder:
+    __slots__ = ("name", "kind", "items", "children", "parent")
+
+    def __init__(self, name, kind=None, parent=None):
+        self.name, self.kind, self.parent = name, kind, parent
+        self.items = []
+        self.children = []
+
+    def child(self, name):
+        f = SynthFolder(name, parent=self)
+        self.children.append(f)
+        return f
+
+    def walk(self):
+        yield self
+        for c in self.children:
+            yield from c.walk()
+
+    @property
+    def path(self):
+        parts = []
+        f = self
+        while f is not None:
+            parts.append(f.name)
+            f = f.parent
+        return "\\\\" + "\\".join(reversed(parts))
+
+class SynthMailbox:
+    """단일 저장소 메일함. default[kind] = 기본 폴더 (kind 는 OL_FOLDER_* 값)"""
+    SENT, INBOX, DRAFTS, DELETED, OUTBOX = 5, 6, 16, 3, 4
+
+    def __init__(self, me, store_name="Mailbox - CS"):
+        self.me = me
+        self.root = SynthFolder(store_name)
+        self.default = {}
+        for kind, name in ((self.INBOX, "Inbox"), (self.SENT, "Sent Items"), (self.DRAFTS, "Drafts"),
+                           (self.DELETED, "Deleted Items"), (self.OUTBOX, "Outbox")):
+            f = self.root.child(name)
+            f.kind = kind
+            self.default[kind] = f
+
+    def folders(self):
+        return list(self.root.walk())
+
+    def count(self):
+        return sum(len(f.items) for f in self.root.walk())
+
+    def summary(self):
+        return {f.path: len(f.items) for f in self.root.walk() if f.items}
+
+def _subfolders(top, depth, per_level):
+    out = []
+    level = [top]
+    for d in range(depth):
+        nxt = []
+        for parent in level:
+            for i in range(per_level):
+                nxt.append(parent.child(f"{SUBFOLDER_NAMES[(d + i) % len(SUBFOLDER_NAMES)]} {d + 1}-{i + 1}"))
+        out.extend(nxt)
+        level = nxt
+    return out
+
+def _tag_interval_days(tag):
+    m = re.match(r"\[[A-Z]+?(\d+)(MIN|H|D|W|M)\]", tag)
+    num, unit = int(m.group(1)), m.group(2)
+    return {"MIN": num / 1440.0, "H": num / 24.0, "D": float(num), "W": num * 7.0, "M": num * 30.0}[unit]
+
+def generate(cfg=None, now=None):
+    """cfg(DEFAULTS 일부 덮어쓰기) 로 SynthMailbox 생성. now 기준 상대 시각이라 내용은 실행 시각과 무관하게 동일."""
+    c = dict(DEFAULTS)
+    c.update(cfg or {})
+    rnd = random.Random(c["seed"])
+    now = (now or datetime.now()).replace(microsecond=0)
+    mb = SynthMailbox(c["me"], c["store"])
+    sent_sub = _subfolders(mb.default[mb.SENT], c["folder_depth"], c["folders_per_level"])
+    inbox_sub = _subfolders(mb.default[mb.INBOX], c["folder_depth"], c["folders_per_level"])
+    people = [f"user{i:03d}@{DOMAINS[i % len(DOMAINS)]}" for i in range(200)]
+    seq = [0]
+
+    def next_ids():
+        seq[0] += 1
+        n = seq[0]
+        return f"{c['seed']:04X}{n:08X}", f"<synth.{c['seed']}.{n}@cs.example.com>"
+
+    def pick_folder(top, subs):
+        return rnd.choice(subs) if subs and rnd.random() < c["subfolder_share"] else top
+
+    def make_subject(tagged):
+        topic = rnd.choice(TOPICS).format(n=rnd.randint(1, 9))
+        base = f"{rnd.choice(HULLS)} {topic}"
+        if tagged:
+            tag = rnd.choice(c["tags"])
+            base = f"{tag} {base}" if rnd.random() < 0.7 else f"{base} {tag}"
+        else:
+            tag = None
+        prefix = rnd.choice(c["prefixes"]) if rnd.random() < c["prefix_rate"] else ""
+        return prefix + base, base, tag
+
+    replies = 0
+    for _ in range(c["sent"]):
+        tagged = rnd.random() < c["tag_rate"]
+        subject, topic, tag = make_subject(tagged)
+        sent_on = now - timedelta(seconds=rnd.randint(60, int(c["span_days"] * 86400)))
+        n_to = rnd.randint(1, c["max_recipients"])
+        rcpts = rnd.sample(people, n_to + 1)
+        to, cc = rcpts[:n_to], rcpts[n_to:] if rnd.random() < 0.5 else []
+        bcc = [rnd.choice(people)] if rnd.random() < c["bcc_rate"] else []
+        eid, msgid = next_ids()
+        m = SynthMail(eid, subject, sent_on, sent_on, c["me"], "CS Team", msgid, msgid, topic, to, cc, bcc)
+        pick_folder(mb.default[mb.SENT], sent_sub).items.append(m)
+
+        if tagged and rnd.random() < c["reply_rate"]:
+            who = rnd.choice(to + bcc)
+            delay = timedelta(days=rnd.uniform(0.01, 2.0 * _tag_interval_days(tag)))
+            if sent_on + delay < now:
+                prefix = rnd.choice(["RE: ", "Re: ", "답장: ", "회신: ", "RE: RE: ", "回覆: "])
+                reid, rmsgid = next_ids()
+                r = SynthMail(reid, prefix + topic, sent_on + delay, sent_on + delay, who, who.split("@")[0],
+                              rmsgid, msgid, topic, [c["me"]])
+                pick_folder(mb.default[mb.INBOX], inbox_sub).items.append(r)
+                replies += 1
+
+    for _ in range(max(0, c["inbox"] - replies)):
+        subject, topic, _tag = make_subject(rnd.random() < c["tag_rate"] / 3)
+        rt = now - timedelta(seconds=rnd.randint(60, int(c["span_days"] * 86400)))
+        who = rnd.choice(people)
+        eid, msgid = next_ids()
+        m = SynthMail(eid, subject, rt, rt, who, who.split("@")[0], msgid, msgid, topic, [c["me"]])
+        if rnd.random() < c["deleted_share"]:
+            mb.default[mb.DELETED].items.append(m)
+        else:
+            pick_folder(mb.default[mb.INBOX], inbox_sub).items.append(m)
+
+    for f in mb.root.walk():
+        rnd.shuffle(f.items)   # 저장 순서는 시간순이 아님 (Outlook 과 동일하게 Sort 가 필요)
+    return mb
+
+# ---- Maildir/EML 출력 (MaildirSource 가 읽는 레이아웃)
+def _hdr(value):
+    try:
+        value.encode("ascii")
+        return value
+    except UnicodeEncodeError:
+        return Header(value, "utf-8").encode()
+
+def _eml_bytes(m):
+    lines = [
+        f"From: {_hdr(m.sender_name)} <{m.sender}>",
+        f"To: {', '.join(m.to)}",
+    ]
+    if m.cc: lines.append(f"Cc: {', '.join(m.cc)}")
+    if m.bcc: lines.append(f"Bcc: {', '.join(m.bcc)}")
+    lines += [
+        f"Subject: {_hdr(m.subject)}",
+        f"Date: {format_datetime(m.sent_on.astimezone())}",
+        f"Message-ID: {m.msgid}",
+    ]
+    if m.conv_id != m.msgid:
+        lines += [f"In-Reply-To: {m.conv_id}", f"References: {m.conv_id}"]
+    lines += ["MIME-Version: 1.0", 'Content-Type: text/html; charset="utf-8"',
+              "Content-Transfer-Encoding: 8bit", "", m.html(), ""]
+    return "\r\n".join(lines).encode("utf-8")
+
+def write_maildir(mb, out_dir):
+    """mb 를 out_dir 아래 폴더별 .eml 파일로 기록. 기록한 파일 수 반환."""
+    n = 0
+    for f in mb.root.walk():
+        if f is mb.root:
+            continue
+        rel = []
+        p = f
+        while p is not mb.root:
+            rel.append(p.name)
+            p = p.parent
+        d = os.path.join(out_dir, *reversed(rel))
+        os.makedirs(d, exist_ok=True)
+        for m in f.items:
+            with open(os.path.join(d, f"{m.entry_id}.eml"), "wb") as fp:
+                fp.write(_eml_bytes(m))
+            n += 1
+    return n
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetic mailbox generator (Maildir/EML)")
+    ap.add_argument("--out", required=True, help="출력 디렉터리 (Auto_Reminder_List.py --maildir 로 사용)")
+    ap.add_argument("--config", help="DEFAULTS 를 덮어쓸 JSON 파일")
+    for k, v in DEFAULTS.items():
+        if isinstance(v, list):
+            continue
+        ap.add_argument("--" + k.replace("_", "-"), type=type(v), default=None)
+    args = ap.parse_args()
+
+    cfg = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg.update(json.load(f))
+    for k in DEFAULTS:
+        v = getattr(args, k, None)
+        if v is not None:
+            cfg[k] = v
+    mb = generate(cfg)
+    n = write_maildir(mb, args.out)
+    print(json.dumps({"files": n, "me": mb.me, "folders": mb.summary()}, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())